@@ -2,7 +2,8 @@ if __name__ == "__main__":
     import pkg_resources           
     from telescope_baseline.mapping.read_catalog import read_jasmine_targets
     from telescope_baseline.mapping.plot_mapping import plot_targets, plot_n_targets, hist_n_targets, plot_ae_targets, hist_ae_targets, convert_to_convexes
-    from telescope_baseline.mapping.mapset import fillgap_large_frame, inout_fillgap_large_frame
+    from telescope_baseline.mapping.mapset import fillgap_large_frame
+    from telescope_baseline.mapping.coverage import CoverageAccumulator
     import matplotlib.pyplot as plt
     import numpy as np
     import tqdm
@@ -14,7 +15,7 @@ if __name__ == "__main__":
     PA_deg=0.0
 
     hdf=pkg_resources.resource_filename('telescope_baseline', 'data/cat_hw14.5.hdf')
-    targets,l,b,hw=read_jasmine_targets(hdf)
+    targets,l,b,hw=read_jasmine_targets(hdf,as_targetset=True)
     Nstar=10**(hw/-2.5)/10**(12.5/-2.5)
     
     Ng=11
@@ -24,14 +25,13 @@ if __name__ == "__main__":
     gx=(grid[:,np.newaxis]*dummy_array).flatten()
     gy=(grid[np.newaxis,:]*dummy_array).flatten()
     
-    nans=np.zeros_like(hw)
+    accumulator=CoverageAccumulator(targets)
     pos=[]
     for i in tqdm.tqdm(range(0,Ng*Ng)):
         fillgap_large_convexes=fillgap_large_frame(l_center,b_center,PA_deg, width_mm=width_mm, each_width_mm=each_width_mm, EFL_mm=EFL_mm,left=gx[i],top=gy[i])
-        ans=inout_fillgap_large_frame(targets, fillgap_large_convexes)
-        nans_each=np.sum(ans,axis=(0,1,2))
-        nans=nans+nans_each
+        accumulator.add_convexes(fillgap_large_convexes)
         pos.append(fillgap_large_convexes)
+    nans=accumulator.counts
 
         
     Nlargeframe=4 # # of large frames to fill gaps
@@ -9,10 +9,10 @@ from matplotlib import patches
 if __name__ == "__main__":
     import pkg_resources           
     from telescope_baseline.mapping.read_catalog import read_jasmine_targets
-    from telescope_baseline.mapping.mapset import ditheringmap, inout_convexesset
+    from telescope_baseline.mapping.mapset import ditheringmap
+    from telescope_baseline.mapping.astrometry import AstrometryPipeline
     from telescope_baseline.mapping.plot_mapping import plot_targets, plot_n_targets, hist_n_targets, plot_ae_targets, hist_ae_targets, convert_to_convexes, plot_convexes
     import matplotlib.pyplot as plt
-    import numpy as np
     import tqdm
     each_width_mm=19.52
     width_mm=22.4
@@ -24,27 +24,23 @@ if __name__ == "__main__":
     gap_width_mm=width_mm - each_width_mm
     
     hdf=pkg_resources.resource_filename('telescope_baseline', 'data/cat_hw14.5.hdf')
-    targets,l,b,hw=read_jasmine_targets(hdf)
-    Nstar=10**(hw/-2.5)/10**(12.5/-2.5)
+    targets,l,b,hw=read_jasmine_targets(hdf,as_targetset=True)
     convexesset=ditheringmap(l_center,b_center,PA_deg, dithering_width_mm=gap_width_mm, Ndither=Ndither,
                              width_mm=width_mm, each_width_mm=each_width_mm, EFL_mm=EFL_mm, left=1.0,top=-0.75)
 
     pos=convert_to_convexes(convexesset)
     plot_convexes(l,b,pos)
 
-    #check inout dithering map
-    ans=inout_convexesset(targets,convexesset)
-
-    #count number 
-    nans=np.sum(ans,axis=0) #number of obs    
+    #check inout dithering map and count number, 6000 micro arcsec per frame for Hw=12.5
+    scale=1.0 
+    #Hw is treated as H for the photon counts (no Hw zero point in mag.list)
+    pipeline=AstrometryPipeline(targets,hw,"H",frames_per_count=scale,ac_ref=6000.0)
+    pipeline.add_convexes(convexesset)
+    nans=pipeline.counts #number of obs    
     plot_n_targets(l,b,nans,cmap="CMRmap_r")    
     hist_n_targets(nans)
 
-
-    # S/N computing, Kawata-san needs to correct the below.
-    scale=1.0 
-    ac=6000 # micro arcsec per frame
-    final_ac=ac/np.sqrt(nans*scale)       
+    final_ac=pipeline.accuracy()
     plot_ae_targets(l,b,final_ac,cmap="CMRmap_r")
     hist_ae_targets(final_ac)
 
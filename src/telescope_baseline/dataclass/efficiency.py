@@ -42,7 +42,7 @@ class Efficiency:
             if 'comment' in js:
                 comment = js['comment']
 
-        wlefic = Efficiency(
+        wlefic = cls(
             wavelength_grid=wavelength_grid,
             efficiency_grid=efficiency_grid,
             title=title,
@@ -92,3 +92,112 @@ class Efficiency:
         assert wavelength.shape == weight.shape, \
             'wavelength and weight should have the same shape'
         return np.sum(self.evaluate(wavelength)*weight)/np.sum(weight)
+
+
+def _refine(grid, resolution):
+    """subdivide each interval of grid into equal steps of at most resolution"""
+    n = np.maximum(1, np.ceil(np.diff(grid)/resolution).astype(int))
+    start = np.repeat(grid[:-1], n)
+    step = np.repeat(np.diff(grid)/n, n)
+    k = np.arange(np.sum(n)) - np.repeat(np.cumsum(n) - n, n)
+    return np.append(start + k*step, grid[-1])
+
+
+@dataclasses.dataclass(frozen=True)
+class Throughput(Efficiency):
+    """This class defines the product of Efficiency curves (e.g. telescope x filter x QE) on a common wavelength grid.
+
+    The product is computed once when the object is created, so evaluate is a single interpolation of the cached product.
+    The product of piecewise linear curves is not piecewise linear, so the cached product is sampled on the union of the input nodes refined to a spacing of at most resolution; the linear interpolation between the samples differs from the exact product of the interpolated curves by O(resolution**2), about 2e-8 for telescope x filter x QE at the default 0.1 nm.
+
+    Attributes:
+        wavelength (ndarray): Wavelengths in micron.
+        efficiency (ndarray): Product of the efficiencies.
+        title (str): Title of the data.
+        comment (str): Comments.
+        components (tuple): Titles of the multiplied curves.
+    """
+    components: tuple = ()
+
+    @classmethod
+    def from_efficiencies(cls, efficiencies, powers=None, wavelength_grid=None, resolution=1.e-4, title='Throughput', comment=''):
+        """This method multiplies efficiency curves on a common wavelength grid.
+
+        Args:
+            efficiencies: List of Efficiency instances.
+            powers: Powers of the efficiencies (e.g. the number of mirrors), default 1 for all.
+            wavelength_grid: Common wavelength grid in micron (default: union of the grids of the efficiencies refined by resolution).
+            resolution: Maximum spacing of the default grid in micron (None for the union of the grids only).
+            title: Title of the data.
+            comment: Comments.
+
+        Returns:
+            Throughput: Created throughput object.
+
+        Examples:
+
+            >>> teleff = Efficiency.from_json(pkg_resources.resource_filename('telescope_baseline', 'data/teleff.json'))
+            >>> qe = Efficiency.from_json(pkg_resources.resource_filename('telescope_baseline', 'data/qe/qe170.json'))
+            >>> throughput = Throughput.from_efficiencies([teleff, qe])
+        """
+        if powers is None:
+            powers = [1] * len(efficiencies)
+        assert len(powers) == len(efficiencies), \
+            'powers and efficiencies should have the same length'
+        if wavelength_grid is None:
+            wavelength_grid = np.unique(np.concatenate([e.wavelength_grid for e in efficiencies]))
+            if resolution is not None and len(wavelength_grid) > 1:
+                wavelength_grid = _refine(wavelength_grid, resolution)
+        wavelength_grid = np.asarray(wavelength_grid, dtype=float)
+        efficiency_grid = np.ones_like(wavelength_grid)
+        for e, power in zip(efficiencies, powers):
+            efficiency_grid = efficiency_grid * e.evaluate(wavelength_grid)**power
+        return cls(wavelength_grid=wavelength_grid, efficiency_grid=efficiency_grid, title=title, comment=comment,
+                   components=tuple(e.title for e in efficiencies))
+
+    @classmethod
+    def from_json_files(cls, filenames, powers=None, wavelength_grid=None, resolution=1.e-4, title='Throughput', comment=''):
+        """This method multiplies efficiency curves read from json files.
+
+        Args:
+            filenames: List of the input json filenames.
+            powers: Powers of the efficiencies, default 1 for all.
+            wavelength_grid: Common wavelength grid in micron (default: union of the grids refined by resolution).
+            resolution: Maximum spacing of the default grid in micron.
+            title: Title of the data.
+            comment: Comments.
+
+        Returns:
+            Throughput: Created throughput object.
+        """
+        return cls.from_efficiencies([Efficiency.from_json(f) for f in filenames], powers=powers,
+                                     wavelength_grid=wavelength_grid, resolution=resolution, title=title, comment=comment)
+
+    def weighted_mean(self, wavelength, weight):
+        """compute the weighted means of the throughput for many weights at once.
+
+        Args:
+            wavelength: wavelength (Nwavelength,), or list of wavelength arrays of different lengths
+            weight: weights (..., Nwavelength), or list of weight arrays matching the wavelength arrays
+
+        Returns:
+            weighted means, (...) or (Nlist,)
+
+        Examples:
+
+            >>> synphot = SynPhot.from_files()
+            >>> val = throughput.weighted_mean(synphot.wavelength*1.e-4, synphot.flux)
+        """
+        if isinstance(wavelength, (list, tuple)):
+            assert len(wavelength) == len(weight), \
+                'wavelength and weight should have the same length'
+            starts = np.concatenate([[0], np.cumsum([len(w) for w in wavelength])[:-1]]).astype(int)
+            wl = np.concatenate(wavelength)
+            wt = np.concatenate(weight)
+            assert wl.shape == wt.shape, \
+                'wavelength and weight should have the same shape'
+            return np.add.reduceat(self.evaluate(wl)*wt, starts)/np.add.reduceat(wt, starts)
+        weight = np.asarray(weight)
+        assert np.shape(wavelength)[-1] == weight.shape[-1], \
+            'wavelength and weight should have the same length'
+        return (weight @ self.evaluate(wavelength))/np.sum(weight, axis=-1)
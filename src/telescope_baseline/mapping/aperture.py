@@ -1,5 +1,7 @@
 import numpy as np
 from telescope_baseline.mapping.pixelfunc import ang2vec, vec2ang
+from telescope_baseline.mapping.targetset import TargetSet, target_vectors
+from telescope_baseline.mapping.inout_kernel import count_inout
 
 
 def lb2ang(l,b):
@@ -107,6 +109,110 @@ def lb_detector_unit(direction,scale,l_center,b_center, PA_deg, width_mm=22.4, E
 
     return ang2lb(ang_detector_unit(direction,scale,lb2ang(l_center,b_center),PA,width_mm/EFL_mm))
     
+def local_frames(center_vec):
+    """rotation matrices Rotz(phi)@Roty(theta) of the centers, built from the center vectors without angles
+    Args:
+        center_vec: unit vectors of the centers, (..., 3)
+
+    Returns:
+        rotation matrices, (..., 3, 3)
+    """
+    center_vec=np.asarray(center_vec,dtype=np.float64)
+    x=center_vec[...,0]
+    y=center_vec[...,1]
+    z=center_vec[...,2]
+    s=np.sqrt(x*x+y*y)
+    pole=(s==0.0)
+    cphi=np.where(pole,1.0,x/np.where(pole,1.0,s))
+    sphi=np.where(pole,0.0,y/np.where(pole,1.0,s))
+    R=np.empty(center_vec.shape[:-1]+(3,3))
+    R[...,0,0]=cphi*z
+    R[...,0,1]=-sphi
+    R[...,0,2]=cphi*s
+    R[...,1,0]=sphi*z
+    R[...,1,1]=cphi
+    R[...,1,2]=sphi*s
+    R[...,2,0]=-s
+    R[...,2,1]=0.0
+    R[...,2,2]=z
+    return R
+
+def convex_vertices(center_vec,PA,width,anglist,scale):
+    """compute vertex vectors of convexes (vectorized basic_convex)
+    Args:
+        center_vec: unit vectors of the centers, (..., 3)
+        PA: position angle of the detector (north up), scalar or (...)
+        width: detector width in radian
+        anglist: angular position list of the convex
+        scale: scale of convex, scalar or (...)
+
+    Returns:
+        vertex vectors, (..., Nvertex, 3)
+    """
+    half_diagonal_angle=np.asarray(width*scale,dtype=np.float64)[...,np.newaxis]
+    a=np.asarray(anglist,dtype=np.float64)+np.asarray(PA,dtype=np.float64)[...,np.newaxis]
+    sind=np.sin(half_diagonal_angle)
+    a,sind,cosd=np.broadcast_arrays(a,sind,np.cos(half_diagonal_angle))
+    local=np.stack([sind*np.cos(a),sind*np.sin(a),cosd],axis=-1)
+    return np.einsum('...ij,...vj->...vi',local_frames(center_vec),local)
+
+def square_vertices(center_vec,PA,width):
+    """compute vertex vectors of square convexes (vectorized square_convex)
+    Args:
+        center_vec: unit vectors of the centers, (..., 3)
+        PA: position angle of the detector (north up), scalar or (...)
+        width: detector width in radian
+
+    Returns:
+        vertex vectors, (..., 4, 3)
+    """
+    anglist=[-3.0*np.pi/4.0,-np.pi/4.0,np.pi/4.0,3.0*np.pi/4.0]
+    scale=1.0/np.sqrt(2.0)
+    return convex_vertices(center_vec,PA,width,anglist,scale)
+
+def detector_unit_vec(direction,scale,center_vec,PA,width):
+    """compute relative positions in the unit of the detector size (vectorized ang_detector_unit)
+    Args:
+        direction: TBLR =top,bottom,left,right
+        scale: scale in the detector one side unit, scalar or (...)
+        center_vec: unit vectors of the centers, (..., 3)
+        PA: position angle of the detector (north up), scalar or (...)
+        width: detector width in radian
+
+    Returns:
+        unit vectors, (..., 3)
+    """
+    dic={"R":-np.pi/2.0,"B":0.0,"L":np.pi/2.0,"T":np.pi}
+    return convex_vertices(center_vec,PA,width,[dic[direction]],2*np.asarray(scale))[...,0,:]
+
+def four_square_vertices(center_vec,PA,width,each_width):
+    """compute vertex vectors of four square convexes (vectorized four_square_convexes)
+    Args:
+        center_vec: unit vectors of the centers, (Npointing, 3)
+        PA: position angle in radian, scalar or (Npointing,)
+        width: the separation of squares
+        each_width: square width
+
+    Returns:
+        vertex vectors, (Npointing, 4 chips, 4 vertices, 3)
+    """
+    PA=np.asarray(PA,dtype=np.float64)[...,np.newaxis]
+    chip_centers=square_vertices(center_vec,PA,width)
+    return square_vertices(chip_centers,PA,each_width)
+
+def vertices2convexes(vertices):
+    """convert vertex vectors to convexes given by angles
+    Args:
+        vertices: vertex vectors, (..., Nvertex, 3)
+
+    Returns:
+        convexes, theta,phi of the vertices, (..., 2, Nvertex)
+    """
+    vertices=np.asarray(vertices)
+    theta,phi=vec2ang(vertices)
+    shape=vertices.shape[:-1]
+    return np.stack([theta.reshape(shape),phi.reshape(shape)],axis=-2)
+
 def Roty(theta):
     return np.array([[np.cos(theta),0.0,np.sin(theta)],[0.0,1.0,0.0],[-np.sin(theta),0.0,np.cos(theta)]])
 
@@ -147,19 +253,134 @@ def inout_convex_on_sphere(convex_ang,target_ang):
     """checking if the target points  are in or out of convex 
     Args:
         convex_ang: list of theta,phi points that defines the convex on a sphere
-        target_ang: theta,phi target lists in or out of the convex on a sphere
+        target_ang: theta,phi target lists in or out of the convex on a sphere, or TargetSet
 
     Returns:
         1 (in convex) or 0 (out of convex)
     """
     v=ang2vec(convex_ang[0],convex_ang[1])
-    w=ang2vec(target_ang[0],target_ang[1])
+    w=target_vectors(target_ang)
     Nvertex,Ncoordinate=np.shape(v)
     ring=vec2ring(v)
     cosa=cos_angle_from_normal_vectorAB(ring[:,0,:],ring[:,1,:],w)
     mask=(cosa>=0.0)*(cosa<=1.0)
     return np.prod(mask,axis=0)
 
+def convexes_ang2vec(convexes):
+    """convert convexes given by angles to vertex vectors
+    Args:
+        convexes: theta,phi of the vertices, (..., 2, Nvertex)
+
+    Returns:
+        vertex vectors, (..., Nvertex, 3)
+    """
+    convexes=np.asarray(convexes,dtype=np.float64)
+    v=ang2vec(convexes[...,0,:].ravel(),convexes[...,1,:].ravel())
+    return v.reshape(convexes.shape[:-2]+(convexes.shape[-1],3))
+
+def edge_normals(vertices):
+    """normal vectors of the edges of convexes (the same edges as vec2ring)
+    Args:
+        vertices: vertex vectors of convexes, (..., Nvertex, 3)
+
+    Returns:
+        normal vectors of the edges, (..., Nedge=Nvertex, 3)
+    """
+    vertices=np.asarray(vertices,dtype=np.float64)
+    return np.cross(np.roll(vertices,1,axis=-2),vertices)
+
+def _as_target_vec(target_vec):
+    """unit vectors of the targets as a 2D float array
+    Args:
+        target_vec: unit vectors of the targets, (Ntarget, 3) or (3,), or TargetSet
+
+    Returns:
+        unit vectors of the targets, (Ntarget, 3), float32 is kept as is
+    """
+    if isinstance(target_vec,TargetSet):
+        return target_vec.vec
+    target_vec=np.atleast_2d(np.asarray(target_vec))
+    if target_vec.dtype != np.float32:
+        target_vec=target_vec.astype(np.float64,copy=False)
+    return target_vec
+
+def _inout_block(normals,target_vec):
+    """in/out mask of a block of convexes
+    Args:
+        normals: edge normals, (Nblock, Ngroup, Nedge, 3)
+        target_vec: target unit vectors, (Ntarget, 3)
+
+    Returns:
+        inout mask, (Nblock, Ngroup, Ntarget)
+    """
+    Nblock,Ngroup,Nedge,Ncoordinate=np.shape(normals)
+    cosa=normals.reshape(-1,Ncoordinate)@target_vec.T
+    cosa=cosa.reshape((Nblock,Ngroup,Nedge,len(target_vec)))
+    return np.all(cosa>=0.0,axis=2)
+
+def _block_size(Nblock,Nrow,Ntarget,max_elements):
+    """block sizes of (convex, target) chunks
+    Args:
+        Nblock: number of blocks along the first axis
+        Nrow: number of edge normals in one block
+        Ntarget: number of targets
+        max_elements: maximum number of elements of a temporary array
+
+    Returns:
+        number of blocks per chunk, number of targets per chunk
+    """
+    nt=max(1,min(Ntarget,max_elements//Nrow))
+    nb=max(1,min(Nblock,max_elements//(Nrow*nt)))
+    return nb,nt
+
+def inout_convexes_on_sphere(normals,target_vec,max_elements=2**22):
+    """checking if the targets are in or out of many convexes in one pass
+    Args:
+        normals: edge normal vectors of the convexes, (..., Nedge, 3), see edge_normals
+        target_vec: unit vectors of the targets, (Ntarget, 3), or TargetSet
+        max_elements: maximum number of elements of the temporary array in a chunk
+
+    Returns:
+        inout mask (in = True, out = False), (..., Ntarget)
+
+    Notes:
+        The target vectors are assumed to be unit vectors, for which the upper bound test of inout_convex_on_sphere (cos <= 1) is always satisfied. The test is done in float32 when the target vectors are float32.
+    """
+    target_vec=_as_target_vec(target_vec)
+    normals=np.asarray(normals,dtype=target_vec.dtype)
+    lead=normals.shape[:-2]
+    Nedge=normals.shape[-2]
+    n=normals.reshape((-1,1)+normals.shape[-2:])
+    Nconvex=len(n)
+    Ntarget=len(target_vec)
+    mask=np.empty((Nconvex,Ntarget),dtype=np.bool_)
+    nb,nt=_block_size(Nconvex,Nedge,Ntarget,max_elements)
+    for i in range(0,Nconvex,nb):
+        for j in range(0,Ntarget,nt):
+            mask[i:i+nb,j:j+nt]=_inout_block(n[i:i+nb],target_vec[j:j+nt])[:,0,:]
+    return mask.reshape(lead+(Ntarget,))
+
+def count_convexes_on_sphere(normals,target_vec,max_elements=2**22,dtype=np.int32,backend=None):
+    """counting the number of times each target falls in convexes
+    Args:
+        normals: edge normal vectors of the convexes, (Ncount, ..., Nedge, 3), see edge_normals
+        target_vec: unit vectors of the targets, (Ntarget, 3), or TargetSet
+        max_elements: maximum number of elements of the temporary array in a chunk
+        dtype: integer type of the counts
+        backend: backend of the counting kernel, "numpy", "numba" or None (numba if installed), see inout_kernel.count_inout
+
+    Returns:
+        hit counts, (Ntarget,)
+
+    Notes:
+        The first axis of normals is counted. The convexes along the remaining axes (e.g. four chips of a pointing, (Npointing, 4, Nedge, 3)) are combined by OR, i.e. a target is counted at most once per entry of the first axis.
+    """
+    target_vec=_as_target_vec(target_vec)
+    normals=np.asarray(normals,dtype=target_vec.dtype)
+    Nrow=int(np.prod(normals.shape[1:-1]))
+    counts=np.zeros(len(target_vec),dtype=dtype)
+    return count_inout(normals,target_vec,counts,chunk_size=max(1,max_elements//Nrow),backend=backend)
+
 def inout_single_square_convex(targets,center,PA,width):
     """checking if targets are in or out single square convex
     
@@ -201,26 +422,21 @@ def inout_four_square_convexes(targets, convexes):
     """checking if targets are in or out four square convexes
     
     Args:
-        targets: targets ang position list
+        targets: targets ang position list or TargetSet
         convexes: convexes
 
     Returns:
         answer: inout mask of four detectors (in = 1 or out = 0 mask) (N,)
     """    
-    Ntarget=np.shape(targets)[1]
-    answers=np.zeros(Ntarget,dtype=np.bool_)
-    for each_convex in convexes:
-        ans=inout_convex_on_sphere(each_convex,targets)        
-        ans=np.array(ans,dtype=np.bool_)
-        answers = answers + ans
-    #print(np.shape(answers), "four detector")
-    return answers
+    w=target_vectors(targets)
+    normals=edge_normals(convexes_ang2vec(convexes))
+    return np.any(inout_convexes_on_sphere(normals,w),axis=0)
 
 def inout_detector(targets,l_center,b_center,PA_deg, width_mm=22.4, each_width_mm=19.52,  EFL_mm=4370.0):
     """checking if targets are in or out four square convexes
     
     Args:
-        targets: targets
+        targets: targets coordinate list (in radian) or TargetSet
         l_center: center of galactic coordinate, l (deg)
         b_center: center of galactic coordinate, b (deg)
         PA_deg: position angle in deg
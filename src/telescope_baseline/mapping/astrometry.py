@@ -0,0 +1,122 @@
+"""per-star astrometric accuracy from coverage counts and photometric S/N
+
+ * the per-frame accuracy is scaled from the accuracy of a standard-magnitude star by the S/N of each star (photometry.snr)
+ * the final accuracy is the per-frame accuracy divided by the square root of the number of frames, from the streamed hit counts
+ * stars brighter than the saturation magnitude (or saturated in a frame), fainter than the faint end, or never observed get NaN
+
+"""
+import numpy as np
+from telescope_baseline.mapping.coverage import CoverageAccumulator
+
+
+def frame_accuracy(hw, band, ac_ref=6000.0, mag_ref=None, texposure=12.5, tframe=12.5, napix=15, effnpix=None, calc=None):
+    """astrometric accuracy per frame
+
+    Args:
+        hw: magnitudes of the stars, (N,)
+        band: band of mag.list whose zero point is used for the photon counts of hw and mag_ref (mag.list has no Hw band, see Notes)
+        ac_ref: accuracy per frame of a star of mag_ref in micro arcsec
+        mag_ref: magnitude of the reference star (default: Parameters.standard_magnitude)
+        texposure: exposure time in s
+        tframe: time for one frame in s
+        napix: number of the pixels in aperture
+        effnpix: conversion for the brightest pixel (optional, no saturation check in a frame if None)
+        calc: SNRCalculator (default: SNRCalculator(), i.e. the current Parameters)
+
+    Returns:
+        accuracy per frame in micro arcsec, (N,), saturation flags (N,)
+
+    Notes:
+        The accuracy is ac_ref x snr(mag_ref)/snr(hw). With pure photon noise it is ac_ref/sqrt(Nstar), Nstar=10**(-0.4 (hw - mag_ref)), the scaling used in examples/MPSv1.py, independent of band.
+        The zero point of band only sets the absolute photon counts, i.e. the weight of the dark and readout noises and the saturation flags. Hw magnitudes are not converted: with band="H" they are treated as H magnitudes, which approximates the Hw zero point (Hw - H depends on the color of each star, see photometry.Hw_coeff).
+    """
+    from telescope_baseline.photometry.snr import SNRCalculator
+    from telescope_baseline.tools.mission.parameters import Parameters
+    if calc is None:
+        calc = SNRCalculator()
+    if mag_ref is None:
+        mag_ref = Parameters.get_instance().standard_magnitude
+    hw = np.asarray(hw, dtype='f8')
+    res = calc.noise_from_mag(np.append(hw, mag_ref), band, texposure, tframe, napix, effnpix=effnpix)
+    snr = res.snr
+    return ac_ref*snr[-1]/snr[:-1], res.sat[:-1]
+
+
+def astrometric_accuracy(counts, hw, band, frames_per_count=1.0, saturation_magnitude=None, faint_end_magnitude=None, **kwargs):
+    """final astrometric accuracy of the stars
+
+    Args:
+        counts: hit counts of the stars, e.g. CoverageAccumulator.counts, (N,)
+        hw: magnitudes of the stars, (N,)
+        band: band of mag.list for the photon counts of hw, see frame_accuracy
+        frames_per_count: number of frames per hit count (e.g. exposures per pointing)
+        saturation_magnitude: stars brighter than this are excluded (default: Parameters.saturation_magnitude)
+        faint_end_magnitude: stars fainter than this are excluded (default: Parameters.faint_end_magnitude)
+        kwargs: options of frame_accuracy
+
+    Returns:
+        accuracy in micro arcsec, (N,), NaN for the excluded or unobserved stars
+    """
+    from telescope_baseline.tools.mission.parameters import Parameters
+    par = Parameters.get_instance()
+    if saturation_magnitude is None:
+        saturation_magnitude = par.saturation_magnitude
+    if faint_end_magnitude is None:
+        faint_end_magnitude = par.faint_end_magnitude
+    hw = np.asarray(hw, dtype='f8')
+    ac, sat = frame_accuracy(hw, band, **kwargs)
+    nframe = np.asarray(counts, dtype='f8')*frames_per_count
+    valid = (nframe > 0) & ~sat & (hw >= saturation_magnitude) & (hw <= faint_end_magnitude)
+    final = np.full(len(hw), np.nan)
+    final[valid] = ac[valid]/np.sqrt(nframe[valid])
+    return final
+
+
+class AstrometryPipeline:
+    """Streaming pipeline from pointings to per-star astrometric accuracy.
+
+    Pointings are fed to a CoverageAccumulator, so only the per-star hit counts are kept; accuracy() converts them with astrometric_accuracy in one vectorized call.
+
+    Examples:
+
+        >>> pipeline = AstrometryPipeline(targets, hw, "H", frames_per_count=scale)
+        >>> for i in range(Ng*Ng):
+        >>>     pipeline.add_convexes(fillgap_large_frame(...))
+        >>> final_ac = pipeline.accuracy()
+    """
+
+    def __init__(self, targets, hw, band, frames_per_count=1.0, index=None, dtype=np.int32, **kwargs):
+        """
+        Args:
+            targets: TargetSet or targets coordinate list (theta, phi) in radian
+            hw: magnitudes of the targets, (N,)
+            band: band of mag.list for the photon counts of hw, see frame_accuracy
+            frames_per_count: number of frames per hit count
+            index: TargetIndex of the same targets (optional)
+            dtype: integer type of the counts
+            kwargs: options of astrometric_accuracy and frame_accuracy
+        """
+        self.coverage = CoverageAccumulator(targets, dtype=dtype, index=index)
+        self.hw = np.asarray(hw, dtype='f8')
+        if len(self.hw) != len(self.coverage.counts):
+            raise ValueError("hw should have the same length as targets.")
+        self.band = band
+        self.frames_per_count = frames_per_count
+        self.kwargs = kwargs
+
+    @property
+    def counts(self):
+        """hit counts of the targets"""
+        return self.coverage.counts
+
+    def add(self, vertices):
+        """feed pointings given by vertex vectors, see CoverageAccumulator.add"""
+        return self.coverage.add(vertices)
+
+    def add_convexes(self, convexesset):
+        """feed pointings given by angles, see CoverageAccumulator.add_convexes"""
+        return self.coverage.add_convexes(convexesset)
+
+    def accuracy(self):
+        """final astrometric accuracy in micro arcsec, NaN for the excluded or unobserved stars"""
+        return astrometric_accuracy(self.coverage.counts, self.hw, self.band, frames_per_count=self.frames_per_count, **self.kwargs)
@@ -0,0 +1,138 @@
+"""columnar, memory-mapped cache of the derived catalog columns
+
+ * the derived columns (theta, phi, l, b, hw, vec) are stored as .npy files in a directory keyed by the sha1 of the source file
+ * the sha1 is kept in a sidecar keyed by (path, size, mtime_ns), so warm loads do not read the source file
+ * the loader memory-maps the .npy files, so repeat runs skip the coordinate transform and worker processes share the pages
+
+"""
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+import numpy as np
+from telescope_baseline.tools.cache import default_cache_dir
+
+COLUMNS=("theta","phi","l","b","hw","vec")
+#: version of the derived columns, part of the cache key; bump it when the derivation changes
+CACHE_VERSION=2
+
+
+def source_hash(filename, blocksize=2**20):
+    """sha1 of the source file
+
+    Args:
+        filename: source file
+        blocksize: read size in bytes
+
+    Returns:
+        hex digest
+    """
+    h=hashlib.sha1()
+    with open(filename,"rb") as f:
+        for block in iter(lambda: f.read(blocksize),b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def source_key(filename, cachedir=None):
+    """sha1 of the source file, memoized in a sidecar by (path, size, mtime_ns)
+
+    The source is hashed again only when its size or modification time changes.
+
+    Args:
+        filename: source file
+        cachedir: root of the cache (default: default_cache_dir())
+
+    Returns:
+        hex digest, the same as source_hash(filename)
+    """
+    if cachedir is None:
+        cachedir=default_cache_dir()
+    path=os.path.abspath(filename)
+    st=os.stat(path)
+    stamp={"path":path,"size":st.st_size,"mtime_ns":st.st_mtime_ns}
+    sidecar=os.path.join(cachedir,"sources",hashlib.sha1(path.encode()).hexdigest()+".json")
+    try:
+        with open(sidecar) as f:
+            record=json.load(f)
+        if all(record.get(k)==v for k,v in stamp.items()):
+            return record["sha1"]
+    except (OSError,ValueError,KeyError):
+        pass
+    stamp["sha1"]=source_hash(path)
+    # the sidecar is only an optimization; an unwritable cache falls back to hashing every time
+    try:
+        os.makedirs(os.path.dirname(sidecar),exist_ok=True)
+        fd,tmp=tempfile.mkstemp(dir=os.path.dirname(sidecar),prefix=".tmp-")
+        try:
+            with os.fdopen(fd,"w") as f:
+                json.dump(stamp,f)
+            os.replace(tmp,sidecar)
+        except OSError:
+            os.remove(tmp)
+            raise
+    except OSError:
+        pass
+    return stamp["sha1"]
+
+
+def cache_path(hdffile, cachedir=None):
+    """cache directory of the source file
+
+    Args:
+        hdffile: source HDF
+        cachedir: root of the cache (default: default_cache_dir())
+
+    Returns:
+        path of the cache directory of hdffile
+    """
+    if cachedir is None:
+        cachedir=default_cache_dir()
+    stem=os.path.splitext(os.path.basename(hdffile))[0]
+    return os.path.join(cachedir,stem+"-"+source_key(hdffile,cachedir)+"-v"+str(CACHE_VERSION))
+
+
+def build_catalog_cache(hdffile, cachedir=None):
+    """convert the source HDF to the columnar cache
+
+    Args:
+        hdffile: source HDF (ra, dec, phot_hw_mag)
+        cachedir: root of the cache (default: default_cache_dir())
+
+    Returns:
+        path of the cache directory
+    """
+    from telescope_baseline.mapping.read_catalog import jasmine_columns
+    path=cache_path(hdffile,cachedir)
+    if os.path.isdir(path):
+        return path
+    columns=jasmine_columns(hdffile)
+    root=os.path.dirname(path)
+    os.makedirs(root,exist_ok=True)
+    # written to a temporary directory and renamed, so that concurrent readers never see a partial cache
+    tmp=tempfile.mkdtemp(dir=root,prefix=".tmp-")
+    try:
+        for key in COLUMNS:
+            np.save(os.path.join(tmp,key+".npy"),np.ascontiguousarray(columns[key]))
+        os.rename(tmp,path)
+    except OSError:
+        shutil.rmtree(tmp,ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+    return path
+
+
+def load_catalog_cache(hdffile, cachedir=None, mmap_mode="r"):
+    """load the derived columns from the cache, building it if needed
+
+    Args:
+        hdffile: source HDF (ra, dec, phot_hw_mag)
+        cachedir: root of the cache (default: default_cache_dir())
+        mmap_mode: mmap_mode of np.load ("r" for read-only memory maps, None to read into memory)
+
+    Returns:
+        dict of the columns: theta, phi (radian), l, b (deg), hw, vec (N, 3)
+    """
+    path=build_catalog_cache(hdffile,cachedir)
+    return {key: np.load(os.path.join(path,key+".npy"),mmap_mode=mmap_mode) for key in COLUMNS}
@@ -0,0 +1,119 @@
+"""coverage accumulator
+
+ * pointings are fed as they are generated; only per-target hit counts are kept
+
+"""
+import numpy as np
+from telescope_baseline.mapping.aperture import convexes_ang2vec, edge_normals, inout_convexes_on_sphere, count_convexes_on_sphere
+from telescope_baseline.mapping.targetset import target_vectors
+
+
+class CoverageAccumulator:
+    """Streaming accumulator of the per-target hit counts.
+
+    Peak memory is O(Ntarget) in addition to a chunk of max_elements. If record is True, the (pointing_id, target_id) pairs of the hits are also kept as a sparse COO record.
+
+    Attributes:
+        counts (ndarray): hit counts of the targets, (Ntarget,)
+        Npointing (int): number of the pointings fed so far
+        record (bool): if True, (pointing_id, target_id) pairs are recorded
+    """
+    def __init__(self, targets, dtype=np.int32, record=False, index=None, max_elements=2**22):
+        """
+        Args:
+            targets: TargetSet or targets coordinate list (theta, phi) in radian
+            dtype: integer type of the counts (e.g. np.int16 or np.int32); add raises OverflowError instead of wrapping around
+            record: if True, (pointing_id, target_id) pairs are recorded
+            index: TargetIndex of the same targets (optional), used to prune the in/out tests
+            max_elements: maximum number of elements of the temporary array in a chunk
+        """
+        self.target_vec=target_vectors(targets)
+        self.counts=np.zeros(len(self.target_vec),dtype=dtype)
+        self.Npointing=0
+        self.record=record
+        self.index=index
+        self.max_elements=max_elements
+        self._pointing_id=[]
+        self._target_id=[]
+
+    def add(self, vertices):
+        """feed pointings
+
+        Args:
+            vertices: vertex vectors of the pointings, (Npointing, Nchip, Nvertex, 3) or (Npointing, Nvertex, 3)
+
+        Returns:
+            pointing ids assigned to the pointings
+        """
+        vertices=np.asarray(vertices,dtype=np.float64)
+        Npointing=len(vertices)
+        limit=np.iinfo(self.counts.dtype).max
+        # a pointing adds at most one hit to a target
+        if len(self.counts)>0 and int(np.max(self.counts))+Npointing>limit:
+            counts=self.counts
+            nrecord=len(self._pointing_id)
+            self.counts=counts.astype(np.int64)
+            try:
+                self._add(vertices)
+            finally:
+                wide,self.counts=self.counts,counts
+            if np.max(wide)>limit:
+                del self._pointing_id[nrecord:], self._target_id[nrecord:]
+                raise OverflowError("hit counts exceed the maximum of "+str(self.counts.dtype)+", use a larger dtype.")
+            self.counts[:]=wide
+        else:
+            self._add(vertices)
+        pointing_id=np.arange(self.Npointing,self.Npointing+Npointing)
+        self.Npointing+=Npointing
+        return pointing_id
+
+    def _add(self, vertices):
+        """count the hits of pointings into self.counts (and the record)"""
+        Npointing=len(vertices)
+        pointing_id=np.arange(self.Npointing,self.Npointing+Npointing)
+        if self.index is not None:
+            for pid,group in zip(pointing_id,vertices):
+                hits=self.index.hit_indices(group)
+                self.counts[hits]+=1
+                self._append(np.full(len(hits),pid),hits)
+        elif not self.record:
+            normals=edge_normals(vertices)
+            self.counts+=count_convexes_on_sphere(normals,self.target_vec,max_elements=self.max_elements,dtype=self.counts.dtype)
+        else:
+            normals=edge_normals(vertices).reshape((Npointing,-1)+vertices.shape[-2:])
+            Ntarget=len(self.target_vec)
+            nb=max(1,self.max_elements//max(1,Ntarget*normals.shape[1]))
+            for i in range(0,Npointing,nb):
+                mask=np.any(inout_convexes_on_sphere(normals[i:i+nb],self.target_vec,max_elements=self.max_elements),axis=1)
+                self.counts+=np.sum(mask,axis=0,dtype=self.counts.dtype)
+                p,t=np.nonzero(mask)
+                self._append(pointing_id[i:i+nb][p],t)
+
+    def add_convexes(self, convexesset):
+        """feed pointings given by angles
+
+        Args:
+            convexesset: convexes of the pointings, (..., Nchip, 2, Nvertex), e.g. ditheringmap (Npointing, 4, 2, 4) or fillgap_large_frame (4, 3, 4, 4, 2, 4)
+
+        Returns:
+            pointing ids assigned to the pointings
+        """
+        vertices=convexes_ang2vec(convexesset)
+        return self.add(vertices.reshape((-1,)+vertices.shape[-3:]))
+
+    def _append(self, pointing_id, target_id):
+        if self.record:
+            self._pointing_id.append(np.asarray(pointing_id,dtype=np.int64))
+            self._target_id.append(np.asarray(target_id,dtype=np.int64))
+
+    def coo(self):
+        """sparse record of the hits
+
+        Returns:
+            pointing_id, target_id (COO format)
+        """
+        if not self.record:
+            raise ValueError("record=False, the hits are not recorded.")
+        if len(self._pointing_id)==0:
+            return np.zeros(0,dtype=np.int64),np.zeros(0,dtype=np.int64)
+        return np.concatenate(self._pointing_id),np.concatenate(self._target_id)
@@ -0,0 +1,90 @@
+"""fast ICRS to galactic transform by a fixed rotation matrix
+
+ * the ICRS unit vectors are rotated directly, without SkyCoord
+ * the rotation is applied chunk by chunk into a preallocated (N, 3) array
+
+"""
+import numpy as np
+
+#: rotation matrix from ICRS to galactic, v_gal = ICRS_TO_GALACTIC @ v_icrs. The columns are the ICRS x, y, z axes transformed by astropy SkyCoord(...).galactic (astropy 6.0), i.e. including the frame bias between ICRS and FK5 J2000.
+ICRS_TO_GALACTIC=np.array([
+    [-0.05487565771259163, -0.8734370519556159, -0.48383507361671546],
+    [0.4941094371927268, -0.4448297212232952, 0.7469821839866676],
+    [-0.8676661375596576, -0.19807633727300053, 0.4559838136873016]])
+
+
+def radec2vec(ra, dec, out=None):
+    """ICRS unit vectors
+
+    Args:
+        ra: right ascension in deg, (N,)
+        dec: declination in deg, (N,)
+        out: output array, (N, 3) (optional)
+
+    Returns:
+        unit vectors in ICRS, (N, 3)
+    """
+    ra=np.radians(np.asarray(ra,dtype=np.float64))
+    dec=np.radians(np.asarray(dec,dtype=np.float64))
+    if out is None:
+        out=np.empty((len(ra),3))
+    cosdec=np.cos(dec)
+    np.multiply(cosdec,np.cos(ra),out=out[:,0])
+    np.multiply(cosdec,np.sin(ra),out=out[:,1])
+    np.sin(dec,out=out[:,2])
+    return out
+
+
+def icrs2galactic_vec(ra, dec, out=None, chunksize=2**20):
+    """galactic unit vectors from ICRS ra, dec
+
+    Args:
+        ra: right ascension in deg, (N,)
+        dec: declination in deg, (N,)
+        out: output array, (N, 3) (optional), filled in place
+        chunksize: number of targets per chunk
+
+    Returns:
+        unit vectors in the galactic coordinates, (N, 3)
+    """
+    N=len(ra)
+    if out is None:
+        out=np.empty((N,3))
+    buf=np.empty((min(chunksize,N),3))
+    for i in range(0,N,chunksize):
+        j=min(i+chunksize,N)
+        w=radec2vec(ra[i:j],dec[i:j],out=buf[:j-i])
+        np.dot(w,ICRS_TO_GALACTIC.T,out=out[i:j])
+    return out
+
+
+def vec2lb(vec):
+    """galactic longitude and latitude from the unit vectors
+
+    Args:
+        vec: unit vectors in the galactic coordinates, (N, 3)
+
+    Returns:
+        l in radian in [0, 2 pi), b in radian
+    """
+    vec=np.asarray(vec)
+    l=np.arctan2(vec[:,1],vec[:,0])
+    l[l<0.0]+=2.0*np.pi
+    b=np.arctan2(vec[:,2],np.hypot(vec[:,0],vec[:,1]))
+    return l,b
+
+
+def icrs2galactic(ra, dec, chunksize=2**20):
+    """galactic coordinates from ICRS ra, dec
+
+    Args:
+        ra: right ascension in deg, (N,)
+        dec: declination in deg, (N,)
+        chunksize: number of targets per chunk
+
+    Returns:
+        l in radian in [0, 2 pi), b in radian, unit vectors (N, 3)
+    """
+    vec=icrs2galactic_vec(ra,dec,chunksize=chunksize)
+    l,b=vec2lb(vec)
+    return l,b,vec
@@ -0,0 +1,149 @@
+"""fused in/out counting kernel
+
+ * the targets out of the bounding cap of a group (e.g. four chips of a pointing) are rejected first
+ * the edges are tested one by one and rejected targets are dropped immediately (early rejection)
+ * scratch buffers are allocated once per chunk and reused with out= arguments
+ * the hits are written straight into an integer count vector
+ * numba is used if installed; otherwise the pure-NumPy kernel is used
+ * the kernel is serial; parallelism over pointings is given by sweep.SweepExecutor
+
+"""
+import numpy as np
+
+_numba_kernel = None
+
+
+def _get_numba_kernel():
+    """compile the numba kernel on first use
+
+    Returns:
+        the numba kernel, or None if numba is not installed
+    """
+    global _numba_kernel
+    if _numba_kernel is None:
+        try:
+            import numba
+        except ImportError:
+            return None
+
+        @numba.njit(cache=True)
+        def kernel(normals, c, cosr, target_vec, counts):
+            Ncount, Ngroup, Nedge, _=normals.shape
+            for t in range(target_vec.shape[0]):
+                x=target_vec[t, 0]
+                y=target_vec[t, 1]
+                z=target_vec[t, 2]
+                for p in range(Ncount):
+                    if cosr[p] > 0.0 and c[p, 0]*x+c[p, 1]*y+c[p, 2]*z < cosr[p]:
+                        continue
+                    for g in range(Ngroup):
+                        inside=True
+                        for e in range(Nedge):
+                            n=normals[p, g, e]
+                            if n[0]*x+n[1]*y+n[2]*z < 0.0:
+                                inside=False
+                                break
+                        if inside:
+                            counts[t]+=1
+                            break
+        _numba_kernel=kernel
+    return _numba_kernel
+
+
+def group_caps(normals):
+    """bounding caps of the groups of convexes, computed from the edge normals
+
+    Args:
+        normals: edge normal vectors, (Ncount, Ngroup, Nedge, 3)
+
+    Returns:
+        unit vectors of the cap centers (Ncount, 3), cos of the cap radii (Ncount,)
+
+    Notes:
+        The vertex between the edges e and e+1 is parallel to cross(n_e, n_e+1); its sign is chosen so that it is on the inner side of the edge e+2.
+    """
+    normals=np.asarray(normals, dtype=np.float64)
+    u=np.cross(normals, np.roll(normals, -1, axis=-2))
+    sign=np.sum(u*np.roll(normals, -2, axis=-2), axis=-1)
+    u=u*np.where(sign < 0.0, -1.0, 1.0)[..., np.newaxis]
+    u=u/np.linalg.norm(u, axis=-1)[..., np.newaxis]
+    u=u.reshape(len(u), -1, 3)
+    c=np.sum(u, axis=1)
+    c=c/np.linalg.norm(c, axis=-1)[:, np.newaxis]
+    cosr=np.min(np.einsum('pvk,pk->pv', u, c), axis=1)
+    return c, cosr
+
+
+def _rejection_caps(normals, dtype):
+    """bounding caps with a margin for the early rejection"""
+    c, cosr=group_caps(normals)
+    return c.astype(dtype), cosr-1.e-6
+
+
+def _count_numpy(normals, target_vec, counts, chunk_size):
+    """pure-NumPy kernel, see count_inout"""
+    Ncount, Ngroup, Nedge, _=normals.shape
+    Ntarget=len(target_vec)
+    c, cosr=_rejection_caps(normals, target_vec.dtype)
+    nt=max(1, min(chunk_size, Ntarget))
+    dot=np.empty(nt, dtype=target_vec.dtype)
+    inside=np.empty(nt, dtype=np.bool_)
+    for j in range(0, Ntarget, nt):
+        w=target_vec[j:j+nt]
+        m=len(w)
+        for p in range(Ncount):
+            # early rejection by the bounding cap of the group (valid for caps smaller than a hemisphere)
+            if cosr[p] > 0.0:
+                np.dot(w, c[p], out=dot[:m])
+                np.greater_equal(dot[:m], cosr[p], out=inside[:m])
+                idx=np.flatnonzero(inside[:m])
+            else:
+                idx=np.arange(m)
+            if len(idx) == 0:
+                continue
+            wc=w[idx]
+            hit=np.zeros(len(idx), dtype=np.bool_)
+            for g in range(Ngroup):
+                n=normals[p, g]
+                sel=np.flatnonzero(~hit)
+                for e in range(Nedge):
+                    if len(sel) == 0:
+                        break
+                    sel=sel[wc[sel]@n[e] >= 0.0]
+                hit[sel]=True
+            counts[j+idx[hit]]+=1
+    return counts
+
+
+def count_inout(normals, target_vec, counts=None, chunk_size=2**16, backend=None):
+    """counting the number of times each target falls in convexes with the fused kernel
+
+    Args:
+        normals: edge normal vectors of the convexes, (Ncount, ..., Nedge, 3)
+        target_vec: unit vectors of the targets, (Ntarget, 3), float64 or float32
+        counts: integer count vector to be accumulated in place, (Ntarget,) (optional)
+        chunk_size: number of targets per chunk (size of the scratch buffers)
+        backend: "numpy", "numba" or None (numba if installed, otherwise numpy)
+
+    Returns:
+        hit counts, (Ntarget,)
+
+    Notes:
+        The first axis of normals is counted and the convexes along the remaining axes are combined by OR, the same as aperture.count_convexes_on_sphere.
+    """
+    target_vec=np.ascontiguousarray(target_vec)
+    normals=np.asarray(normals, dtype=target_vec.dtype)
+    normals=np.ascontiguousarray(normals.reshape((normals.shape[0], -1)+normals.shape[-2:]))
+    if counts is None:
+        counts=np.zeros(len(target_vec), dtype=np.int32)
+    if backend not in (None, "numpy", "numba"):
+        raise ValueError("backend should be numpy, numba or None.")
+    if backend != "numpy":
+        kernel=_get_numba_kernel()
+        if kernel is not None:
+            c, cosr=_rejection_caps(normals, target_vec.dtype)
+            kernel(normals, c, cosr, target_vec, counts)
+            return counts
+        if backend == "numba":
+            raise ImportError("numba is not installed.")
+    return _count_numpy(normals, target_vec, counts, chunk_size)
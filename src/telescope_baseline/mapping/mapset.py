@@ -4,8 +4,11 @@
 
 """
 import numpy as np
-import tqdm
-from telescope_baseline.mapping.aperture import lb_detector_unit, four_square_convexes, inout_four_square_convexes, ang_detector_unit, lb2ang, ang2lb
+from telescope_baseline.mapping.aperture import lb_detector_unit, four_square_convexes, ang_detector_unit, lb2ang, ang2lb
+from telescope_baseline.mapping.aperture import convexes_ang2vec, edge_normals, inout_convexes_on_sphere
+from telescope_baseline.mapping.aperture import detector_unit_vec, four_square_vertices, vertices2convexes
+from telescope_baseline.mapping.pixelfunc import ang2vec
+from telescope_baseline.mapping.targetset import target_vectors
 
 def ditheringmap(l_center,b_center,PA_deg,  dithering_width_mm, Ndither, width_mm=22.4, each_width_mm=19.52,  EFL_mm=4370.0, left=0.0, top=0.0):
     """make convexes set of (extended) L shape formation
@@ -23,43 +26,62 @@ def ditheringmap(l_center,b_center,PA_deg,  dithering_width_mm, Ndither, width_m
         top: shift to top of the upper two fields 
 
     Returns:
-        convexesset: convexes set
+        convexesset: convexes set, ndarray (Nx*Ny, 4, 2, 4)
+
+    Notes:
+        The convexes set is an ndarray, not a list as in earlier versions; use list(convexesset) (or np.concatenate) to extend it.
 
     """
-    center=lb2ang(l_center,b_center)
+    vertices=ditheringmap_vertices(l_center,b_center,PA_deg,  dithering_width_mm, Ndither, width_mm=width_mm, each_width_mm=each_width_mm,  EFL_mm=EFL_mm)
+    return vertices2convexes(vertices)
+
+def ditheringmap_vertices(l_center,b_center,PA_deg,  dithering_width_mm, Ndither, width_mm=22.4, each_width_mm=19.52,  EFL_mm=4370.0):
+    """make vertex vectors of the dithering map in one vectorized pass
+    
+    Args:
+        l_center: center of galactic coordinate, l (deg)
+        b_center: center of galactic coordinate, b (deg)
+        PA_deg: position angle in deg
+        dithering_width_mm: dithering width in mm
+        Ndither: [Nx,Ny] of the ditherings
+        width_mm: the separation of detector chips
+        each_width_mm: the chip width in the unit of mm
+        EFL_mm: effective focal length in the unit of mm
+
+    Returns:
+        vertex vectors, (Nx*Ny, 4 chips, 4 vertices, 3), in the same order as ditheringmap
+
+    """
+    center=ang2vec(*lb2ang(l_center,b_center))
     PA=PA_deg/180.0*np.pi
     width=width_mm/EFL_mm
     each_width=each_width_mm/EFL_mm
     dithering_width=dithering_width_mm/width_mm/2
-    
-    convexesset=[]
-    for i in tqdm.tqdm(range(0,Ndither[0])):
-        for j in range(0,Ndither[1]):
-            pos=ang_detector_unit("R",dithering_width*i,center,PA,width)
-            convexes=four_square_convexes(ang_detector_unit("B",dithering_width*j,pos,PA,width), PA, width, each_width)
-            convexesset.append(convexes)
 
-    return convexesset
+    i=np.arange(Ndither[0])
+    j=np.arange(Ndither[1])
+    pos=detector_unit_vec("R",dithering_width*i,center,PA,width)
+    centers=detector_unit_vec("B",dithering_width*j[np.newaxis,:],pos[:,np.newaxis,:],PA,width)
+    return four_square_vertices(centers.reshape(-1,3),PA,width,each_width)
 
 
 def inout_convexesset(targets,convexesset):
     """checking if targets are in or out (extended) convexesset
     
     Args:
-        targats: targets coordinate list (in radian)
+        targats: targets coordinate list (in radian) or TargetSet
         convexesset: convexesset
 
     Returns:
-        answer: inout mask sequence (in = 1 or out = 0 mask), (4, N)
+        answer: inout mask sequence (in = 1 or out = 0 mask), (Nconvexes, N)
+
+    Notes:
+        Use coverage.CoverageAccumulator to count the hits without holding the masks.
                                              
     """
-    
-    ans=[]
-    for convexes in tqdm.tqdm(convexesset):
-        a=inout_four_square_convexes(targets, convexes)
-        ans.append(a)
-
-    return ans
+    w=target_vectors(targets)
+    normals=edge_normals(convexes_ang2vec(convexesset))
+    return np.any(inout_convexes_on_sphere(normals,w),axis=1)
 
 
 def Lshape(l_center,b_center,PA_deg, width_mm=22.4, each_width_mm=19.52,  EFL_mm=4370.0, left=0.0, top=0.0):
@@ -78,6 +100,9 @@ def Lshape(l_center,b_center,PA_deg, width_mm=22.4, each_width_mm=19.52,  EFL_mm
     Returns:
         convexesset: convexes set
 
+    Notes:
+        Four fields built with scalar calls of ang_detector_unit and four_square_convexes (not vectorized); use ditheringmap_vertices for large grids of pointings.
+
     """
     center=lb2ang(l_center,b_center)
     PA=PA_deg/180.0*np.pi
@@ -104,7 +129,7 @@ def inout_Lshape(targets,convexesset):
     """checking if targets are in or out (extended) L shape formation
     
     Args:
-        targats: targets coordinate list (in radian)
+        targats: targets coordinate list (in radian) or TargetSet
         convexesset: convexesset
 
     Returns:
@@ -128,6 +153,9 @@ def large_frame(l_center,b_center,PA_deg, width_mm=22.4, each_width_mm=19.52,  E
 
     Returns:
         in/out large frame
+
+    Notes:
+        Three scalar Lshape calls (not vectorized).
     """
     #shift
     l_center,b_center=lb_detector_unit("L",left,l_center,b_center, PA_deg, width_mm=width_mm, EFL_mm=EFL_mm)
@@ -155,7 +183,7 @@ def inout_large_frame(targets,large_convex):
     """in or out large frame
 
     Args:
-        targats: targets coordinate list (in radian)
+        targats: targets coordinate list (in radian) or TargetSet
         large_convex: large_convex
     Returns:
         inout mask sequence of inout mask of four detectors (in = 1 or out = 0 mask), (3,4,N)
@@ -182,6 +210,9 @@ def fillgap_large_frame(l_center,b_center,PA_deg, width_mm=22.4, each_width_mm=1
 
     Returns:
         fillgap large convex, (4,3,4,N)
+
+    Notes:
+        Four scalar large_frame calls (not vectorized).
     """
     pos=[]
     pos1=large_frame(l_center,b_center,PA_deg, width_mm=width_mm, each_width_mm=each_width_mm, EFL_mm=EFL_mm, left=0.125+left,top=-0.125/2.0+top)
@@ -199,11 +230,14 @@ def inout_fillgap_large_frame(targets, fillgap_large_convexes):
     """inout fill gap dithering 
 
     Args:
-        targets: targets
+        targets: targets coordinate list (in radian) or TargetSet
         fillgap_large_convex: fillgap_large_convex
 
     Returns:
-        inout mask sequence of inout mask of four detectors (in = 1 or out = 0 mask), (3,4,N)
+        inout mask sequence of inout mask of four detectors (in = 1 or out = 0 mask), (4,3,4,N)
+
+    Notes:
+        Use coverage.CoverageAccumulator to count the hits without holding the masks.
     """
     ans=[]
     for large_convex in fillgap_large_convexes:
@@ -1,7 +1,7 @@
-import matplotlib.pyplot as plt
 import numpy as np
 from telescope_baseline.mapping.aperture import ang2lb
-from matplotlib import patches
+from telescope_baseline.mapping.raster import rasterize
+from matplotlib.collections import PolyCollection
 
 def convert_to_convexes(larger_convex):
     """ Convert convexesset, large_convex or larger convex to convexes
@@ -29,7 +29,33 @@ def convert_to_convexes(larger_convex):
 
 
 
-def add_region(pos,ax,autoshift=True,alpha=0.3):
+def footprint_vertices(pos,autoshift=True,decimate=1,merge=None):
+    """convert convexes to vertices in (l, b) at once
+
+    Args:
+       pos: convexes (Nconvex, 2, Nvertex)
+       autoshift: if True, convert l to -180, 180 deg (a convex across l=180 deg is kept contiguous)
+       decimate: draw every decimate-th convex
+       merge: cell size in deg; convexes whose centers fall in the same cell are drawn once (None: no merging)
+
+    Returns:
+       vertices (Nconvex', Nvertex, 2) in deg
+    """
+    pos=np.asarray(pos,dtype=float)[::decimate]
+    l,b=ang2lb((pos[:,0,:],pos[:,1,:]))
+    if autoshift:
+        l=np.mod(l+180.0,360.0)-180.0
+        # vertices are unwrapped relative to the first one, not to split a convex across l=180 deg
+        l=l[:,:1]+np.mod(l-l[:,:1]+180.0,360.0)-180.0
+    xy=np.stack([l,b],axis=-1)
+    if merge is not None and len(xy)>0:
+        cell=np.floor(np.mean(xy,axis=1)/merge).astype(np.int64)
+        _,first=np.unique(cell,axis=0,return_index=True)
+        xy=xy[np.sort(first)]
+    return xy
+
+
+def add_region(pos,ax,autoshift=True,alpha=0.3,decimate=1,merge=None):
     """plot a patch of detector region on sky
 
     Args:
@@ -37,48 +63,114 @@ def add_region(pos,ax,autoshift=True,alpha=0.3):
        ax: ax for plotting
        autoshift: if True, convert l to -180, 180 deg
        alpha: alpha
+       decimate: draw every decimate-th convex
+       merge: cell size in deg to draw the overlapping convexes once (see footprint_vertices)
+
+    Returns:
+       PolyCollection of all the convexes
 
     """
-    M=np.shape(pos)[0]
-    for i in range(M):
-        xy=np.array(ang2lb(pos[i,:]))
-        if autoshift:
-            xy[0]=np.mod(xy[0]+180.0,360.0)-180.0
-        xy=xy.T
-        patch = patches.Polygon(xy=xy, closed=True,fill=False,ls="--",lw=0.5,color="green",alpha=alpha)
-        ax.add_patch(patch)
+    xy=footprint_vertices(pos,autoshift=autoshift,decimate=decimate,merge=merge)
+    collection=PolyCollection(xy,closed=True,facecolors="none",edgecolors="green",linestyles="--",linewidths=0.5,alpha=alpha)
+    ax.add_collection(collection)
+    ax.autoscale_view()
+    return collection
 
 
-def plot_targets(l,b,ans,pos=None,outfile="map.png"):
-    """plot targets in general
+def show_raster(ax,raster,cmap="CMRmap",vmin=None,vmax=None,alpha=None):
+    """draw a raster of per-star values with imshow
+
+    Args:
+       ax: ax for plotting
+       raster: LBRaster
+       cmap: colormap
+       vmin: colorbar min value
+       vmax: colorbar max value
+       alpha: alpha
+
+    Returns:
+       AxesImage (empty pixels, and zero pixels for count and sum, are transparent)
+    """
+    img=np.ma.masked_invalid(raster.image())
+    if raster.reducer in ("count","sum"):
+        img=np.ma.masked_equal(img,0.0)
+    return ax.imshow(img,extent=raster.extent,origin="lower",interpolation="nearest",cmap=cmap,vmin=vmin,vmax=vmax,alpha=alpha)
+
+
+def draw_targets(ax,l,b,ans,pos=None,raster=None):
+    """draw targets in general on ax
 
     Args:
+       ax: ax for plotting
        l: l
        b: b
        ans: targets position
        pos: detector position
-       outfile: output file name
+       raster: (Nl, Nb) to draw the star density and the hit numbers on a raster instead of every star
 
     """
-    
-    fig=plt.figure()
-    ax=fig.add_subplot(111,aspect=1.0)
-    ax.plot(l,b,".",alpha=0.03,color="black")
-    if len(np.shape(ans))==1:
+    if raster is not None:
+        if len(np.shape(ans))==1:
+            nhit=np.zeros(len(l),dtype=bool)
+            nhit[ans]=True
+        else:
+            nhit=np.count_nonzero(ans,axis=0)
+        density=rasterize(l,b,bins=raster)
+        show_raster(ax,density,cmap="Greys")
+        hits=rasterize(l,b,values=nhit,bins=raster,reducer="sum",lrange=density.lrange,brange=density.brange)
+        show_raster(ax,hits,cmap="Reds",alpha=0.7)
+        if len(np.shape(ans))==1:
+            ax.set_title("N in Detector ="+str(np.count_nonzero(nhit))+" Hw<12.5")
+    elif len(np.shape(ans))==1:
+        ax.plot(l,b,".",alpha=0.03,color="black")
         ax.plot(l[ans],b[ans],".",alpha=0.1)
         ax.set_title("N in Detector ="+str(len(b[ans]))+" Hw<12.5")
     else:
+        ax.plot(l,b,".",alpha=0.03,color="black")
         for ans_each in ans:
             ax.plot(l[ans_each],b[ans_each],".",alpha=0.05,color="C3")
     if pos is not None:
         add_region(pos,ax)
     ax.set_xlabel("l (deg)")
     ax.set_ylabel("b (deg)")
-    plt.gca().invert_xaxis()
+    ax.invert_xaxis()
+
+def plot_targets(l,b,ans,pos=None,outfile="map.png",raster=None):
+    """plot targets in general
+
+    Args:
+       l: l
+       b: b
+       ans: targets position
+       pos: detector position
+       outfile: output file name
+       raster: (Nl, Nb) to draw the star density and the hit numbers on a raster instead of every star
+
+    """
+    import matplotlib.pyplot as plt
+    
+    fig=plt.figure()
+    ax=fig.add_subplot(111,aspect=1.0)
+    draw_targets(ax,l,b,ans,pos=pos,raster=raster)
     plt.savefig(outfile)        
     plt.show()
 
-def plot_n_targets(l,b,nans,pos=None,outfile="nmap.png",cmap="CMRmap"):
+def draw_n_targets(ax,l,b,nans,pos=None,cmap="CMRmap",raster=None,reducer="mean"):
+    """draw number of targets on ax, see plot_n_targets
+
+    Returns:
+       mappable for the colorbar
+    """
+    if raster is not None:
+        cb=show_raster(ax,rasterize(l,b,values=nans,bins=raster,reducer=reducer),cmap=cmap)
+    else:
+        cb=ax.scatter(l,b,s=1,c=nans,alpha=0.9,cmap=cmap)
+    if pos is not None:
+        add_region(pos,ax)
+    ax.set_facecolor('gray')
+    return cb
+
+def plot_n_targets(l,b,nans,pos=None,outfile="nmap.png",cmap="CMRmap",raster=None,reducer="mean"):
     """plot number of targets 
 
     Args:
@@ -88,17 +180,32 @@ def plot_n_targets(l,b,nans,pos=None,outfile="nmap.png",cmap="CMRmap"):
        pos: detector position
        outfile: output file name
        cmap: colormap
+       raster: (Nl, Nb) to draw nans reduced on a raster instead of every star
+       reducer: reducer of the raster (count, sum, mean, min, max or median)
     """
+    import matplotlib.pyplot as plt
 
     fig=plt.figure()
     ax=fig.add_subplot(111,aspect=1.0)
-    cb=ax.scatter(l,b,s=1,c=nans,alpha=0.9,cmap=cmap)
+    cb=draw_n_targets(ax,l,b,nans,pos=pos,cmap=cmap,raster=raster,reducer=reducer)
+    labels(cb,outfile,ax)
+
+def draw_ae_targets(ax,l,b,nans,pos=None,cmap="CMRmap",vmax=50.0,raster=None,reducer="median"):
+    """draw astrometric errors of targets on ax, see plot_ae_targets
+
+    Returns:
+       mappable for the colorbar
+    """
+    if raster is not None:
+        cb=show_raster(ax,rasterize(l,b,values=nans,bins=raster,reducer=reducer),cmap=cmap,vmax=vmax)
+    else:
+        cb=ax.scatter(l,b,s=1,c=nans,alpha=0.9, cmap=cmap, vmax=vmax)
     if pos is not None:
         add_region(pos,ax)
-    ax.set_facecolor('gray')
-    labels(cb,outfile,ax)
+    ax.set_facecolor('black')
+    return cb
 
-def plot_ae_targets(l,b,nans,pos=None,outfile="aemap.png",cmap="CMRmap",vmax=50.0):
+def plot_ae_targets(l,b,nans,pos=None,outfile="aemap.png",cmap="CMRmap",vmax=50.0,raster=None,reducer="median"):
     """plot astrometric errors targets 
 
     Args:
@@ -109,15 +216,28 @@ def plot_ae_targets(l,b,nans,pos=None,outfile="aemap.png",cmap="CMRmap",vmax=50.
        outfile: output file name
        cmap: colormap
        vmax: colorbar max value
+       raster: (Nl, Nb) to draw nans reduced on a raster instead of every star
+       reducer: reducer of the raster (count, sum, mean, min, max or median)
     """
+    import matplotlib.pyplot as plt
     fig=plt.figure()
     ax=fig.add_subplot(111,aspect=1.0)
-    cb=ax.scatter(l,b,s=1,c=nans,alpha=0.9, cmap=cmap, vmax=vmax)
-    if pos is not None:
-        add_region(pos,ax)
-    ax.set_facecolor('black')
+    cb=draw_ae_targets(ax,l,b,nans,pos=pos,cmap=cmap,vmax=vmax,raster=raster,reducer=reducer)
     labels(cb,outfile,ax)
 
+def draw_labels(cb,ax):
+    """put colorbar and label on ax
+
+    Args:
+       cb: mappable for the colorbar
+       ax: ax
+
+    """
+    ax.figure.colorbar(cb,ax=ax,shrink=0.5)
+    ax.set_xlabel("l (deg)")
+    ax.set_ylabel("b (deg)")
+    ax.invert_xaxis()
+
 def labels(cb,outfile,ax):
     """put label
 
@@ -127,13 +247,19 @@ def labels(cb,outfile,ax):
        ax: ax
 
     """
-    plt.colorbar(cb,shrink=0.5)
-    ax.set_xlabel("l (deg)")
-    ax.set_ylabel("b (deg)")
-    plt.gca().invert_xaxis()
+    import matplotlib.pyplot as plt
+    draw_labels(cb,ax)
     plt.savefig(outfile)        
     plt.show()
 
+def draw_hist_n(ax,nans,scale=1.0):
+    """draw histogram of N of targets on ax, see hist_n_targets"""
+    nans=nans[nans>0]
+    orign=int(np.max(nans))
+    nans=nans*scale
+    ax.hist(nans, bins=orign, alpha=0.5, ec='navy', range=(0.5*scale, np.max(nans)+0.5*scale))
+    ax.set_xlabel("N")
+    ax.set_ylabel("number of the targets")
     
 def hist_n_targets(nans,scale=1.0,outfile="nhist.png"):
     """plot histogram of N of targets
@@ -144,17 +270,19 @@ def hist_n_targets(nans,scale=1.0,outfile="nhist.png"):
        outfile: output file name
 
     """
-    nans=nans[nans>0]
-    orign=int(np.max(nans))
-    nans=nans*scale
+    import matplotlib.pyplot as plt
     fig=plt.figure()
     ax=fig.add_subplot(111)
-    cb=ax.hist(nans, bins=orign, alpha=0.5, ec='navy', range=(0.5*scale, np.max(nans)+0.5*scale))
-    ax.set_xlabel("N")
-    ax.set_ylabel("number of the targets")
+    draw_hist_n(ax,nans,scale=scale)
     plt.savefig(outfile)        
     plt.show()
 
+def draw_hist_ae(ax,final_ac):
+    """draw histogram of astrometric errors of targets on ax, see hist_ae_targets"""
+    ax.hist(final_ac[final_ac<100.0], alpha=0.5, bins=25, ec='navy')
+    ax.set_ylabel("number of targets")
+    ax.set_xlabel("final accuracy [umas]")
+
 def hist_ae_targets(final_ac,outfile="fac.png"):
     """plot histogram of astrometric errors of targets
 
@@ -163,31 +291,44 @@ def hist_ae_targets(final_ac,outfile="fac.png"):
        outfile: output file name
 
     """
+    import matplotlib.pyplot as plt
 
     fig=plt.figure()    
     ax=fig.add_subplot(111)
-    cb=ax.hist(final_ac[final_ac<100.0], alpha=0.5, bins=25, ec='navy')
-    ax.set_ylabel("number of targets")
-    ax.set_xlabel("final accuracy [umas]")
+    draw_hist_ae(ax,final_ac)
     plt.savefig(outfile)        
     plt.show()
 
 
-def plot_convexes(l,b,pos,outfile="pos.png"):
+def draw_convexes(ax,l,b,pos,decimate=1,merge=None,raster=None):
+    """draw convexes on ax, see plot_convexes
+
+    Args:
+       raster: (Nl, Nb) to draw the star density on a raster instead of every star
+    """
+    if raster is not None:
+        show_raster(ax,rasterize(l,b,bins=raster),cmap="Greys",alpha=0.5)
+    else:
+        ax.plot(l,b,".",alpha=0.01,color="gray")
+    add_region(pos,ax,alpha=0.7,decimate=decimate,merge=merge)
+    ax.set_xlabel("l (deg)")
+    ax.set_ylabel("b (deg)")
+    ax.invert_xaxis()
+
+def plot_convexes(l,b,pos,outfile="pos.png",decimate=1,merge=None):
     """plot convexes
 
     Args:
        l: l
        b: b
        convexes: convexes
+       decimate: draw every decimate-th convex
+       merge: cell size in deg to draw the overlapping convexes once
     """
+    import matplotlib.pyplot as plt
 
     fig=plt.figure()
     ax=fig.add_subplot(111,aspect=1.0)
-    ax.plot(l,b,".",alpha=0.01,color="gray")
-    add_region(pos,ax,alpha=0.7)
-    ax.set_xlabel("l (deg)")
-    ax.set_ylabel("b (deg)")
-    plt.gca().invert_xaxis()
+    draw_convexes(ax,l,b,pos,decimate=decimate,merge=merge)
     plt.savefig(outfile)        
     plt.show()
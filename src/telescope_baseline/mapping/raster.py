@@ -0,0 +1,172 @@
+"""aggregation of per-star values onto an (l, b) raster
+
+ * stars are binned with np.bincount chunk by chunk; memory and time of plotting do not depend on the number of stars
+ * reducers: count, sum, mean, min, max and median (median from a per-pixel histogram of the values)
+
+"""
+import numpy as np
+
+REDUCERS=("count", "sum", "mean", "min", "max", "median")
+
+
+class LBRaster:
+    """Streaming (l, b) raster of per-star values.
+
+    Attributes:
+        lrange (tuple): (min, max) of l in deg
+        brange (tuple): (min, max) of b in deg
+        shape (tuple): (Nb, Nl) of the raster
+        reducer (str): count, sum, mean, min, max or median
+        count (ndarray): number of stars in the pixels, (Nb*Nl,)
+    """
+
+    def __init__(self, lrange, brange, bins=(400, 200), reducer="count", value_range=None, value_bins=256):
+        """
+        Args:
+            lrange: (min, max) of l in deg
+            brange: (min, max) of b in deg
+            bins: (Nl, Nb) number of pixels along l and b
+            reducer: count, sum, mean, min, max or median
+            value_range: (min, max) of the values for median (required for median)
+            value_bins: number of value bins for median (the median is accurate to the bin width)
+        """
+        if reducer not in REDUCERS:
+            raise ValueError("reducer should be one of "+", ".join(REDUCERS)+".")
+        if reducer=="median" and value_range is None:
+            raise ValueError("value_range is required for median.")
+        if lrange[1]<=lrange[0] or brange[1]<=brange[0]:
+            raise ValueError("lrange and brange should be (min, max) with min < max.")
+        self.lrange=(float(lrange[0]),float(lrange[1]))
+        self.brange=(float(brange[0]),float(brange[1]))
+        self.shape=(int(bins[1]),int(bins[0]))
+        self.reducer=reducer
+        npix=self.shape[0]*self.shape[1]
+        self.count=np.zeros(npix,dtype=np.int64)
+        if reducer in ("sum","mean"):
+            self._sum=np.zeros(npix)
+        elif reducer=="min":
+            self._ext=np.full(npix,np.inf)
+        elif reducer=="max":
+            self._ext=np.full(npix,-np.inf)
+        elif reducer=="median":
+            self.value_range=(float(value_range[0]),float(value_range[1]))
+            self.value_bins=value_bins
+            self._hist=np.zeros(npix*value_bins,dtype=np.int64)
+
+    @property
+    def extent(self):
+        """extent for imshow, (lmin, lmax, bmin, bmax)"""
+        return self.lrange+self.brange
+
+    def _pixel(self, l, b):
+        """pixel ids of the stars, -1 outside the raster"""
+        nb,nl=self.shape
+        il=np.floor((l-self.lrange[0])/(self.lrange[1]-self.lrange[0])*nl).astype(np.int64)
+        ib=np.floor((b-self.brange[0])/(self.brange[1]-self.brange[0])*nb).astype(np.int64)
+        # stars on the upper edges are included
+        il[l==self.lrange[1]]=nl-1
+        ib[b==self.brange[1]]=nb-1
+        inside=(il>=0)&(il<nl)&(ib>=0)&(ib<nb)
+        return np.where(inside,ib*nl+il,-1)
+
+    def add(self, l, b, values=None, chunksize=2**20):
+        """bin stars
+
+        Args:
+            l: l of the stars in deg, (N,)
+            b: b of the stars in deg, (N,)
+            values: values of the stars (e.g. hit numbers, astrometric errors), (N,), not needed for count; NaN values are skipped
+            chunksize: number of stars per chunk
+        """
+        if self.reducer!="count" and values is None:
+            raise ValueError("values are required for "+self.reducer+".")
+        npix=len(self.count)
+        for i in range(0,len(l),chunksize):
+            pix=self._pixel(np.asarray(l[i:i+chunksize],dtype='f8'),np.asarray(b[i:i+chunksize],dtype='f8'))
+            mask=pix>=0
+            if values is not None:
+                v=np.asarray(values[i:i+chunksize],dtype='f8')
+                mask&=np.isfinite(v)
+                v=v[mask]
+            pix=pix[mask]
+            self.count+=np.bincount(pix,minlength=npix)
+            if self.reducer in ("sum","mean"):
+                self._sum+=np.bincount(pix,weights=v,minlength=npix)
+            elif self.reducer=="min":
+                np.minimum.at(self._ext,pix,v)
+            elif self.reducer=="max":
+                np.maximum.at(self._ext,pix,v)
+            elif self.reducer=="median":
+                lo,hi=self.value_range
+                iv=np.clip(np.floor((v-lo)/(hi-lo)*self.value_bins).astype(np.int64),0,self.value_bins-1)
+                self._hist+=np.bincount(pix*self.value_bins+iv,minlength=len(self._hist))
+        return self
+
+    def image(self):
+        """reduced raster
+
+        Returns:
+            image, (Nb, Nl), NaN for empty pixels (except count and sum)
+        """
+        if self.reducer=="count":
+            img=self.count.astype('f8')
+        elif self.reducer=="sum":
+            img=self._sum.copy()
+        elif self.reducer=="mean":
+            with np.errstate(invalid="ignore",divide="ignore"):
+                img=self._sum/self.count
+        elif self.reducer in ("min","max"):
+            img=np.where(self.count>0,self._ext,np.nan)
+        else:
+            img=self._median()
+        return img.reshape(self.shape)
+
+    def _median(self):
+        """median from the cumulative value histograms, linearly interpolated in the bin"""
+        hist=self._hist.reshape(-1,self.value_bins)
+        cum=np.cumsum(hist,axis=1)
+        half=self.count/2.0
+        k=np.argmax(cum>=half[:,np.newaxis],axis=1)
+        below=np.where(k>0,cum[np.arange(len(k)),k-1],0)
+        inbin=hist[np.arange(len(k)),k]
+        lo,hi=self.value_range
+        width=(hi-lo)/self.value_bins
+        with np.errstate(invalid="ignore",divide="ignore"):
+            med=lo+(k+(half-below)/inbin)*width
+        return np.where(self.count>0,med,np.nan)
+
+
+def _span(a):
+    """(min, max) of the finite values, widened if empty"""
+    a=np.asarray(a,dtype='f8')
+    a=a[np.isfinite(a)]
+    if len(a)==0:
+        return (0.0,1.0)
+    lo,hi=np.min(a),np.max(a)
+    return (lo,hi) if hi>lo else (lo-0.5,hi+0.5)
+
+
+def rasterize(l, b, values=None, bins=(400, 200), reducer="count", lrange=None, brange=None, chunksize=2**20, **kwargs):
+    """bin stars onto an (l, b) raster
+
+    Args:
+        l: l of the stars in deg, (N,)
+        b: b of the stars in deg, (N,)
+        values: values of the stars, (N,) (not needed for count)
+        bins: (Nl, Nb) number of pixels along l and b
+        reducer: count, sum, mean, min, max or median
+        lrange: (min, max) of l in deg (default: range of l)
+        brange: (min, max) of b in deg (default: range of b)
+        chunksize: number of stars per chunk
+        kwargs: value_range and value_bins for median (value_range defaults to the finite range of values)
+
+    Returns:
+        LBRaster
+    """
+    if lrange is None:
+        lrange=_span(l)
+    if brange is None:
+        brange=_span(b)
+    if reducer=="median" and kwargs.get("value_range") is None:
+        kwargs["value_range"]=_span(values)
+    return LBRaster(lrange,brange,bins=bins,reducer=reducer,**kwargs).add(l,b,values,chunksize=chunksize)
@@ -1,16 +1,53 @@
 import numpy as np
-import pandas as pd
-from astropy import units as u
-from astropy.coordinates import SkyCoord
+from telescope_baseline.mapping.targetset import TargetSet
+from telescope_baseline.mapping.pixelfunc import ang2vec
+from telescope_baseline.mapping.galactic import icrs2galactic
+from telescope_baseline.mapping.catalog_cache import load_catalog_cache
 
-def read_jasmine_targets(hdffile):
+def jasmine_columns(hdffile, use_skycoord=False):
+    """derived columns of JASMINE catalog
+
+        Args:
+            hdffile: HDF (ra,dec, ...)
+            use_skycoord: if True, astropy SkyCoord is used for the galactic coordinates instead of the fixed rotation matrix (galactic.ICRS_TO_GALACTIC)
+
+        Returns:
+            dict of the columns: theta, phi (radian), l, b (deg), hw, vec (N, 3)
+
+    """
+    import pandas as pd
+    dat=pd.read_hdf(hdffile)
+    return _derive_columns(dat["ra"].values,dat["dec"].values,dat["phot_hw_mag"].values,use_skycoord)
+
+def _derive_columns(ra, dec, hw, use_skycoord=False):
+    """derived columns from ra, dec (deg) and hw, see jasmine_columns"""
+    if use_skycoord:
+        from astropy import units as u
+        from astropy.coordinates import SkyCoord
+        c = SkyCoord(ra=ra*u.degree, dec=dec*u.degree, frame='icrs')
+        phi=c.galactic.l.radian
+        bg=c.galactic.b.radian
+        vec=ang2vec(np.pi/2.0-bg,phi).reshape(-1,3)
+    else:
+        phi,bg,vec=icrs2galactic(ra,dec)
+    theta=np.pi/2.0-bg
+    l=np.degrees(phi)
+    b=np.degrees(bg)
+    l[l>180]=l[l>180]-360
+    return {"theta":theta,"phi":phi,"l":l,"b":b,"hw":hw,"vec":vec}
+
+def read_jasmine_targets(hdffile, as_targetset=False, cache=False, cachedir=None, use_skycoord=False):
     """Read JASMINE catalog 
         
         Args:
             hdffile: HDF (ra,dec, ...) 
+            as_targetset: if True, the targets are returned as TargetSet with precomputed unit vectors
+            cache: if True, the derived columns are loaded from the columnar cache (built on the first call); l, b and Hw are returned as writable copies, while the vectors of a TargetSet stay read-only memory maps
+            cachedir: root of the cache (default: tools.cache.default_cache_dir())
+            use_skycoord: if True, astropy SkyCoord is used for the galactic coordinates instead of the fixed rotation matrix (ignored if cache=True)
 
         Returns:
-            targets coordinate list (in radian), l in deg, b in deg, Hw
+            targets coordinate list (in radian) or TargetSet, l in deg, b in deg, Hw
 
  
         Notes:
@@ -34,16 +71,86 @@ def read_jasmine_targets(hdffile):
 
     """
         
-    dat=pd.read_hdf(hdffile)
-    ra=dat["ra"].values
-    dec=dat["dec"].values
-    hw=dat["phot_hw_mag"].values
-    c = SkyCoord(ra=ra*u.degree, dec=dec*u.degree, frame='icrs')
-    phi=c.galactic.l.radian
-    theta=np.pi/2.0-c.galactic.b.radian
-    l=c.galactic.l.degree
-    b=c.galactic.b.degree
-    l[l>180]=l[l>180]-360
-    return np.array([theta,phi]),l,b, hw
+    if cache:
+        col=load_catalog_cache(hdffile,cachedir)
+        # writable like the uncached columns; only the (N, 3) vectors are left memory-mapped
+        col.update({key: np.array(col[key]) for key in ("l","b","hw")})
+    else:
+        col=jasmine_columns(hdffile,use_skycoord)
+    if as_targetset:
+        return TargetSet.from_columns(col["theta"],col["phi"],col["vec"]),col["l"],col["b"],col["hw"]
+    return np.array([col["theta"],col["phi"]]),col["l"],col["b"],col["hw"]
+
 
 
+def _hdf_nrows(hdffile):
+    """number of rows of the (single key) HDF, fixed or table format"""
+    import pandas as pd
+    with pd.HDFStore(hdffile,mode="r") as store:
+        storer=store.get_storer(store.keys()[0])
+        if storer.is_table:
+            return storer.nrows
+        return storer.shape[0]
+
+def _select(col, hw_range, l_range, b_range):
+    """mask of the magnitude cut and the (l, b) box"""
+    mask=np.ones(len(col["hw"]),dtype=bool)
+    for key,r in (("hw",hw_range),("l",l_range),("b",b_range)):
+        if r is not None:
+            v=np.asarray(col[key])
+            if r[0] is not None:
+                mask&=(v>=r[0])
+            if r[1] is not None:
+                mask&=(v<r[1])
+    return mask
+
+def iter_jasmine_targets(hdffile, chunksize=2**18, hw_range=None, l_range=None, b_range=None, cache=False, cachedir=None):
+    """Read JASMINE catalog chunk by chunk with a magnitude cut and an (l, b) box
+
+        Args:
+            hdffile: HDF (ra,dec, ...)
+            chunksize: number of catalog rows read per chunk
+            hw_range: (min, max) of Hw, min <= hw < max; None for no bound (e.g. (None, 14.5))
+            l_range: (min, max) of l in deg in [-180, 180), min <= l < max
+            b_range: (min, max) of b in deg, min <= b < max
+            cache: if True, the chunks are sliced from the memory-mapped columnar cache (see catalog_cache)
+            cachedir: root of the cache (default: tools.cache.default_cache_dir())
+
+        Yields:
+            TargetSet, l in deg, b in deg, Hw, row indices in the catalog of the selected targets in a chunk
+
+        Notes:
+            Only one chunk is held in memory. From the HDF, the magnitude cut is applied before the coordinate transform, so faint rows are never transformed. Empty chunks are skipped.
+
+        Examples:
+
+            >>> acc=CoverageAccumulator(...)
+            >>> for targets,l,b,hw,index in iter_jasmine_targets("cat.hdf", hw_range=(None, 14.5), l_range=(-1.4, 0.7), b_range=(-0.6, 0.6)):
+            >>>     counts=count_convexes_on_sphere(normals, targets)
+
+    """
+    import pandas as pd
+    if cache:
+        columns=load_catalog_cache(hdffile,cachedir)
+        nrows=len(columns["hw"])
+    else:
+        nrows=_hdf_nrows(hdffile)
+    for start in range(0,nrows,chunksize):
+        stop=min(start+chunksize,nrows)
+        if cache:
+            col={key:val[start:stop] for key,val in columns.items()}
+            mask=_select(col,hw_range,l_range,b_range)
+        else:
+            dat=pd.read_hdf(hdffile,start=start,stop=stop)
+            hw=dat["phot_hw_mag"].values
+            pre=_select({"hw":hw},hw_range,None,None)
+            col=_derive_columns(dat["ra"].values[pre],dat["dec"].values[pre],hw[pre])
+            mask=np.zeros(stop-start,dtype=bool)
+            mask[pre]=_select(col,None,l_range,b_range)
+            col={key:val[mask[pre]] for key,val in col.items()}
+        index=start+np.flatnonzero(mask)
+        if len(index)==0:
+            continue
+        if cache:
+            col={key:np.asarray(val[mask]) for key,val in col.items()}
+        yield TargetSet.from_columns(col["theta"],col["phi"],col["vec"]),col["l"],col["b"],col["hw"],index
@@ -0,0 +1,141 @@
+"""headless batch figures of survey configurations
+
+ * figures are drawn on a reused Agg Figure (no pyplot, no display) and cleared after each save
+ * configurations are rendered in parallel over a process pool; the star positions are sent to each worker once
+
+"""
+import os
+import numpy as np
+from multiprocessing import Pool
+
+#: figures rendered by default, with the configuration keys they need
+FIGURES={"coverage":("nans",),"nhist":("nans",),"accuracy":("final_ac",),"footprints":("pos",)}
+
+_worker_renderer=None
+
+
+def _draw_coverage(fig,l,b,config,raster):
+    from telescope_baseline.mapping.plot_mapping import draw_n_targets, draw_labels
+    ax=fig.add_subplot(111,aspect=1.0)
+    cb=draw_n_targets(ax,l,b,config["nans"],pos=config.get("pos"),cmap=config.get("cmap","CMRmap"),raster=raster)
+    draw_labels(cb,ax)
+
+
+def _draw_nhist(fig,l,b,config,raster):
+    from telescope_baseline.mapping.plot_mapping import draw_hist_n
+    draw_hist_n(fig.add_subplot(111),np.asarray(config["nans"]),scale=config.get("scale",1.0))
+
+
+def _draw_accuracy(fig,l,b,config,raster):
+    from telescope_baseline.mapping.plot_mapping import draw_ae_targets, draw_labels
+    ax=fig.add_subplot(111,aspect=1.0)
+    cb=draw_ae_targets(ax,l,b,config["final_ac"],pos=config.get("pos"),cmap=config.get("cmap","CMRmap"),vmax=config.get("vmax",50.0),raster=raster)
+    draw_labels(cb,ax)
+
+
+def _draw_footprints(fig,l,b,config,raster):
+    from telescope_baseline.mapping.plot_mapping import draw_convexes
+    draw_convexes(fig.add_subplot(111,aspect=1.0),l,b,config["pos"],merge=config.get("merge"),raster=raster)
+
+
+_DRAW={"coverage":_draw_coverage,"nhist":_draw_nhist,"accuracy":_draw_accuracy,"footprints":_draw_footprints}
+
+
+class FigureRenderer:
+    """Renderer of the report figures of configurations on a single reused Agg figure.
+
+    A configuration is a dict with "name" (prefix of the output files) and the data of the figures: "nans" (hit counts) for coverage and nhist, "final_ac" (accuracy) for accuracy, "pos" (convexes, see convert_to_convexes) for footprints and the regions on the maps. Optional keys: "cmap", "vmax", "scale" and "merge", with the defaults of the plot_mapping functions. Figures whose data are missing are skipped.
+    """
+    def __init__(self, l, b, outdir=".", names=tuple(FIGURES), raster=(400, 200), figsize=(6.4, 4.8), dpi=100, fmt="png"):
+        """
+        Args:
+            l: l of the stars in deg
+            b: b of the stars in deg
+            outdir: output directory
+            names: names of the figures (coverage, nhist, accuracy, footprints)
+            raster: (Nl, Nb) of the rasterized maps (None to draw every star)
+            figsize: figure size in inch
+            dpi: dpi
+            fmt: file format
+        """
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        for name in names:
+            if name not in _DRAW:
+                raise ValueError("unknown figure: "+name+", available: "+", ".join(_DRAW))
+        self.l=np.asarray(l)
+        self.b=np.asarray(b)
+        self.outdir=outdir
+        self.names=tuple(names)
+        self.raster=raster
+        self.dpi=dpi
+        self.fmt=fmt
+        self.fig=Figure(figsize=figsize)
+        FigureCanvasAgg(self.fig)
+
+    def render(self, config):
+        """render the figures of a configuration
+
+        Args:
+            config: configuration dict
+
+        Returns:
+            dict of the figure names and the output files
+        """
+        os.makedirs(self.outdir,exist_ok=True)
+        files={}
+        for name in self.names:
+            if any(config.get(key) is None for key in FIGURES[name]):
+                continue
+            outfile=os.path.join(self.outdir,str(config["name"])+"_"+name+"."+self.fmt)
+            try:
+                _DRAW[name](self.fig,self.l,self.b,config,self.raster)
+                self.fig.savefig(outfile,dpi=self.dpi)
+            finally:
+                self.fig.clf()
+            files[name]=outfile
+        return files
+
+
+def _init_renderer(*args):
+    """initializer of the workers: a renderer with the star positions"""
+    global _worker_renderer
+    _worker_renderer=FigureRenderer(*args)
+
+
+def _render_task(config):
+    """render a configuration in a worker"""
+    return _worker_renderer.render(config)
+
+
+def render_report(configs, l, b, outdir=".", names=tuple(FIGURES), raster=(400, 200), nproc=None, figsize=(6.4, 4.8), dpi=100, fmt="png"):
+    """render the figures of many configurations
+
+    Args:
+        configs: list of configuration dicts, see FigureRenderer
+        l: l of the stars in deg
+        b: b of the stars in deg
+        outdir: output directory
+        names: names of the figures (coverage, nhist, accuracy, footprints)
+        raster: (Nl, Nb) of the rasterized maps (None to draw every star)
+        nproc: number of processes (default: os.cpu_count()), nproc=1 renders in-process
+        figsize: figure size in inch
+        dpi: dpi
+        fmt: file format
+
+    Returns:
+        list of dicts of the figure names and the output files, in the order of configs
+
+    Examples:
+
+        >>> configs=[{"name":"Ndither%d"%n,"nans":nans[n],"final_ac":final_ac[n],"pos":pos[n]} for n in range(len(nans))]
+        >>> render_report(configs,l,b,outdir="report",nproc=8)
+    """
+    args=(l,b,outdir,names,raster,figsize,dpi,fmt)
+    nproc=os.cpu_count() if nproc is None else nproc
+    nproc=min(nproc,len(configs))
+    if nproc<=1:
+        renderer=FigureRenderer(*args)
+        return [renderer.render(config) for config in configs]
+    with Pool(nproc,initializer=_init_renderer,initargs=args) as pool:
+        return pool.map(_render_task,configs)
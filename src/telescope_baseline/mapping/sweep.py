@@ -0,0 +1,148 @@
+"""parallel execution of pointing sweeps
+
+ * target vectors are placed in shared memory once and attached by the workers
+ * each task receives only a shard of pointings and returns partial hit counts
+
+"""
+import os
+import numpy as np
+from multiprocessing import Pool, shared_memory, util
+from telescope_baseline.mapping.aperture import edge_normals, count_convexes_on_sphere
+from telescope_baseline.mapping.targetset import target_vectors
+
+_worker_shm=None
+_worker_vec=None
+
+
+def _attach(name, shape, dtype):
+    """initializer of the workers: attach the shared target vectors"""
+    global _worker_shm, _worker_vec
+    _worker_shm=shared_memory.SharedMemory(name=name)
+    _worker_vec=np.ndarray(shape, dtype=dtype, buffer=_worker_shm.buf)
+    # run at the normal exit of the worker process (atexit is not called in forked workers)
+    util.Finalize(None, _detach, exitpriority=10)
+
+
+def _detach():
+    """close the shared target vectors in a worker (the parent unlinks them)"""
+    global _worker_shm, _worker_vec
+    if _worker_shm is not None:
+        _worker_vec=None
+        _worker_shm.close()
+        _worker_shm=None
+
+
+def _count_shard(args):
+    """count the hits of a shard of pointings in a worker"""
+    vertices, max_elements, dtype=args
+    return count_convexes_on_sphere(edge_normals(vertices), _worker_vec, max_elements=max_elements, dtype=dtype)
+
+
+def _count_dtype(Npointing, dtype):
+    """dtype wide enough to count the hits of Npointing pointings"""
+    return dtype if Npointing <= np.iinfo(dtype).max else np.int64
+
+
+def _narrow(counts, dtype):
+    """cast the counts to dtype, raising OverflowError instead of wrapping around"""
+    if len(counts) > 0 and np.max(counts) > np.iinfo(dtype).max:
+        raise OverflowError("hit counts exceed the maximum of "+str(np.dtype(dtype))+", use a larger dtype.")
+    return counts.astype(dtype, copy=False)
+
+
+class SweepExecutor:
+    """Process-pool executor of pointing sweeps.
+
+    The pool and the shared target vectors are kept alive until close() (or the end of the with block), so many sweeps can be run without re-sending the targets.
+
+    Examples:
+
+        >>> with SweepExecutor(targets, nproc=64) as executor:
+        >>>     for i in range(Ng*Ng):
+        >>>         nans=nans+executor.count(vertices[i])
+    """
+    def __init__(self, targets, nproc=None, dtype=np.int32, max_elements=2**22):
+        """
+        Args:
+            targets: TargetSet or targets coordinate list (theta, phi) in radian
+            nproc: number of processes (default: os.cpu_count()), nproc=1 runs in-process
+            dtype: integer type of the counts; count raises OverflowError instead of wrapping around
+            max_elements: maximum number of elements of the temporary array in a chunk (per worker)
+        """
+        vec=np.ascontiguousarray(target_vectors(targets))
+        self.nproc=os.cpu_count() if nproc is None else nproc
+        self.dtype=dtype
+        self.max_elements=max_elements
+        self.Ntarget=len(vec)
+        self._shm=None
+        self._pool=None
+        if self.nproc > 1:
+            self._shm=shared_memory.SharedMemory(create=True, size=max(1, vec.nbytes))
+            try:
+                self._vec=np.ndarray(vec.shape, dtype=vec.dtype, buffer=self._shm.buf)
+                self._vec[:]=vec
+                self._pool=Pool(self.nproc, initializer=_attach, initargs=(self._shm.name, vec.shape, vec.dtype.str))
+            except BaseException:
+                self.close()
+                raise
+        else:
+            self._vec=vec
+
+    def count(self, vertices, nshard=None):
+        """count the hits of pointings, sharded over the pool
+
+        Args:
+            vertices: vertex vectors of the pointings, (Npointing, ..., Nvertex, 3)
+            nshard: number of shards (default: 4 x nproc)
+
+        Returns:
+            hit counts, (Ntarget,), identical to the serial count_convexes_on_sphere
+        """
+        vertices=np.asarray(vertices, dtype=np.float64)
+        if len(vertices) == 0:
+            return np.zeros(self.Ntarget, dtype=self.dtype)
+        if self._pool is None:
+            # a pointing adds at most one hit to a target, so narrow counts can only overflow for many pointings
+            return _narrow(count_convexes_on_sphere(edge_normals(vertices), self._vec, max_elements=self.max_elements, dtype=_count_dtype(len(vertices), self.dtype)), self.dtype)
+        if nshard is None:
+            nshard=4*self.nproc
+        shards=[s for s in np.array_split(vertices, min(nshard, len(vertices))) if len(s) > 0]
+        counts=np.zeros(self.Ntarget, dtype=np.int64)
+        tasks=[(s, self.max_elements, _count_dtype(len(s), self.dtype)) for s in shards]
+        for partial in self._pool.imap_unordered(_count_shard, tasks):
+            counts+=partial
+        return _narrow(counts, self.dtype)
+
+    def close(self):
+        """terminate the pool and release the shared memory"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool=None
+        if self._shm is not None:
+            self._vec=None
+            self._shm.close()
+            self._shm.unlink()
+            self._shm=None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def parallel_count(targets, vertices, nproc=None, dtype=np.int32):
+    """count the hits of pointings over a process pool
+
+    Args:
+        targets: TargetSet or targets coordinate list (theta, phi) in radian
+        vertices: vertex vectors of the pointings, (Npointing, ..., Nvertex, 3)
+        nproc: number of processes (default: os.cpu_count())
+        dtype: integer type of the counts (OverflowError instead of wrapping around)
+
+    Returns:
+        hit counts, (Ntarget,)
+    """
+    with SweepExecutor(targets, nproc=nproc, dtype=dtype) as executor:
+        return executor.count(vertices)
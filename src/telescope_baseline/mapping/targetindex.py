@@ -0,0 +1,133 @@
+"""spatial index of targets to prune in/out tests
+
+ * the targets are sorted by (theta, phi) grid cells once
+ * a group of convexes looks up only the cells overlapping its bounding cap
+
+"""
+import numpy as np
+from telescope_baseline.mapping.pixelfunc import vec2ang
+from telescope_baseline.mapping.targetset import target_vectors
+from telescope_baseline.mapping.aperture import edge_normals, inout_convexes_on_sphere
+
+
+class TargetIndex:
+    """Grid index of the targets on (theta, phi) cells.
+
+    Attributes:
+        cell (float): nominal cell size in radian
+        ntheta (int): number of cells along theta
+        nphi (int): number of cells along phi
+        order (ndarray): target indices sorted by cell, (N,)
+        vec (ndarray): unit vectors of the targets sorted by cell, (N, 3)
+        cells (ndarray): sorted ids of non-empty cells
+        starts (ndarray): start position of each non-empty cell in order, (Ncell+1,)
+    """
+    def __init__(self, targets, cell_deg=0.25):
+        """
+        Args:
+            targets: TargetSet or targets coordinate list (theta, phi) in radian
+            cell_deg: cell size in deg
+        """
+        vec=target_vectors(targets)
+        self.cell=cell_deg/180.0*np.pi
+        self.ntheta=int(np.ceil(np.pi/self.cell))
+        self.nphi=int(np.ceil(2.0*np.pi/self.cell))
+        self._dtheta=np.pi/self.ntheta
+        self._dphi=2.0*np.pi/self.nphi
+        theta,phi=vec2ang(np.asarray(vec,dtype=np.float64))
+        cellid=self._cellid(theta,phi)
+        self.order=np.argsort(cellid,kind='stable')
+        self.vec=np.ascontiguousarray(vec[self.order])
+        self.cells,start=np.unique(cellid[self.order],return_index=True)
+        self.starts=np.append(start,len(self.order))
+
+    def __len__(self):
+        return len(self.order)
+
+    def _cellid(self,theta,phi):
+        itheta=np.clip((theta/self._dtheta).astype(np.int64),0,self.ntheta-1)
+        iphi=np.clip((phi/self._dphi).astype(np.int64),0,self.nphi-1)
+        return itheta*self.nphi+iphi
+
+    def _cap_cells(self,vertices):
+        """ids of the cells overlapping the bounding cap of the vertices
+        Args:
+            vertices: vertex vectors, (..., 3)
+
+        Returns:
+            cell ids
+        """
+        v=np.asarray(vertices,dtype=np.float64).reshape(-1,3)
+        c=np.sum(v,axis=0)
+        c=c/np.linalg.norm(c)
+        r=np.max(np.arccos(np.clip(v@c,-1.0,1.0)))+1.e-9
+        thetac,phic=vec2ang(c)
+        thetac=thetac[0]
+        phic=phic[0]
+        it0=max(int((thetac-r)/self._dtheta),0)
+        it1=min(int((thetac+r)/self._dtheta),self.ntheta-1)
+        itheta=np.arange(it0,it1+1)
+        if thetac-r <= 0.0 or thetac+r >= np.pi or np.sin(r) >= np.sin(thetac):
+            iphi=np.arange(self.nphi)
+        else:
+            dphi=np.arcsin(np.sin(r)/np.sin(thetac))
+            ip0=int(np.floor((phic-dphi)/self._dphi))
+            ip1=int(np.floor((phic+dphi)/self._dphi))
+            if ip1-ip0+1 >= self.nphi:
+                iphi=np.arange(self.nphi)
+            else:
+                iphi=np.mod(np.arange(ip0,ip1+1),self.nphi)
+        return (itheta[:,np.newaxis]*self.nphi+iphi[np.newaxis,:]).ravel()
+
+    def candidates(self,vertices):
+        """positions (in the sorted arrays) of the candidate targets around the vertices
+
+        Args:
+            vertices: vertex vectors of a group of convexes, (..., Nvertex, 3)
+
+        Returns:
+            positions of the candidates in order/vec
+        """
+        cellids=self._cap_cells(vertices)
+        k=np.searchsorted(self.cells,cellids)
+        k=k[k<len(self.cells)]
+        k=np.unique(k)
+        k=k[np.isin(self.cells[k],cellids)]
+        start=self.starts[k]
+        length=self.starts[k+1]-start
+        if len(k)==0:
+            return np.zeros(0,dtype=np.int64)
+        offset=np.repeat(start-np.cumsum(length)+length,length)
+        return np.arange(np.sum(length))+offset
+
+    def hit_indices(self,vertices):
+        """indices of the targets in the convexes of a group
+
+        Args:
+            vertices: vertex vectors of a group of convexes (e.g. four chips), (..., Nvertex, 3)
+
+        Returns:
+            target indices in any of the convexes
+        """
+        cand=self.candidates(vertices)
+        normals=edge_normals(vertices).reshape(-1,np.shape(vertices)[-2],3)
+        mask=np.any(inout_convexes_on_sphere(normals,self.vec[cand]),axis=0)
+        return self.order[cand[mask]]
+
+    def count_convexes_on_sphere(self,vertices,dtype=np.int32):
+        """counting the number of times each target falls in convexes, using the index
+
+        Args:
+            vertices: vertex vectors of the convexes, (Ncount, ..., Nvertex, 3)
+            dtype: integer type of the counts
+
+        Returns:
+            hit counts, (Ntarget,)
+
+        Notes:
+            The same as aperture.count_convexes_on_sphere, the first axis is counted and the convexes along the remaining axes are combined by OR.
+        """
+        counts=np.zeros(len(self.order),dtype=dtype)
+        for group in vertices:
+            counts[self.hit_indices(group)]+=1
+        return counts
@@ -0,0 +1,103 @@
+"""target set with precomputed unit vectors
+
+"""
+import numpy as np
+from telescope_baseline.mapping.pixelfunc import ang2vec, vec2ang
+
+
+class TargetSet:
+    """Targets on a sphere whose unit vectors are computed and validated only once.
+
+    TargetSet can be given to every inout_* function in aperture and mapset in place of the (theta, phi) array of the targets.
+
+    Attributes:
+        theta (ndarray): co-latitude of the targets in radian, (N,)
+        phi (ndarray): longitude of the targets in radian, (N,)
+        vec (ndarray): C-contiguous unit vectors of the targets, (N, 3)
+    """
+    def __init__(self, theta, phi, dtype=np.float64):
+        """
+        Args:
+            theta: co-latitude of the targets in radian
+            phi: longitude of the targets in radian
+            dtype: float type of the unit vectors (np.float64 or np.float32)
+        """
+        self.theta=np.atleast_1d(np.asarray(theta,dtype=np.float64))
+        self.phi=np.atleast_1d(np.asarray(phi,dtype=np.float64))
+        if self.theta.shape != self.phi.shape:
+            raise ValueError("theta and phi should have the same shape.")
+        self.vec=np.ascontiguousarray(ang2vec(self.theta,self.phi).reshape(-1,3),dtype=dtype)
+
+    @classmethod
+    def from_ang(cls,ang,dtype=np.float64):
+        """make TargetSet from the (theta, phi) array
+
+        Args:
+            ang: targets coordinate list (theta, phi) in radian, (2, N)
+            dtype: float type of the unit vectors
+
+        Returns:
+            TargetSet
+        """
+        return cls(ang[0],ang[1],dtype=dtype)
+
+    @classmethod
+    def from_vec(cls,vec,dtype=np.float64):
+        """make TargetSet from unit vectors
+
+        Args:
+            vec: unit vectors of the targets, (N, 3)
+            dtype: float type of the unit vectors
+
+        Returns:
+            TargetSet
+        """
+        vec=np.asarray(vec)
+        theta,phi=vec2ang(vec)
+        ts=cls.__new__(cls)
+        ts.theta=theta
+        ts.phi=phi
+        ts.vec=np.ascontiguousarray(vec.reshape(-1,3),dtype=dtype)
+        return ts
+
+    @classmethod
+    def from_columns(cls,theta,phi,vec):
+        """make TargetSet from precomputed columns without recomputing them (e.g. memory-mapped catalog cache)
+
+        Args:
+            theta: co-latitude of the targets in radian, (N,)
+            phi: longitude of the targets in radian, (N,)
+            vec: C-contiguous unit vectors of the targets, (N, 3)
+
+        Returns:
+            TargetSet
+        """
+        if len(theta) != len(phi) or len(theta) != len(vec):
+            raise ValueError("theta, phi and vec should have the same length.")
+        ts=cls.__new__(cls)
+        ts.theta=theta
+        ts.phi=phi
+        ts.vec=np.ascontiguousarray(vec)
+        return ts
+
+    @property
+    def ang(self):
+        """targets coordinate list (theta, phi) in radian, (2, N)"""
+        return np.array([self.theta,self.phi])
+
+    def __len__(self):
+        return len(self.vec)
+
+
+def target_vectors(targets):
+    """unit vectors of the targets
+
+    Args:
+        targets: TargetSet or targets coordinate list (theta, phi) in radian
+
+    Returns:
+        unit vectors of the targets, (N, 3)
+    """
+    if isinstance(targets,TargetSet):
+        return targets.vec
+    return ang2vec(targets[0],targets[1])
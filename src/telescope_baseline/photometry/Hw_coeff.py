@@ -2,17 +2,12 @@
 
 import numpy as np
 import sys
-from matplotlib import pyplot as plt
-import glob
-import pandas as pd
 import os
-from multiprocessing import Pool
-from astropy import units as u
 import pkgutil
-import pkg_resources           
 from io import BytesIO
-from scipy import interpolate
-from scipy.optimize import minimize
+from telescope_baseline.photometry.colorfit import fit_color_relation
+
+# matplotlib, scipy and multiprocessing are imported on first use in the functions, to keep the import of this module light
 
 
 def load_stellar_spectra(file_path):
@@ -29,19 +24,19 @@ def load_stellar_spectra(file_path):
     return np.loadtxt(BytesIO(ascii_data), comments='#', dtype='f8').T
 
 
-def read_map_multi(spectra_all):
-    """Read multiple spectra in parallel.
+def read_map_multi(spectra_all, executor=None):
+    """Read multiple spectra.
 
     Args:
-        all spectral info
+        spectra_all: all spectral info
+        executor: PhotonExecutor (optional), its preloaded spectra are returned if given
 
     Returns:
         spectral data
     """
-    p = Pool(os.cpu_count())
-    data_spec = p.map(load_stellar_spectra, spectra_all)
-    p.close()
-    return data_spec
+    if executor is not None:
+        return executor.data_spec
+    return [load_stellar_spectra(x) for x in spectra_all]
 
 
 def cal_photon(input_arrays):
@@ -56,6 +51,7 @@ def cal_photon(input_arrays):
     # 1.透過関数をsplineで関数化.
     # 2.透過関数とFluxを波長を乗じて積分し、光子数に換算.
     # 3.最終的に比の計算を行うため、各係数は無視.
+    from scipy import interpolate
     spectra_array, filter_func, Av = input_arrays
 
     ff = interpolate.interp1d(x=filter_func[1],
@@ -73,29 +69,120 @@ def cal_photon(input_arrays):
     return photon
 
 
-def calphoton_map_multi(data_spec, filter_func, Av):
+def calphoton_map_multi(data_spec, filter_func, Av, executor=None):
     """compute photon for multiple dataset.
 
     Args:
         data_spec:
         filter_func:
         Av:
+        executor: PhotonExecutor (optional), holding the same spectra as data_spec
 
     Returns:
         photon?
     """
+    if executor is not None:
+        return executor.calphoton(filter_func, Av)
+    data_photon = [cal_photon((x, filter_func, Av)) for x in data_spec]
+    return np.array(data_photon, dtype='f8')
+
+
+_worker_spec = None
+
+
+def _preload_spectra(path, spectra_all):
+    """initializer of the workers: map the spectral library once per worker (or read the spectra if there is no cache)"""
+    global _worker_spec
+    from telescope_baseline.photometry.speclib import SpectralLibrary
+    if path is None:
+        _worker_spec = SpectralLibrary.in_memory(spectra_all).data_spec
+    else:
+        _worker_spec = SpectralLibrary(path).data_spec
 
-    data_array = [(x, filter_func, Av) for x in data_spec]
-    xlen = len(filter_func)
-    ylen = len(data_spec)
 
-    p = Pool(os.cpu_count())
+def _calphoton_task(args):
+    """compute photons of all the preloaded spectra for a (filter, Av) pair in a worker"""
+    filter_func, Av = args
+    return np.array([cal_photon((x, filter_func, Av)) for x in _worker_spec], dtype='f8')
 
-    data_photon = p.map(cal_photon, data_array)
-    p.close()
-    data_photon = np.array(data_photon, dtype='f8')
 
-    return data_photon
+class PhotonExecutor:
+    """Persistent executor of the photon computation over the stellar spectra.
+
+    The spectra are memory-mapped from the binary spectral library (speclib, if a cache directory is given) or loaded in memory, in the parent and in each worker when the pool is started; afterwards only (filter, Av) pairs are sent to the workers. The pool is started on the first workload larger than min_parallel (spectra x (filter, Av) pairs), smaller workloads run in-process.
+
+    Examples:
+
+        >>> with PhotonExecutor() as executor:
+        >>>     for Hw_l, Hw_u in passbands:
+        >>>         res, sigma, colors, ar_J_H, ar_Hw_H, residuals = compute_Hw_relation(Hw_l, Hw_u, executor=executor)
+    """
+
+    def __init__(self, spectra_all=None, nproc=None, min_parallel=1000, cachedir=None):
+        """
+        Args:
+            spectra_all: list of the spectrum files (default: read_spectra_all())
+            nproc: number of processes (default: os.cpu_count()), nproc=1 runs always in-process
+            min_parallel: minimum number of photon computations to use the pool
+            cachedir: root of the spectral library cache (default: $TELESCOPE_BASELINE_CACHE if set, otherwise the spectra are loaded in memory)
+        """
+        from telescope_baseline.photometry.speclib import load_spectral_library
+        if spectra_all is None:
+            spectra_all = read_spectra_all()
+        self.spectra_all = list(spectra_all)
+        library = load_spectral_library(self.spectra_all, cachedir)
+        self._library_path = library.path
+        self.data_spec = library.data_spec
+        self.nproc = os.cpu_count() if nproc is None else nproc
+        self.min_parallel = min_parallel
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            from multiprocessing import Pool
+            self._pool = Pool(self.nproc, initializer=_preload_spectra, initargs=(self._library_path, self.spectra_all))
+        return self._pool
+
+    def calphoton_many(self, tasks):
+        """compute photons for (filter, Av) pairs
+
+        Args:
+            tasks: list of (filter_func, Av)
+
+        Returns:
+            photons, (Ntask, Nspectra)
+        """
+        tasks = list(tasks)
+        if self.nproc > 1 and len(tasks)*len(self.data_spec) >= self.min_parallel:
+            photons = self._get_pool().map(_calphoton_task, tasks)
+        else:
+            photons = [[cal_photon((x, filter_func, Av)) for x in self.data_spec] for filter_func, Av in tasks]
+        return np.array(photons, dtype='f8').reshape(len(tasks), len(self.data_spec))
+
+    def calphoton(self, filter_func, Av):
+        """compute photons of all the spectra
+
+        Args:
+            filter_func: filter
+            Av: Av
+
+        Returns:
+            photons, (Nspectra,)
+        """
+        return self.calphoton_many([(filter_func, Av)])[0]
+
+    def close(self):
+        """terminate the pool"""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
 
 
 def load_filter():
@@ -176,12 +263,8 @@ def read_spectra_all():
         all spectra
 
     """
-    speclist=pkg_resources.resource_filename('telescope_baseline', 'data/speclist.txt')
-    f=open(speclist,"r")
-    spectra_all=f.readlines()
-    f.close()
-    spectra_all=[s.replace('\n', '') for s in spectra_all]
-    return spectra_all
+    speclist = pkgutil.get_data('telescope_baseline', 'data/speclist.txt')
+    return [s for s in speclist.decode().splitlines() if s]
 
 def calc_zero_magnitude_spectra(fil_J, fil_H, fil_Hw):
     """zero magnitude spectra
@@ -205,7 +288,7 @@ def calc_zero_magnitude_spectra(fil_J, fil_H, fil_Hw):
     p_Hwo = cal_photon([spec_a0v, fil_Hw, 0])
     return p_Jo, p_Ho, p_Hwo
 
-def calc_color_arrays(data_spec, fil_J, fil_H, fil_Hw, p_Jo, p_Ho, p_Hwo):
+def calc_color_arrays(data_spec, fil_J, fil_H, fil_Hw, p_Jo, p_Ho, p_Hwo, executor=None):
     """compute colors
 
     Args:
@@ -216,6 +299,7 @@ def calc_color_arrays(data_spec, fil_J, fil_H, fil_Hw, p_Jo, p_Ho, p_Hwo):
         p_Jo: zero magnitude of J?
         p_Ho:  zero magnitude of H?
         p_Hwo:  zero magnitude of Hw?
+        executor: PhotonExecutor (optional), holding the same spectra as data_spec
 
     Returns:
         ar_J_H: J-H array
@@ -227,10 +311,13 @@ def calc_color_arrays(data_spec, fil_J, fil_H, fil_Hw, p_Jo, p_Ho, p_Hwo):
     ar_Hw_H = []
     ar_J_H = []
     A_arr=[]
-    for Av in Av_ar:  # -- roop for Av
-        p_J = calphoton_map_multi(data_spec, fil_J, Av)
-        p_H = calphoton_map_multi(data_spec, fil_H, Av)
-        p_Hw = calphoton_map_multi(data_spec, fil_Hw, Av)
+    if executor is not None:
+        # all the (filter, Av) pairs are sent to the pool at once
+        photons = executor.calphoton_many([(fil, Av) for Av in Av_ar for fil in (fil_J, fil_H, fil_Hw)])
+    else:
+        photons = [calphoton_map_multi(data_spec, fil, Av) for Av in Av_ar for fil in (fil_J, fil_H, fil_Hw)]
+    for i, Av in enumerate(Av_ar):  # -- roop for Av
+        p_J, p_H, p_Hw = photons[3*i:3*i+3]
 
         rel_J = -2.5*(np.log10(p_J) - np.log10(p_Jo))
         rel_H = -2.5*(np.log10(p_H) - np.log10(p_Ho))
@@ -257,31 +344,50 @@ def calc_colors(ar_J_H, ar_Hw_H):
     return (np.ravel(np.array(ar_J_H)),np.ravel(np.array(ar_Hw_H)))
 
 
-def compute_Hw_relation(Hw_l, Hw_u):
+def fit_Hw_relation(colors):
+    """fit Hw-H = a (J-H)^2 + b (J-H)
+
+    Args:
+       colors: J-H, Hw-H
+
+    Returns:
+       fit result (colorfit.FitResult, with x and fun as the former minimize instance)
+       sigma
+       fitting residuals
+
+    Notes:
+       The model is linear in (a, b) and is solved by linear least squares (colorfit.fit_color_relation); the minimum of least_sq is attained directly.
+    """
+    res = fit_color_relation(colors[0], colors[1], degree=2)
+    return res, res.std, res.residuals
+
+
+def compute_Hw_relation(Hw_l, Hw_u, executor=None):
     """compute Hw - (H, J-H) relation
 
     Args:
        Hw_l: lower limit of passband in angstrom
        Hw_u: upper limit of passband in angstrom
+       executor: PhotonExecutor (optional), reused over many passbands; a temporary one is created if None
 
     Returns:
-       minimize instance
+       fit result (colorfit.FitResult)
        sigma
        colors
        J-H array
        Hw-H array
        fitting residuals
     """
-    data_spec = read_map_multi(read_spectra_all())
+    if executor is None:
+        with PhotonExecutor() as executor:
+            return compute_Hw_relation(Hw_l, Hw_u, executor=executor)
+    data_spec = read_map_multi(executor.spectra_all, executor=executor)
     fil_Hw = set_range_Hw_band(Hw_l, Hw_u)
     fil_J, fil_H = load_filter()
     p_Jo, p_Ho, p_Hwo=calc_zero_magnitude_spectra(fil_J, fil_H, fil_Hw)
-    ar_J_H, ar_Hw_H, Av_arr = calc_color_arrays(data_spec, fil_J, fil_H, fil_Hw, p_Jo, p_Ho, p_Hwo)
+    ar_J_H, ar_Hw_H, Av_arr = calc_color_arrays(data_spec, fil_J, fil_H, fil_Hw, p_Jo, p_Ho, p_Hwo, executor=executor)
     colors=calc_colors(ar_J_H, ar_Hw_H)
-    x0 = [1., 0.8]
-    res = minimize(least_sq, x0, args=colors, method='Nelder-Mead', tol=1e-11)
-    residuals = colors[1] - quad_func(colors[0], res.x)
-    sigma = np.std(residuals)
+    res, sigma, residuals = fit_Hw_relation(colors)
     result = {'x0': res.x[0],
               'x1': res.x[1],
               'std': sigma,
@@ -296,7 +402,7 @@ def plot_Hwfit(Hw_l,Hw_u,res, sigma, colors, ar_J_H, ar_Hw_H, residuals):
     Args:
        Hw_l: lower limit of passband in angstrom
        Hw_u: upper limit of passband in angstrom
-       res:minimize instance
+       res:fit result
        sigma:sigma
        colors:colors
        ar_J_H:J-H array
@@ -304,6 +410,7 @@ def plot_Hwfit(Hw_l,Hw_u,res, sigma, colors, ar_J_H, ar_Hw_H, residuals):
        residuals:fitting residuals
 
     """
+    from matplotlib import pyplot as plt
     a_str = str('{:.5f}'.format(res.x[0]))
     b_str = str('{:.5f}'.format(res.x[1]))
     pl_txt1 = '$y$ = '+a_str+' $x^2$ + '+b_str+' $x$'
@@ -0,0 +1,87 @@
+"""linear least-squares fits of color relations
+
+ * the polynomial models are linear in the coefficients and are solved directly by lstsq
+ * many relations sharing the same x (e.g. Hw-H of many passbands against J-H) are solved at once
+
+"""
+import numpy as np
+
+
+class FitResult:
+    """Result of a color relation fit, with the attributes used from scipy.optimize.OptimizeResult.
+
+    Attributes:
+        x (ndarray): coefficients from the highest order, (Ncoeff,) or (Nfit, Ncoeff)
+        fun (float or ndarray): chi2 = sqrt(sum w r^2), the same as Hw_coeff.least_sq
+        residuals (ndarray): y - model, (N,) or (Nfit, N)
+        std (float or ndarray): standard deviation of the residuals
+        success (bool): always True
+    """
+
+    def __init__(self, x, fun, residuals):
+        self.x = x
+        self.fun = fun
+        self.residuals = residuals
+        self.std = np.std(residuals, axis=-1)
+        self.success = True
+
+
+def poly_design(x, degree=2, intercept=False):
+    """design matrix of the polynomial model
+
+    Args:
+        x: x, (N,)
+        degree: order of the polynomial
+        intercept: if True, the constant term is included
+
+    Returns:
+        design matrix [x^degree, ..., x (, 1)], (N, Ncoeff)
+    """
+    x = np.asarray(x, dtype='f8')
+    low = 0 if intercept else 1
+    return np.stack([x**k for k in range(degree, low-1, -1)], axis=-1)
+
+
+def poly_eval(x, coeff, intercept=False):
+    """evaluate the polynomial model
+
+    Args:
+        x: x, (N,)
+        coeff: coefficients from the highest order, (Ncoeff,) or (Nfit, Ncoeff)
+        intercept: if True, the last coefficient is the constant term
+
+    Returns:
+        model, (N,) or (Nfit, N)
+    """
+    coeff = np.asarray(coeff, dtype='f8')
+    degree = coeff.shape[-1]-1 if intercept else coeff.shape[-1]
+    return coeff@poly_design(x, degree, intercept).T
+
+
+def fit_color_relation(x, y, degree=2, weights=None, intercept=False):
+    """fit y = sum_k c_k x^k by linear least squares
+
+    Args:
+        x: color on the horizontal axis (e.g. J-H), (N,)
+        y: color(s) to be fitted (e.g. Hw-H), (N,) or (Nfit, N) for batched fits sharing x
+        degree: order of the polynomial (2: y = a x^2 + b x, the model of Hw_coeff.quad_func)
+        weights: weights of the points (e.g. 1/sigma^2), (N,) (optional)
+        intercept: if True, the constant term is included
+
+    Returns:
+        FitResult
+    """
+    A = poly_design(x, degree, intercept)
+    y = np.asarray(y, dtype='f8')
+    Y = y.reshape(-1, A.shape[0]).T
+    if weights is None:
+        sw = np.ones(A.shape[0])
+    else:
+        sw = np.sqrt(np.asarray(weights, dtype='f8'))
+    coeff, _, _, _ = np.linalg.lstsq(A*sw[:, np.newaxis], Y*sw[:, np.newaxis], rcond=None)
+    coeff = coeff.T
+    residuals = Y.T - coeff@A.T
+    chi2 = np.sqrt(np.sum(np.square(residuals*sw), axis=-1))
+    if y.ndim == 1:
+        return FitResult(coeff[0], chi2[0], residuals[0])
+    return FitResult(coeff, chi2, residuals)
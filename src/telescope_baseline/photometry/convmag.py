@@ -1,8 +1,4 @@
 import numpy as np
-from io import StringIO
-import pandas as pd
-from astropy import constants as const
-from astropy import units as u
 import pkgutil
 from io import BytesIO
 
@@ -19,6 +15,7 @@ def get_magdict(maglist=None):
     """
     magdict = {}
     if(maglist is None):
+        import pandas as pd
         mn = pkgutil.get_data('telescope_baseline', 'data/mag.list')
         maglist = pd.read_csv(BytesIO(mn), delimiter=',')
     return maglist
@@ -36,7 +33,7 @@ def get_flux(band, mag, magdict):
        flux (per-wavelength form, f_lambda) with the unit of astropy
 
     """
-    
+    from astropy import units as u
     mask = magdict['band'] == band
     a = float(magdict['a'][mask].values[0])
     flux = 10**(a - 0.4*mag)*u.erg/u.s/(u.cm)**2/u.micron
@@ -55,6 +52,7 @@ def get_mag(band, flux, magdict):
        mag: magnitude 
 
     """    
+    from astropy import units as u
     mask = magdict['band'] == band
     a = float(magdict['a'][mask].values[0])
     fluxcgs = flux.to(u.erg/u.s/(u.cm)**2/u.micron).value
@@ -62,4 +60,104 @@ def get_mag(band, flux, magdict):
 
     return mag
 
-    
+
+#: h c in erg cm (exact in SI)
+HC_ERG_CM = 6.62607015e-27*2.99792458e10
+
+
+class MagConverter:
+    """Vectorized converter between magnitudes and fluxes.
+
+    mag.list is parsed once into band -> zero point arrays. Magnitudes and bands can be NumPy arrays (bands may be mixed). The unitless methods work in erg/s/cm^2/micron; the Quantity path is given by unit=True.
+
+    Attributes:
+        bands (ndarray): band symbols
+        zero_point (dict): band -> a, f_lambda = 10**(a - 0.4 mag) in erg/s/cm^2/micron
+        lambda0 (dict): band -> central wavelength in micron
+        dlambda (dict): band -> band width in micron
+
+    Examples:
+
+        >>> conv = MagConverter()
+        >>> flux = conv.flux(mag_array, "J")
+        >>> flux = conv.flux(mag_array, band_array)
+    """
+
+    def __init__(self, maglist=None):
+        """
+        Args:
+            maglist: external magnitude information list (optional), with the columns band, lambda0, dlambda, a
+        """
+        magdict = get_magdict(maglist)
+        self.bands = np.array([str(b) for b in magdict['band']])
+        self._a = np.asarray(magdict['a'], dtype='f8')
+        self._lambda0 = np.asarray(magdict['lambda0'], dtype='f8')
+        self._dlambda = np.asarray(magdict['dlambda'], dtype='f8')
+        self._index = {b: i for i, b in enumerate(self.bands)}
+        self.zero_point = dict(zip(self.bands, self._a))
+        self.lambda0 = dict(zip(self.bands, self._lambda0))
+        self.dlambda = dict(zip(self.bands, self._dlambda))
+
+    def band_index(self, band):
+        """positions of the bands in the table
+
+        Args:
+            band: band symbol or array of band symbols
+
+        Returns:
+            position(s) in bands
+        """
+        if isinstance(band, str):
+            try:
+                return self._index[band]
+            except KeyError:
+                raise ValueError("unknown band: "+band)
+        band = np.asarray(band)
+        uniq, inverse = np.unique(band, return_inverse=True)
+        return np.array([self.band_index(str(b)) for b in uniq], dtype=int)[inverse].reshape(band.shape)
+
+    def flux(self, mag, band, unit=False):
+        """compute flux (per-wavelength form, f_lambda) from mag
+
+        Args:
+            mag: magnitude(s)
+            band: band symbol or array of band symbols
+            unit: if True, an astropy Quantity is returned
+
+        Returns:
+            flux in erg/s/cm^2/micron (ndarray) or Quantity
+        """
+        flux = 10**(self._a[self.band_index(band)] - 0.4*np.asarray(mag, dtype='f8'))
+        if unit:
+            from astropy import units as u
+            return flux*u.erg/u.s/(u.cm)**2/u.micron
+        return flux
+
+    def mag(self, flux, band):
+        """compute mag from flux (per-wavelength form, f_lambda)
+
+        Args:
+            flux: flux in erg/s/cm^2/micron (ndarray) or Quantity
+            band: band symbol or array of band symbols
+
+        Returns:
+            magnitude(s)
+        """
+        if hasattr(flux, 'unit'):
+            from astropy import units as u
+            flux = flux.to(u.erg/u.s/(u.cm)**2/u.micron).value
+        return 2.5*(self._a[self.band_index(band)] - np.log10(flux))
+
+    def photon_flux(self, mag, band):
+        """photon flux in the band, f_lambda x dlambda / (h c / lambda0)
+
+        Args:
+            mag: magnitude(s)
+            band: band symbol or array of band symbols
+
+        Returns:
+            photon flux in photons/s/cm^2
+        """
+        i = self.band_index(band)
+        flux = 10**(self._a[i] - 0.4*np.asarray(mag, dtype='f8'))
+        return flux*self._dlambda[i]*self._lambda0[i]*1.e-4/HC_ERG_CM
@@ -0,0 +1,167 @@
+"""extinction laws and precomputed transmission curves
+
+ * a law gives A_lambda/A_V on a wavelength grid; the built-in law is the linear J/K law of Hw_coeff.A_lambda
+ * tabulated laws are loaded from ASCII files (wavelength in angstrom, A_lambda/A_V)
+ * the transmission 10**(-A_lambda/2.5) for a vector of Av is cached, keyed by (law, grid, Av), up to CACHE_BYTES in total
+
+"""
+import hashlib
+from collections import OrderedDict
+import numpy as np
+from telescope_baseline.photometry.Hw_coeff import A_lambda
+
+
+class LinearJKLaw:
+    """Linear interpolation between A_J/A_V and A_K/A_V, the law used in Hw_coeff.A_lambda.
+
+    Attributes:
+        name (str): name of the law
+    """
+    name = 'linear_JK'
+
+    def ratio(self, wavelength):
+        """A_lambda/A_V
+
+        Args:
+            wavelength: wavelength in angstrom
+
+        Returns:
+            A_lambda/A_V
+        """
+        return A_lambda(1.0, np.asarray(wavelength, dtype='f8'))
+
+    @property
+    def key(self):
+        """cache key of the law"""
+        return self.name
+
+
+class TabulatedLaw:
+    """Extinction law tabulated on wavelengths, linearly interpolated (and held constant outside the table).
+
+    Attributes:
+        name (str): name of the law
+        wavelength (ndarray): tabulated wavelength in angstrom
+        ratio_table (ndarray): tabulated A_lambda/A_V
+    """
+
+    def __init__(self, wavelength, ratio, name='tabulated'):
+        """
+        Args:
+            wavelength: wavelength in angstrom (increasing)
+            ratio: A_lambda/A_V
+            name: name of the law
+        """
+        self.wavelength = np.asarray(wavelength, dtype='f8')
+        self.ratio_table = np.asarray(ratio, dtype='f8')
+        if self.wavelength.shape != self.ratio_table.shape or np.any(np.diff(self.wavelength) <= 0):
+            raise ValueError("wavelength should be increasing and have the same shape as ratio.")
+        self.name = name
+
+    @classmethod
+    def from_file(cls, filename, name=None):
+        """load a law from an ASCII file
+
+        Args:
+            filename: ASCII file with the columns wavelength in angstrom, A_lambda/A_V ('#' for comments)
+            name: name of the law (default: filename)
+
+        Returns:
+            TabulatedLaw
+        """
+        wavelength, ratio = np.loadtxt(filename, comments='#', dtype='f8', usecols=(0, 1)).T
+        return cls(wavelength, ratio, name=filename if name is None else name)
+
+    def ratio(self, wavelength):
+        """A_lambda/A_V
+
+        Args:
+            wavelength: wavelength in angstrom
+
+        Returns:
+            A_lambda/A_V
+        """
+        return np.interp(wavelength, self.wavelength, self.ratio_table)
+
+    @property
+    def key(self):
+        """cache key of the law (name and table content)"""
+        h = hashlib.sha1(self.wavelength.tobytes())
+        h.update(self.ratio_table.tobytes())
+        return self.name+':'+h.hexdigest()
+
+
+_laws = {LinearJKLaw.name: LinearJKLaw()}
+
+
+def register_law(law):
+    """register an extinction law by its name
+
+    Args:
+        law: extinction law, with name, key and ratio(wavelength)
+    """
+    _laws[law.name] = law
+
+
+def get_law(law=None):
+    """extinction law
+
+    Args:
+        law: name of a registered law, a law instance, or None for linear_JK
+
+    Returns:
+        extinction law
+    """
+    if law is None:
+        return _laws[LinearJKLaw.name]
+    if isinstance(law, str):
+        try:
+            return _laws[law]
+        except KeyError:
+            raise ValueError("unknown extinction law: "+law+", available: "+", ".join(_laws))
+    return law
+
+
+_cache = OrderedDict()
+#: maximum total size in bytes of the cached transmission curves; the least recently used ones are dropped first
+CACHE_BYTES = 2**26
+
+
+def _digest(a):
+    a = np.ascontiguousarray(a, dtype='f8')
+    return hashlib.sha1(a.tobytes()).hexdigest()+str(a.shape)
+
+
+def transmission(wavelength, Av, law=None):
+    """transmission curves 10**(-A_lambda/2.5) for a vector of Av, cached by (law, grid, Av)
+
+    The cache holds at most CACHE_BYTES; a curve larger than that is not cached. clear_cache() releases the cached curves.
+
+    Args:
+        wavelength: wavelength grid in angstrom, (Nlambda,)
+        Av: Av, scalar or (NAv,)
+        law: name of a registered law or a law instance (default: linear_JK)
+
+    Returns:
+        read-only transmission, (NAv, Nlambda)
+    """
+    law = get_law(law)
+    wavelength = np.asarray(wavelength, dtype='f8')
+    Av = np.atleast_1d(np.asarray(Av, dtype='f8'))
+    key = (law.key, _digest(wavelength), _digest(Av))
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    trans = 10**(-1*Av[:, np.newaxis]*law.ratio(wavelength)[np.newaxis, :]/2.5)
+    trans.flags.writeable = False
+    if trans.nbytes > CACHE_BYTES:
+        return trans
+    _cache[key] = trans
+    while sum(t.nbytes for t in _cache.values()) > CACHE_BYTES:
+        _cache.popitem(last=False)
+    return trans
+
+
+def clear_cache():
+    """clear the cache of the transmission curves"""
+    _cache.clear()
@@ -0,0 +1,72 @@
+"""passband sweep of the Hw - (H, J-H) relation
+
+ * the spectra, the A0V zero points and the J/H photometry do not depend on the Hw passband and are computed once
+ * the Hw photometry of all the passbands is computed by SynPhot in chunks of passbands
+ * the fits of all the passbands are solved at once by linear least squares (colorfit)
+
+"""
+import numpy as np
+from telescope_baseline.photometry.Hw_coeff import load_filter, load_stellar_spectra, set_range_Hw_band
+from telescope_baseline.photometry.synphot import SynPhot
+from telescope_baseline.photometry.colorfit import fit_color_relation
+
+
+def passband_pairs(Hw_l, Hw_u):
+    """(lower, upper) pairs of a passband grid
+
+    Args:
+       Hw_l: grid of lower limits of passband in angstrom
+       Hw_u: grid of upper limits of passband in angstrom
+
+    Returns:
+       lower limits, upper limits of the pairs with lower < upper
+    """
+    l, u = np.meshgrid(np.atleast_1d(Hw_l), np.atleast_1d(Hw_u), indexing='ij')
+    mask = l < u
+    return l[mask].astype('f8'), u[mask].astype('f8')
+
+
+def sweep_Hw_relation(Hw_l, Hw_u, synphot=None, Av=np.linspace(0, 60, 5), law=None, chunksize=256):
+    """compute the Hw - (H, J-H) relation over a grid of passbands
+
+    Args:
+       Hw_l: grid of lower limits of passband in angstrom
+       Hw_u: grid of upper limits of passband in angstrom
+       synphot: SynPhot of the stellar spectra (default: SynPhot.from_files())
+       Av: Av grid, the same as Hw_coeff.calc_color_arrays by default (a dense grid costs little, the extinction curves are precomputed)
+       law: extinction law, name or instance (default: linear_JK, the law of Hw_coeff.A_lambda)
+       chunksize: number of passbands per chunk
+
+    Returns:
+       pandas.DataFrame with the columns Hw_l, Hw_u, x0, x1, std, chi2 (one row per pair with Hw_l < Hw_u), the same as compute_Hw_relation
+
+    Examples:
+
+        >>> table = sweep_Hw_relation(np.linspace(8000, 12000, 100), np.linspace(14000, 20000, 100))
+        >>> best = table.loc[table["std"].idxmin()]
+    """
+    import pandas as pd
+    if synphot is None:
+        synphot = SynPhot.from_files()
+    lower, upper = passband_pairs(Hw_l, Hw_u)
+    a0v = SynPhot([load_stellar_spectra('uka0v.dat')], wavelength=synphot.wavelength)
+    fil_J, fil_H = load_filter()
+
+    # passband independent parts
+    p_JHo = a0v.photon_cube([fil_J, fil_H], 0.0)[:, 0, 0]
+    p_JH = synphot.photon_cube([fil_J, fil_H], Av, law)
+    rel_J = -2.5*(np.log10(p_JH[0]) - np.log10(p_JHo[0]))
+    rel_H = -2.5*(np.log10(p_JH[1]) - np.log10(p_JHo[1]))
+    J_H = np.ravel(rel_J - rel_H)
+
+    Hw_H = np.empty((len(lower), len(J_H)))
+    for i in range(0, len(lower), chunksize):
+        fil_Hw = [set_range_Hw_band(l, u) for l, u in zip(lower[i:i+chunksize], upper[i:i+chunksize])]
+        p_Hwo = a0v.photon_cube(fil_Hw, 0.0)[:, 0, 0]
+        p_Hw = synphot.photon_cube(fil_Hw, Av, law)
+        rel_Hw = -2.5*(np.log10(p_Hw) - np.log10(p_Hwo)[:, np.newaxis, np.newaxis])
+        Hw_H[i:i+chunksize] = (rel_Hw - rel_H[np.newaxis, :, :]).reshape(len(fil_Hw), -1)
+
+    res = fit_color_relation(J_H, Hw_H, degree=2)
+    return pd.DataFrame({'Hw_l': lower, 'Hw_u': upper,
+                         'x0': res.x[:, 0], 'x1': res.x[:, 1], 'std': res.std, 'chi2': res.fun})
@@ -0,0 +1,189 @@
+"""array-native S/N calculator
+
+ * the instrument (InstClass, i.e. Parameters) is converted once to plain SI values
+ * photon counts of all the targets are computed at once from blackbody parameters or magnitudes
+ * photon, dark, readout and foreground noises and the saturation flags are arrays, the same as ObsClass.update for a single target
+
+"""
+import numpy as np
+
+
+def _value(x, unit):
+    """plain value of a Quantity in unit, or x itself if it has no unit"""
+    if hasattr(x, 'unit'):
+        return x.to(unit).value
+    return x
+
+
+class SNResult:
+    """Photon counts and noises of the targets, with the attribute names of ObsClass.
+
+    Attributes:
+        nphoton_exposure (ndarray): photons per exposure
+        nphoton_frame (ndarray): photons per frame
+        nphoton_foreground (ndarray): foreground photons per exposure (zero if fgaperture is None)
+        sign, sigd, sigr, sigfg (ndarray): photon, dark, readout and foreground noises (electrons per exposure)
+        sign_relative, sigd_relative, sigr_relative (ndarray): noises relative to nphoton_exposure in ppm
+        sat (ndarray): saturation flags of the brightest pixel
+    """
+
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+    @property
+    def sigma(self):
+        """total noise, the quadrature sum of the photon, dark, readout and foreground noises"""
+        return np.sqrt(self.sign**2+self.sigd**2+self.sigr**2+self.sigfg**2)
+
+    @property
+    def snr(self):
+        """S/N per exposure"""
+        return self.nphoton_exposure/self.sigma
+
+
+class SNRCalculator:
+    """Vectorized S/N calculator matched to ObsClass (exocounts.nstar.Nstar with integrate=True).
+
+    Times are in second and lengths in meter when plain floats are given; astropy Quantities are converted.
+
+    Examples:
+
+        >>> calc = SNRCalculator()
+        >>> res = calc.noise_from_mag(hw, "H", texposure=12.5, tframe=12.5, napix=15, effnpix=3.0)
+        >>> res.snr, res.sat
+    """
+
+    def __init__(self, inst=None, max_elements=2**22):
+        """
+        Args:
+            inst: InstClass (default: InstClass(), i.e. the current Parameters)
+            max_elements: maximum number of elements of the temporary array in the wavelength integration
+        """
+        from astropy import units as u
+        from astropy import constants as const
+        if inst is None:
+            from telescope_baseline.photometry.photoclass import InstClass
+            inst = InstClass()
+        self.lamb = _value(inst.lamb, u.m)
+        self.dlam = _value(inst.dlam, u.m)
+        self.area = np.pi*(_value(inst.dtel, u.m)/2.0)**2 - np.pi*(_value(inst.dstel, u.m)/2.0)**2
+        self.dtel = _value(inst.dtel, u.m)
+        self.throughput = inst.throughput
+        self.ndark = _value(inst.ndark, 1/u.s)
+        self.nread = inst.nread
+        self.fullwell = inst.fullwell
+        self.fgtel = inst.fgtel
+        self.fgatm = inst.fgatm
+        self.max_elements = max_elements
+        self._h = const.h.to(u.J*u.s).value
+        self._c = const.c.to(u.m/u.s).value
+        self._k = const.k_B.to(u.J/u.K).value
+
+    def photon_blackbody(self, teff, rstar, d, texposure, contrast=1.0, Nintegrate=128):
+        """photons per exposure of blackbody targets
+
+        Args:
+            teff: effective temperature in K, (N,)
+            rstar: stellar radius in m (or Quantity), (N,)
+            d: distance in m (or Quantity), (N,)
+            texposure: exposure time in s (or Quantity)
+            contrast: contrast factor (Target.contrast)
+            Nintegrate: number of wavelength nodes, the same as nstar.Nstar
+
+        Returns:
+            photons per exposure, (N,)
+        """
+        from astropy import units as u
+        teff = np.atleast_1d(np.asarray(_value(teff, u.K), dtype='f8'))
+        dilution = np.atleast_1d(np.pi*(np.asarray(_value(rstar, u.m), dtype='f8')/np.asarray(_value(d, u.m), dtype='f8'))**2*contrast)
+        texposure = _value(texposure, u.s)
+        lamarr = self.lamb+np.linspace(-self.dlam/2, self.dlam/2, Nintegrate)
+        lamc = (lamarr[1:]+lamarr[:-1])/2.0
+        dll = np.diff(lamarr)
+        # photon B_lambda = 2 c / lambda^4 / (exp(hc/lambda k T) - 1)
+        nb = max(1, self.max_elements//len(lamc))
+        teff, dilution = np.broadcast_arrays(teff, dilution)
+        photon = np.empty(len(teff))
+        for i in range(0, len(teff), nb):
+            fac = self._h*self._c/(lamc[np.newaxis, :]*self._k*teff[i:i+nb, np.newaxis])
+            pb = 2.0*self._c/lamc**4/np.expm1(fac)
+            photon[i:i+nb] = pb@dll
+        return photon*dilution*self.area*texposure*self.throughput
+
+    def photon_mag(self, mag, band, texposure, converter=None):
+        """photons per exposure of targets given by magnitudes
+
+        Args:
+            mag: magnitudes, (N,)
+            band: band symbol or array of band symbols of mag.list
+            texposure: exposure time in s (or Quantity)
+            converter: MagConverter (optional)
+
+        Returns:
+            photons per exposure, (N,)
+
+        Notes:
+            f_lambda of the band is assumed to be flat over the instrument band, i.e. photons = f_lambda lambda/(h c) x dlam x area x texposure x throughput at the instrument center wavelength.
+        """
+        from astropy import units as u
+        if converter is None:
+            from telescope_baseline.photometry.convmag import MagConverter
+            converter = MagConverter()
+        # erg/s/cm^2/micron -> W/m^2/m
+        flux = converter.flux(mag, band)*1.e-7*1.e4*1.e6
+        photonf = flux*self.lamb/(self._h*self._c)
+        return photonf*self.dlam*self.area*_value(texposure, u.s)*self.throughput
+
+    def noise(self, nphoton_exposure, texposure, tframe, napix, mu=1, effnpix=None, fgaperture=None):
+        """noises and saturation flags for photon counts
+
+        Args:
+            nphoton_exposure: photons per exposure, (N,)
+            texposure: exposure time in s (or Quantity)
+            tframe: time for one frame in s (or Quantity)
+            napix: number of the pixels in aperture
+            mu: mu of ObsClass
+            effnpix: conversion for the brightest pixel (optional, no saturation if None)
+            fgaperture: aperture for the foreground noise (optional)
+
+        Returns:
+            SNResult
+        """
+        from astropy import units as u
+        ppm = 1.e6
+        N = np.atleast_1d(np.asarray(nphoton_exposure, dtype='f8'))
+        texposure = _value(texposure, u.s)
+        tframe = _value(tframe, u.s)
+        nphoton_frame = N*(tframe/texposure)
+        sign = np.sqrt(N)
+        sigd = np.full(N.shape, np.sqrt(mu*napix*texposure*self.ndark))
+        sigr = np.full(N.shape, np.sqrt(mu*napix*texposure/tframe)*self.nread)
+        if fgaperture is None:
+            nphoton_foreground = np.zeros(N.shape)
+        else:
+            nphoton_foreground = np.full(N.shape, fgaperture*(self.fgtel+self.fgatm)*self.dlam*texposure*(self.dtel/2.0)**2*np.pi*self.throughput)
+        if effnpix is None:
+            sat = np.zeros(N.shape, dtype=bool)
+        else:
+            sat = nphoton_frame/effnpix > self.fullwell
+        return SNResult(nphoton_exposure=N, nphoton_frame=nphoton_frame, nphoton_foreground=nphoton_foreground,
+                        sign=sign, sigd=sigd, sigr=sigr, sigfg=np.sqrt(nphoton_foreground),
+                        sign_relative=sign/N*ppm, sigd_relative=sigd/N*ppm, sigr_relative=sigr/N*ppm, sat=sat)
+
+    def noise_from_blackbody(self, teff, rstar, d, texposure, tframe, napix, mu=1, effnpix=None, fgaperture=None, contrast=1.0):
+        """noises of blackbody targets, see photon_blackbody and noise
+
+        Returns:
+            SNResult
+        """
+        N = self.photon_blackbody(teff, rstar, d, texposure, contrast=contrast)
+        return self.noise(N, texposure, tframe, napix, mu=mu, effnpix=effnpix, fgaperture=fgaperture)
+
+    def noise_from_mag(self, mag, band, texposure, tframe, napix, mu=1, effnpix=None, fgaperture=None, converter=None):
+        """noises of targets given by magnitudes, see photon_mag and noise
+
+        Returns:
+            SNResult
+        """
+        N = self.photon_mag(mag, band, texposure, converter=converter)
+        return self.noise(N, texposure, tframe, napix, mu=mu, effnpix=effnpix, fgaperture=fgaperture)
@@ -0,0 +1,171 @@
+"""binary cache of the spectral library in data/spectra
+
+ * the ASCII spectra are packed once into a single float64 .npy file with a JSON index of names, offsets and shapes
+ * the cache is keyed by the names, sizes and modification times of the sources, so it is rebuilt automatically when they change
+ * the loader memory-maps the .npy file and returns zero-copy views
+ * the disk cache is opt-in (an explicit cachedir or $TELESCOPE_BASELINE_CACHE); otherwise, or if the cache cannot be written, the spectra are packed in memory
+
+"""
+import os
+import json
+import hashlib
+import shutil
+import tempfile
+import warnings
+import numpy as np
+from telescope_baseline.tools.cache import default_cache_dir, opt_in_cache_dir
+from telescope_baseline.photometry.Hw_coeff import load_stellar_spectra, read_spectra_all
+
+SPECTRA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'spectra')
+
+
+def library_key(spectra_all):
+    """key of the spectral library
+
+    Args:
+        spectra_all: list of the spectrum files in data/spectra
+
+    Returns:
+        hex digest of the names, sizes and modification times of the sources
+    """
+    h = hashlib.sha1()
+    for name in spectra_all:
+        st = os.stat(os.path.join(SPECTRA_DIR, name))
+        h.update("{}:{}:{};".format(name, st.st_size, st.st_mtime_ns).encode())
+    return h.hexdigest()
+
+
+class SpectralLibrary:
+    """Spectral library memory-mapped from the binary cache.
+
+    Attributes:
+        names (list): names of the spectra
+        data (ndarray): packed float64 data (memory-mapped)
+        offsets (list): start of each spectrum in data
+        shapes (list): shape (Ncolumn, Nwavelength) of each spectrum
+        path (str): cache directory, None for a library packed in memory
+    """
+
+    def __init__(self, path, mmap_mode='r'):
+        """
+        Args:
+            path: cache directory made by build_spectral_library
+            mmap_mode: mmap_mode of np.load ("r" for a read-only memory map, None to read into memory)
+        """
+        with open(os.path.join(path, 'index.json')) as f:
+            index = json.load(f)
+        self._set(index, np.load(os.path.join(path, 'spectra.npy'), mmap_mode=mmap_mode))
+        self.path = path
+
+    @classmethod
+    def in_memory(cls, spectra_all=None):
+        """pack the spectra in memory, without the on-disk cache
+
+        Args:
+            spectra_all: list of the spectrum files (default: Hw_coeff.read_spectra_all())
+
+        Returns:
+            SpectralLibrary
+        """
+        if spectra_all is None:
+            spectra_all = read_spectra_all()
+        index, data = _pack(spectra_all)
+        library = cls.__new__(cls)
+        library._set(index, data)
+        library.path = None
+        return library
+
+    def _set(self, index, data):
+        self.names = index['names']
+        self.offsets = index['offsets']
+        self.shapes = [tuple(s) for s in index['shapes']]
+        self.data = data
+        self._position = {name: i for i, name in enumerate(self.names)}
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, key):
+        """spectrum, the same as Hw_coeff.load_stellar_spectra(name) but a zero-copy view
+
+        Args:
+            key: name of the spectrum or its position
+
+        Returns:
+            spectral data, (Ncolumn, Nwavelength)
+        """
+        i = self._position[key] if isinstance(key, str) else key
+        n = int(np.prod(self.shapes[i]))
+        return self.data[self.offsets[i]:self.offsets[i]+n].reshape(self.shapes[i])
+
+    @property
+    def data_spec(self):
+        """list of all the spectra (views), as returned by Hw_coeff.read_map_multi"""
+        return [self[i] for i in range(len(self))]
+
+
+def _pack(spectra_all):
+    """read the spectra and pack them into one float64 array
+
+    Returns:
+        index (names, offsets, shapes), packed data
+    """
+    spectra = [np.ascontiguousarray(load_stellar_spectra(name)) for name in spectra_all]
+    offsets = np.concatenate([[0], np.cumsum([s.size for s in spectra])[:-1]]).astype(int)
+    index = {'names': list(spectra_all), 'offsets': offsets.tolist(), 'shapes': [list(s.shape) for s in spectra]}
+    return index, np.concatenate([s.ravel() for s in spectra])
+
+
+def build_spectral_library(spectra_all=None, cachedir=None):
+    """pack the spectra into the binary cache
+
+    Args:
+        spectra_all: list of the spectrum files (default: Hw_coeff.read_spectra_all())
+        cachedir: root of the cache (default: tools.cache.default_cache_dir())
+
+    Returns:
+        path of the cache directory
+    """
+    if spectra_all is None:
+        spectra_all = read_spectra_all()
+    if cachedir is None:
+        cachedir = default_cache_dir()
+    path = os.path.join(cachedir, 'spectra-'+library_key(spectra_all))
+    if os.path.isdir(path):
+        return path
+    index, data = _pack(spectra_all)
+    os.makedirs(cachedir, exist_ok=True)
+    # written to a temporary directory and renamed, so that concurrent readers never see a partial cache
+    tmp = tempfile.mkdtemp(dir=cachedir, prefix='.tmp-')
+    try:
+        np.save(os.path.join(tmp, 'spectra.npy'), data)
+        with open(os.path.join(tmp, 'index.json'), 'w') as f:
+            json.dump(index, f)
+        os.rename(tmp, path)
+    except OSError:
+        shutil.rmtree(tmp, ignore_errors=True)
+        if not os.path.isdir(path):
+            raise
+    return path
+
+
+def load_spectral_library(spectra_all=None, cachedir=None, mmap_mode='r'):
+    """load the spectral library from the binary cache, building it if needed
+
+    Args:
+        spectra_all: list of the spectrum files (default: Hw_coeff.read_spectra_all())
+        cachedir: root of the cache (default: $TELESCOPE_BASELINE_CACHE if set, otherwise no disk cache)
+        mmap_mode: mmap_mode of np.load
+
+    Returns:
+        SpectralLibrary, packed in memory (path None) without a cache directory or if the cache cannot be written
+    """
+    cachedir = opt_in_cache_dir(cachedir)
+    if cachedir is None:
+        return SpectralLibrary.in_memory(spectra_all)
+    try:
+        path = build_spectral_library(spectra_all, cachedir)
+    except OSError as e:
+        warnings.warn("spectral library cache is not available ({}), the spectra are loaded in memory.".format(e))
+        return SpectralLibrary.in_memory(spectra_all)
+    return SpectralLibrary(path, mmap_mode=mmap_mode)
@@ -0,0 +1,124 @@
+"""vectorized synthetic photometry
+
+ * the spectra are resampled once onto a common wavelength grid and kept as a (Nspec, Nlambda) matrix
+ * a filter is turned once into a weight vector on the grid (cubic transmission x dlambda x lambda, the same as Hw_coeff.cal_photon)
+ * the photon cube of (filter, Av, spectrum) is a matrix product per block of filters
+
+"""
+import numpy as np
+from telescope_baseline.photometry.extinction import transmission
+
+
+class SynPhot:
+    """Synthetic photometry engine over a library of spectra.
+
+    Attributes:
+        wavelength (ndarray): common wavelength grid in angstrom, (Nlambda,)
+        flux (ndarray): flux of the spectra on the grid, (Nspec, Nlambda)
+        names (list): names of the spectra
+    """
+
+    def __init__(self, data_spec, names=None, wavelength=None):
+        """
+        Args:
+            data_spec: list of the spectra (wavelength in angstrom, flux, ...) as returned by Hw_coeff.load_stellar_spectra
+            names: names of the spectra (optional)
+            wavelength: common wavelength grid (default: the grid of the first spectrum)
+
+        Notes:
+            Spectra on a different grid are linearly interpolated onto the common grid. The spectra in data/spectra share the same grid and are used as they are.
+        """
+        if wavelength is None:
+            wavelength = data_spec[0][0]
+        self.wavelength = np.asarray(wavelength, dtype='f8')
+        self.flux = np.empty((len(data_spec), len(self.wavelength)))
+        for i, spec in enumerate(data_spec):
+            if np.array_equal(spec[0], self.wavelength):
+                self.flux[i] = spec[1]
+            else:
+                self.flux[i] = np.interp(self.wavelength, spec[0], spec[1], left=0.0, right=0.0)
+        self.names = list(names) if names is not None else [str(i) for i in range(len(data_spec))]
+
+    @classmethod
+    def from_files(cls, spectra_all=None, cachedir=None):
+        """load the spectra in data/spectra through the binary spectral library (speclib)
+
+        Args:
+            spectra_all: list of the spectrum files (default: Hw_coeff.read_spectra_all())
+            cachedir: root of the spectral library cache (default: tools.cache.default_cache_dir())
+
+        Returns:
+            SynPhot
+        """
+        from telescope_baseline.photometry.speclib import load_spectral_library
+        library = load_spectral_library(spectra_all, cachedir)
+        return cls(library.data_spec, names=library.names)
+
+    def __len__(self):
+        return len(self.flux)
+
+    def filter_weights(self, filters):
+        """weights of the filters on the grid
+
+        Args:
+            filters: list of filters (index, wavelength in angstrom, transmission), e.g. Hw_coeff.load_filter(), or a single filter
+
+        Returns:
+            weights, (Nfilter, Nlambda)
+
+        Notes:
+            The same as Hw_coeff.cal_photon: the grid points strictly inside the filter range are used, with the rectangle rule (transmission x dlambda x lambda) excluding the last point.
+        """
+        from scipy import interpolate
+        if isinstance(filters, np.ndarray) and filters.ndim == 2:
+            filters = [filters]
+        x = self.wavelength
+        weights = np.zeros((len(filters), len(x)))
+        for i, filter_func in enumerate(filters):
+            ff = interpolate.interp1d(x=filter_func[1], y=filter_func[2], kind='cubic')
+            idx = np.flatnonzero((filter_func[1, 0] < x) & (x < filter_func[1, -1]))
+            if len(idx) < 2:
+                continue
+            idx = idx[:-1]
+            weights[i, idx] = ff(x[idx])*(x[idx+1]-x[idx])*x[idx]
+        return weights
+
+    def extinction(self, Av, law=None):
+        """extinction factors on the grid (cached, see extinction.transmission)
+
+        Args:
+            Av: Av, scalar or (NAv,)
+            law: extinction law, name or instance (default: linear_JK, the law of Hw_coeff.A_lambda)
+
+        Returns:
+            10**(-A_lambda/2.5), (NAv, Nlambda)
+        """
+        return transmission(self.wavelength, Av, law)
+
+    def photon_cube(self, filters, Av, law=None, max_elements=2**22):
+        """photon counts of all the spectra
+
+        Args:
+            filters: list of filters (index, wavelength in angstrom, transmission) or a single filter
+            Av: Av, scalar or (NAv,)
+            law: extinction law, name or instance (default: linear_JK)
+            max_elements: maximum number of elements of the temporary array per block of filters
+
+        Returns:
+            photons, (Nfilter, NAv, Nspec)
+        """
+        weights = self.filter_weights(filters)
+        ext = self.extinction(Av, law)
+        Nf, Na, Ns, Nl = len(weights), len(ext), len(self), len(self.wavelength)
+        cube = np.empty((Nf, Na, Ns))
+        # the smaller of (filter x Av) and (filter x spectrum) is expanded, the other one is the matrix product
+        nb = max(1, max_elements//(min(Na, Ns)*Nl))
+        for i in range(0, Nf, nb):
+            w = weights[i:i+nb]
+            if Na <= Ns:
+                kernel = (w[:, np.newaxis, :]*ext[np.newaxis, :, :]).reshape(-1, Nl)
+                cube[i:i+nb] = (kernel@self.flux.T).reshape(len(w), Na, Ns)
+            else:
+                kernel = (w[:, np.newaxis, :]*self.flux[np.newaxis, :, :]).reshape(-1, Nl)
+                cube[i:i+nb] = np.swapaxes((kernel@ext.T).reshape(len(w), Ns, Na), 1, 2)
+        return cube
@@ -1,3 +1,16 @@
 from telescope_baseline.tools.efficiency.filters import Filters as __Filters
+from telescope_baseline.tools.efficiency.registry import default_registry as __default_registry
 
-filters = __Filters()
+__filters = None
+
+
+def __getattr__(name):
+    """filters and registry are created on first access (they load the curves in the data directory)"""
+    global __filters
+    if name == "filters":
+        if __filters is None:
+            __filters = __Filters()
+        return __filters
+    if name == "registry":
+        return __default_registry()
+    raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
@@ -0,0 +1,24 @@
+import os
+
+
+def default_cache_dir():
+    """default root of the on-disk caches (catalog columns, spectral library)
+
+    Returns:
+        $TELESCOPE_BASELINE_CACHE if set, otherwise ~/.cache/telescope_baseline
+    """
+    return os.environ.get("TELESCOPE_BASELINE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "telescope_baseline"))
+
+
+def opt_in_cache_dir(cachedir=None):
+    """root of an opt-in on-disk cache (spectral library)
+
+    Args:
+        cachedir: root of the cache given by the caller (optional)
+
+    Returns:
+        cachedir if given, otherwise $TELESCOPE_BASELINE_CACHE if set, otherwise None (no disk cache)
+    """
+    if cachedir is not None:
+        return cachedir
+    return os.environ.get("TELESCOPE_BASELINE_CACHE")
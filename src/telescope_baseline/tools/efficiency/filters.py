@@ -1,19 +1,16 @@
-import os
-import pathlib
-import pkg_resources
-from telescope_baseline.dataclass.efficiency import Efficiency
+from telescope_baseline.tools.efficiency.registry import default_registry
 
 class Filters:
     """This class handles the filter data stored in the data directory.
 
+    The curves are loaded once by the shared CurveRegistry (see registry.default_registry), so get_efficiency does not read the files again.
+
     Attributes:
         json_list (list): List of the json files
     """
     def __init__(self):
-        self.__data_path = pkg_resources.resource_filename('telescope_baseline', 'data/filter')
-        self.json_list = []
-        for p in pathlib.Path(self.__data_path).glob('*.json'):
-            self.json_list.append(p.name)
+        self.__registry = default_registry()
+        self.json_list = self.__registry.list('filter')
 
 
     def get_efficiency(self, json_name):
@@ -25,4 +22,4 @@ class Filters:
         Returns:
             efficiency: Efficiency instance created from the input json file.
         """
-        return Efficiency.from_json(os.path.join(self.__data_path, json_name))
+        return self.__registry.get('filter', json_name)
@@ -0,0 +1,173 @@
+import os
+import re
+import glob
+import json
+import numpy as np
+from telescope_baseline.dataclass.efficiency import Efficiency
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'data')
+
+#: kinds of the curves and their json files relative to the data directory
+SOURCES = {'filter': 'filter/*.json', 'qe': 'qe/*.json', 'telescope': 'teleff.json'}
+
+#: parameters parsed from the titles of the curves
+PARAMETERS = {'cut_on': r'Cut-on ([0-9.]+) um', 'temperature': r'at ([0-9.]+) K'}
+
+
+class CurveRegistry:
+    """This class holds all the efficiency curves (filters, QE and telescope) loaded once.
+
+    The curves are stacked into padded (Ncurve, Nmax) arrays; the rows are padded with their last node, so each padded row interpolates the same as the original curve.
+
+    Attributes:
+        kinds (ndarray): Kind of each curve (filter, qe or telescope).
+        names (ndarray): Json filename of each curve.
+        titles (list): Titles of the curves.
+        comments (list): Comments of the curves.
+        parameters (dict): Parameter arrays parsed from the titles (cut_on in micron, temperature in K), NaN if not given.
+        wavelength (ndarray): Padded wavelengths in micron, (Ncurve, Nmax).
+        efficiency (ndarray): Padded efficiencies, (Ncurve, Nmax).
+        lengths (ndarray): Number of the nodes of each curve.
+
+    Examples:
+
+        >>> registry = default_registry()
+        >>> qe = registry.lookup('qe', temperature=170.0)
+        >>> filt = registry.get('filter', 'filter100.json')
+        >>> val = registry.evaluate(np.linspace(0.8, 1.6, 1000), kind='filter')
+    """
+
+    def __init__(self, data_dir=DATA_DIR, sources=SOURCES):
+        """
+        Args:
+            data_dir: Data directory.
+            sources: Dict of the kinds and the glob patterns of their json files relative to data_dir.
+        """
+        kinds, names, wavelength, efficiency = [], [], [], []
+        self.titles, self.comments = [], []
+        for kind, pattern in sources.items():
+            for filename in sorted(glob.glob(os.path.join(data_dir, pattern))):
+                with open(filename, 'r') as fp:
+                    js = json.load(fp)
+                kinds.append(kind)
+                names.append(os.path.basename(filename))
+                wavelength.append(np.array(js['wavelength'], dtype=float))
+                efficiency.append(np.array(js['efficiency'], dtype=float))
+                self.titles.append(js.get('title', ''))
+                self.comments.append(js.get('comment', ''))
+        self.kinds = np.array(kinds)
+        self.names = np.array(names)
+        self.lengths = np.array([len(w) for w in wavelength], dtype=int)
+        nmax = np.max(self.lengths) if len(self.lengths) > 0 else 0
+        self.wavelength = np.array([np.pad(w, (0, nmax - len(w)), mode='edge') for w in wavelength]).reshape(-1, nmax)
+        self.efficiency = np.array([np.pad(e, (0, nmax - len(e)), mode='edge') for e in efficiency]).reshape(-1, nmax)
+        self.parameters = {}
+        for key, pattern in PARAMETERS.items():
+            values = [re.search(pattern, title) for title in self.titles]
+            self.parameters[key] = np.array([float(m.group(1)) if m else np.nan for m in values])
+        self._cache = {}
+
+    def __len__(self):
+        return len(self.names)
+
+    def index(self, kind, name):
+        """position of a curve
+
+        Args:
+            kind: Kind of the curve.
+            name: Json filename of the curve.
+
+        Returns:
+            position in the stacked arrays
+        """
+        match = np.flatnonzero((self.kinds == kind) & (self.names == name))
+        if len(match) == 0:
+            raise ValueError('unknown curve: ' + kind + '/' + name + ', available: ' + ', '.join(self.list(kind)))
+        return match[0]
+
+    def list(self, kind=None):
+        """json filenames of the curves
+
+        Args:
+            kind: Kind of the curves (None for all).
+
+        Returns:
+            list of the json filenames
+        """
+        if kind is None:
+            return list(self.names)
+        return list(self.names[self.kinds == kind])
+
+    def get(self, kind, name):
+        """Efficiency of a curve, memoized
+
+        Args:
+            kind: Kind of the curve (filter, qe or telescope).
+            name: Json filename of the curve.
+
+        Returns:
+            Efficiency: the same as Efficiency.from_json of the file, shared between the calls and with read-only arrays.
+        """
+        key = (kind, name)
+        if key not in self._cache:
+            i = self.index(kind, name)
+            n = self.lengths[i]
+            wavelength_grid = self.wavelength[i, :n].copy()
+            efficiency_grid = self.efficiency[i, :n].copy()
+            # the Efficiency is shared by every caller, so its arrays are read-only
+            wavelength_grid.flags.writeable = False
+            efficiency_grid.flags.writeable = False
+            self._cache[key] = Efficiency(
+                wavelength_grid=wavelength_grid,
+                efficiency_grid=efficiency_grid,
+                title=self.titles[i],
+                comment=self.comments[i])
+        return self._cache[key]
+
+    def lookup(self, kind, **params):
+        """Efficiency of the curve with given parameters
+
+        Args:
+            kind: Kind of the curve.
+            params: Parameters, e.g. cut_on=1.0 (micron) for filters or temperature=170.0 (K) for QE.
+
+        Returns:
+            Efficiency
+        """
+        mask = self.kinds == kind
+        for key, value in params.items():
+            if key not in self.parameters:
+                raise ValueError('unknown parameter: ' + key + ', available: ' + ', '.join(self.parameters))
+            mask &= np.isclose(self.parameters[key], value)
+        match = np.flatnonzero(mask)
+        if len(match) == 0:
+            raise ValueError('no ' + kind + ' curve with ' + str(params))
+        return self.get(kind, self.names[match[0]])
+
+    def evaluate(self, wavelength, kind=None):
+        """evaluate the curves on a wavelength grid by linear interpolation
+
+        Args:
+            wavelength: Wavelength in micron, (Nwavelength,).
+            kind: Kind of the curves (None for all).
+
+        Returns:
+            efficiencies, (Ncurve, Nwavelength), in the order of list(kind)
+        """
+        rows = np.arange(len(self)) if kind is None else np.flatnonzero(self.kinds == kind)
+        return np.array([np.interp(wavelength, self.wavelength[i], self.efficiency[i]) for i in rows]).reshape(len(rows), -1)
+
+
+__registry = None
+
+
+def default_registry():
+    """registry of the curves in the data directory, loaded on first use
+
+    Returns:
+        CurveRegistry
+    """
+    global __registry
+    if __registry is None:
+        __registry = CurveRegistry()
+    return __registry
@@ -3,7 +3,7 @@
 """
 from pytest import approx
 import pkg_resources
-from telescope_baseline.dataclass.efficiency import Efficiency
+from telescope_baseline.dataclass.efficiency import Efficiency, Throughput
 import numpy as np
 
 def test_from_json():
@@ -31,3 +31,50 @@ def test_weighted_mean():
     val=efficiency.weighted_mean(wavref,weight)
     assert val==approx(0.8095121156784766)
     
+
+def _throughput():
+    teleff = Efficiency.from_json(pkg_resources.resource_filename('telescope_baseline', 'data/teleff.json'))
+    filt = Efficiency.from_json(pkg_resources.resource_filename('telescope_baseline', 'data/filter/filter100.json'))
+    qe = Efficiency.from_json(pkg_resources.resource_filename('telescope_baseline', 'data/qe/qe170.json'))
+    return [teleff, filt, qe], Throughput.from_efficiencies([teleff, filt, qe], powers=[1, 1, 2])
+
+def test_throughput_product():
+    effs, throughput = _throughput()
+    grid = throughput.wavelength_grid
+    ref = effs[0].evaluate(grid)*effs[1].evaluate(grid)*effs[2].evaluate(grid)**2
+    assert np.allclose(throughput.evaluate(grid), ref)
+    assert throughput.components == tuple(e.title for e in effs)
+    fine = Throughput.from_efficiencies(effs, wavelength_grid=np.linspace(0.8, 1.6, 801))
+    assert len(fine.wavelength_grid) == 801
+
+def test_throughput_default_grid():
+    effs, throughput = _throughput()
+    wavref = np.linspace(0.3, 2.0, 100001)
+    ref = effs[0].evaluate(wavref)*effs[1].evaluate(wavref)*effs[2].evaluate(wavref)**2
+    assert np.max(np.abs(throughput.evaluate(wavref)-ref)) < 1.e-6
+    assert np.max(np.diff(throughput.wavelength_grid)) <= 1.e-4*(1.0+1.e-9)
+    nodes = Throughput.from_efficiencies(effs, powers=[1, 1, 2], resolution=None)
+    assert np.all(np.isin(nodes.wavelength_grid, throughput.wavelength_grid))
+
+def test_throughput_from_json():
+    filename = pkg_resources.resource_filename('telescope_baseline', 'data/teleff.json')
+    throughput = Throughput.from_json(filename)
+    assert isinstance(throughput, Throughput)
+    assert throughput.evaluate(1.2) == approx(Efficiency.from_json(filename).evaluate(1.2))
+
+def test_throughput_weighted_mean_batch():
+    effs, throughput = _throughput()
+    wavref = np.linspace(0.8, 1.6, 1000)
+    weight = np.exp(-(wavref[np.newaxis, :]-np.linspace(1.0, 1.5, 7)[:, np.newaxis])**2.0/0.01)
+    val = throughput.weighted_mean(wavref, weight)
+    ref = [Efficiency.weighted_mean(throughput, wavref, w) for w in weight]
+    assert val.shape == (7,)
+    assert np.allclose(val, ref)
+
+def test_throughput_weighted_mean_ragged():
+    effs, throughput = _throughput()
+    wavelength = [np.linspace(0.8, 1.6, n) for n in [10, 300, 57]]
+    weight = [np.exp(-(w-1.2)**2.0) for w in wavelength]
+    val = throughput.weighted_mean(wavelength, weight)
+    ref = [Efficiency.weighted_mean(throughput, w, wt) for w, wt in zip(wavelength, weight)]
+    assert np.allclose(val, ref)
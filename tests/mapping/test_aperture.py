@@ -1,4 +1,6 @@
 from telescope_baseline.mapping.aperture import cos_angle_from_normal_vectorAB, vec2ring, inout_convex_on_sphere, square_convex, inout_single_square_convex, inout_detector
+from telescope_baseline.mapping.aperture import four_square_convexes, convexes_ang2vec, edge_normals, inout_convexes_on_sphere, count_convexes_on_sphere, lb2ang
+from telescope_baseline.mapping.pixelfunc import ang2vec
 from telescope_baseline.mapping.pixelfunc import vec2ang
 import numpy as np
 import pytest
@@ -63,5 +65,40 @@ def test_inout_detector():
     assert np.sum(ans)==2091
     return ans
 
+def _random_targets(N=2000, seed=1):
+    rng=np.random.default_rng(seed)
+    l=rng.uniform(-1.0,1.0,N)
+    b=rng.uniform(-1.0,1.0,N)
+    return lb2ang(l,b)
+
+def _convexesset():
+    width=22.4/4370.0
+    each_width=19.52/4370.0
+    return [four_square_convexes(lb2ang(l,b),PA,width,each_width) for l,b,PA in [(0.0,0.0,0.0),(0.3,-0.2,0.5),(-0.4,0.4,1.0)]]
+
+def test_inout_convexes_on_sphere():
+    targets=_random_targets()
+    convexesset=_convexesset()
+    normals=edge_normals(convexes_ang2vec(convexesset))
+    assert np.shape(normals)==(3,4,4,3)
+    mask=inout_convexes_on_sphere(normals,ang2vec(targets[0],targets[1]),max_elements=1000)
+    assert np.shape(mask)==(3,4,2000)
+    for i,convexes in enumerate(convexesset):
+        for j,convex in enumerate(convexes):
+            ref=inout_convex_on_sphere(convex,targets)
+            assert np.array_equal(mask[i,j],ref.astype(np.bool_))
+
+def test_count_convexes_on_sphere():
+    targets=_random_targets()
+    convexesset=_convexesset()
+    w=ang2vec(targets[0],targets[1])
+    normals=edge_normals(convexes_ang2vec(convexesset))
+    ref=np.sum(np.any(inout_convexes_on_sphere(normals,w),axis=1),axis=0)
+    counts=count_convexes_on_sphere(normals,w,max_elements=100)
+    assert np.array_equal(counts,ref)
+    assert np.max(counts)>1
+    counts=count_convexes_on_sphere(normals.reshape(-1,4,3),w)
+    assert np.array_equal(counts,np.sum(inout_convexes_on_sphere(normals,w),axis=(0,1)))
+
 if __name__=="__main__":
     test_inout_detector()
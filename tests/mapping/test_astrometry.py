@@ -0,0 +1,43 @@
+from telescope_baseline.mapping.astrometry import frame_accuracy, astrometric_accuracy, AstrometryPipeline
+from telescope_baseline.mapping.coverage import CoverageAccumulator
+from telescope_baseline.mapping.mapset import ditheringmap
+from telescope_baseline.mapping.aperture import lb2ang
+from telescope_baseline.mapping.targetset import TargetSet
+from telescope_baseline.photometry.snr import SNRCalculator
+import numpy as np
+
+def test_frame_accuracy_photon_noise():
+    calc=SNRCalculator()
+    calc.ndark=0.0
+    calc.nread=0.0
+    hw=np.array([11.0,12.5,14.0])
+    ac,sat=frame_accuracy(hw,"H",ac_ref=6000.0,mag_ref=12.5,calc=calc)
+    Nstar=10**(hw/-2.5)/10**(12.5/-2.5)
+    assert np.allclose(ac,6000.0/np.sqrt(Nstar))
+    assert not np.any(sat)
+
+def test_astrometric_accuracy():
+    counts=np.array([4,0,4,4,9])
+    hw=np.array([12.5,12.5,9.0,15.0,13.0])
+    final=astrometric_accuracy(counts,hw,"H",frames_per_count=2.0)
+    ac,sat=frame_accuracy(hw,"H")
+    assert np.isnan(final[1]) and np.isnan(final[2]) and np.isnan(final[3])
+    assert np.isclose(final[0],ac[0]/np.sqrt(8.0))
+    assert np.isclose(final[4],ac[4]/np.sqrt(18.0))
+    assert np.isclose(ac[0],6000.0)
+
+def test_astrometry_pipeline():
+    rng=np.random.default_rng(20)
+    N=3000
+    targets=TargetSet.from_ang(lb2ang(rng.uniform(-0.5,2.0,N),rng.uniform(-1.0,1.0,N)))
+    hw=rng.uniform(10.0,14.5,N)
+    convexesset=ditheringmap(0.6,0.3,0.0,2.88,[4,3])
+    pipeline=AstrometryPipeline(targets,hw,"H",frames_per_count=3.0)
+    pipeline.add_convexes(convexesset[:5])
+    pipeline.add_convexes(convexesset[5:])
+    acc=CoverageAccumulator(targets)
+    acc.add_convexes(convexesset)
+    assert np.array_equal(pipeline.counts,acc.counts)
+    final=pipeline.accuracy()
+    assert np.array_equal(np.isnan(final),acc.counts==0)
+    assert np.allclose(final[acc.counts>0],astrometric_accuracy(acc.counts,hw,"H",frames_per_count=3.0)[acc.counts>0])
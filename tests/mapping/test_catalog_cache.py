@@ -0,0 +1,74 @@
+import os
+import numpy as np
+import pkg_resources
+from telescope_baseline.mapping.catalog_cache import build_catalog_cache, load_catalog_cache, cache_path
+from telescope_baseline.mapping.read_catalog import read_jasmine_targets
+from telescope_baseline.mapping.targetset import TargetSet
+
+
+def _hdf():
+    return pkg_resources.resource_filename('telescope_baseline', 'data/cat.hdf')
+
+
+def test_catalog_cache(tmp_path):
+    hdf=_hdf()
+    path=build_catalog_cache(hdf,cachedir=str(tmp_path))
+    assert path == cache_path(hdf,cachedir=str(tmp_path))
+    mtime=os.path.getmtime(os.path.join(path,"vec.npy"))
+    col=load_catalog_cache(hdf,cachedir=str(tmp_path))
+    assert isinstance(col["vec"],np.memmap)
+    assert os.path.getmtime(os.path.join(path,"vec.npy")) == mtime
+    targets,l,b,hw=read_jasmine_targets(hdf)
+    assert np.array_equal(col["theta"],targets[0])
+    assert np.array_equal(col["phi"],targets[1])
+    assert np.array_equal(col["l"],l)
+    assert np.array_equal(col["b"],b)
+    assert np.array_equal(col["hw"],hw)
+
+
+def test_read_jasmine_targets_cache(tmp_path):
+    hdf=_hdf()
+    ref,l,b,hw=read_jasmine_targets(hdf,as_targetset=True)
+    targets,lc,bc,hwc=read_jasmine_targets(hdf,as_targetset=True,cache=True,cachedir=str(tmp_path))
+    assert isinstance(targets,TargetSet)
+    assert np.array_equal(targets.vec,ref.vec)
+    assert np.array_equal(lc,l)
+
+
+def test_read_jasmine_targets_cache_writable(tmp_path):
+    hdf=_hdf()
+    targets,l,b,hw=read_jasmine_targets(hdf,cache=True,cachedir=str(tmp_path))
+    for col in (targets,l,b,hw):
+        assert not isinstance(col,np.memmap)
+        assert col.flags.writeable
+    hw[0]=0.0
+    targets,l,b,hw=read_jasmine_targets(hdf,cache=True,cachedir=str(tmp_path))
+    assert hw[0] != 0.0
+
+
+def test_cache_key(tmp_path):
+    hdf=_hdf()
+    src=tmp_path/"cat.hdf"
+    src.write_bytes(open(hdf,"rb").read())
+    key=cache_path(str(src),cachedir=str(tmp_path))
+    src.write_bytes(open(hdf,"rb").read()+b"\0")
+    assert cache_path(str(src),cachedir=str(tmp_path)) != key
+
+
+def test_source_key_sidecar(tmp_path, monkeypatch):
+    import telescope_baseline.mapping.catalog_cache as catalog_cache
+    hdf=_hdf()
+    src=tmp_path/"cat.hdf"
+    src.write_bytes(open(hdf,"rb").read())
+    cachedir=str(tmp_path/"cache")
+    key=catalog_cache.source_key(str(src),cachedir)
+    assert key == catalog_cache.source_hash(str(src))
+    calls=[]
+    original=catalog_cache.source_hash
+    monkeypatch.setattr(catalog_cache,"source_hash",lambda f: calls.append(f) or original(f))
+    assert catalog_cache.source_key(str(src),cachedir) == key
+    assert calls == []
+    st=os.stat(str(src))
+    os.utime(str(src),ns=(st.st_atime_ns,st.st_mtime_ns+10**9))
+    assert catalog_cache.source_key(str(src),cachedir) == key
+    assert len(calls) == 1
@@ -0,0 +1,58 @@
+from telescope_baseline.mapping.coverage import CoverageAccumulator
+from telescope_baseline.mapping.targetindex import TargetIndex
+from telescope_baseline.mapping.targetset import TargetSet
+from telescope_baseline.mapping.mapset import fillgap_large_frame, inout_fillgap_large_frame, ditheringmap_vertices
+from telescope_baseline.mapping.aperture import lb2ang
+import numpy as np
+import pytest
+
+def _targets(N=5000, seed=4):
+    rng=np.random.default_rng(seed)
+    return TargetSet.from_ang(lb2ang(rng.uniform(-2.5,0.5,N),rng.uniform(-1.0,1.0,N)))
+
+def test_accumulator_fillgap_large_frame():
+    targets=_targets()
+    fillgap_large_convexes=fillgap_large_frame(-1.2,0.0,0.0)
+    ref=np.sum(inout_fillgap_large_frame(targets,fillgap_large_convexes),axis=(0,1,2))
+    accumulator=CoverageAccumulator(targets,dtype=np.int16)
+    pid=accumulator.add_convexes(fillgap_large_convexes)
+    assert len(pid)==48
+    assert accumulator.counts.dtype==np.int16
+    assert np.array_equal(accumulator.counts,ref)
+    with pytest.raises(ValueError):
+        accumulator.coo()
+
+def test_accumulator_record():
+    targets=_targets()
+    vertices=ditheringmap_vertices(-1.0,0.0,0.0,2.88,[6,4])
+    accumulator=CoverageAccumulator(targets,record=True,max_elements=5000)
+    accumulator.add(vertices[:10])
+    accumulator.add(vertices[10:])
+    assert accumulator.Npointing==24
+    p,t=accumulator.coo()
+    assert np.array_equal(np.bincount(t,minlength=len(targets)),accumulator.counts)
+    indexed=CoverageAccumulator(targets,record=True,index=TargetIndex(targets))
+    indexed.add(vertices)
+    assert np.array_equal(indexed.counts,accumulator.counts)
+    pi,ti=indexed.coo()
+    assert set(zip(pi,ti))==set(zip(p,t))
+
+def test_accumulator_overflow():
+    targets=_targets(N=2000)
+    vertices=ditheringmap_vertices(-1.0,0.0,0.0,2.88,[6,4])
+    ref=CoverageAccumulator(targets)
+    ref.add(vertices)
+    for record in [False,True]:
+        accumulator=CoverageAccumulator(targets,dtype=np.int8,record=record)
+        accumulator.counts[:]=127-np.max(ref.counts)
+        # the bound is exceeded but the actual counts fit
+        accumulator.add(vertices)
+        assert np.array_equal(accumulator.counts,ref.counts+127-np.max(ref.counts))
+        before=accumulator.counts.copy()
+        nrecord=len(accumulator.coo()[0]) if record else 0
+        with pytest.raises(OverflowError):
+            accumulator.add(vertices)
+        assert np.array_equal(accumulator.counts,before)
+        assert accumulator.Npointing==24
+        if record:
+            assert len(accumulator.coo()[0])==nrecord
@@ -0,0 +1,28 @@
+import numpy as np
+from astropy import units as u
+from astropy.coordinates import SkyCoord
+from telescope_baseline.mapping.galactic import ICRS_TO_GALACTIC, icrs2galactic, icrs2galactic_vec
+
+MICROARCSEC=np.pi/180.0/3600.0*1.e-6
+
+
+def test_rotation_matrix():
+    assert np.allclose(ICRS_TO_GALACTIC@ICRS_TO_GALACTIC.T,np.eye(3),rtol=0.0,atol=1.e-14)
+    assert np.isclose(np.linalg.det(ICRS_TO_GALACTIC),1.0)
+
+
+def test_icrs2galactic():
+    rng=np.random.default_rng(10)
+    ra=rng.uniform(0.0,360.0,20000)
+    dec=np.degrees(np.arcsin(rng.uniform(-1.0,1.0,20000)))
+    l,b,vec=icrs2galactic(ra,dec,chunksize=3000)
+    c=SkyCoord(ra=ra*u.degree,dec=dec*u.degree,frame='icrs').galactic
+    ref=c.cartesian.xyz.value.T
+    # angular separation of the unit vectors
+    assert np.max(np.linalg.norm(np.cross(vec,ref),axis=1)) < MICROARCSEC
+    assert np.max(np.abs(b-c.b.radian)) < MICROARCSEC
+    dl=np.angle(np.exp(1j*(l-c.l.radian)))
+    assert np.max(np.abs(dl*np.cos(b))) < MICROARCSEC
+    out=np.empty((len(ra),3))
+    assert icrs2galactic_vec(ra,dec,out=out) is out
+    assert np.array_equal(out,vec)
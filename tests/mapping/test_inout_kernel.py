@@ -0,0 +1,36 @@
+from telescope_baseline.mapping.inout_kernel import count_inout, group_caps
+from telescope_baseline.mapping.targetset import TargetSet
+from telescope_baseline.mapping.mapset import ditheringmap_vertices
+from telescope_baseline.mapping.aperture import edge_normals, inout_convexes_on_sphere, lb2ang
+import numpy as np
+import pytest
+
+def _targets(N=5000, seed=6):
+    rng=np.random.default_rng(seed)
+    return TargetSet.from_ang(lb2ang(rng.uniform(-0.5,2.0,N),rng.uniform(-1.0,1.0,N)))
+
+def test_group_caps():
+    vertices=ditheringmap_vertices(0.6,0.3,20.0,2.88,[3,2])
+    c,cosr=group_caps(edge_normals(vertices))
+    assert np.all(np.einsum('pgvk,pk->pgv',vertices,c) >= cosr[:,np.newaxis,np.newaxis]-1.e-12)
+    assert np.all(cosr > 0.99)
+
+def test_count_inout_numpy():
+    targets=_targets()
+    normals=edge_normals(ditheringmap_vertices(0.6,0.3,0.0,2.88,[10,5]))
+    ref=np.sum(np.any(inout_convexes_on_sphere(normals,targets),axis=1),axis=0)
+    counts=np.zeros(len(targets),dtype=np.int16)
+    count_inout(normals,targets.vec,counts,chunk_size=700,backend="numpy")
+    assert np.array_equal(counts,ref)
+    assert np.array_equal(count_inout(normals,targets.vec,backend=None),ref)
+
+def test_count_inout_numba():
+    pytest.importorskip("numba")
+    targets=_targets()
+    normals=edge_normals(ditheringmap_vertices(0.6,0.3,0.0,2.88,[10,5]))
+    ref=count_inout(normals,targets.vec,backend="numpy")
+    assert np.array_equal(count_inout(normals,targets.vec,backend="numba"),ref)
+
+def test_count_inout_backend():
+    with pytest.raises(ValueError):
+        count_inout(np.zeros((1,1,4,3)),np.zeros((1,3)),backend="cuda")
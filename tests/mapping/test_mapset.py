@@ -0,0 +1,41 @@
+from telescope_baseline.mapping.mapset import ditheringmap, ditheringmap_vertices, inout_convexesset
+from telescope_baseline.mapping.aperture import ang_detector_unit, four_square_convexes, four_square_vertices, convexes_ang2vec, lb2ang
+from telescope_baseline.mapping.pixelfunc import ang2vec
+import numpy as np
+
+def _ditheringmap_loop(l_center,b_center,PA_deg,dithering_width_mm,Ndither,width_mm=22.4,each_width_mm=19.52,EFL_mm=4370.0):
+    center=lb2ang(l_center,b_center)
+    PA=PA_deg/180.0*np.pi
+    width=width_mm/EFL_mm
+    each_width=each_width_mm/EFL_mm
+    dithering_width=dithering_width_mm/width_mm/2
+    convexesset=[]
+    for i in range(0,Ndither[0]):
+        for j in range(0,Ndither[1]):
+            pos=ang_detector_unit("R",dithering_width*i,center,PA,width)
+            convexes=four_square_convexes(ang_detector_unit("B",dithering_width*j,pos,PA,width), PA, width, each_width)
+            convexesset.append(convexes)
+    return convexesset
+
+def test_four_square_vertices():
+    center=lb2ang(0.3,-0.2)
+    PA=0.7
+    ref=convexes_ang2vec(four_square_convexes(center,PA,22.4/4370.0,19.52/4370.0))
+    v=four_square_vertices(ang2vec(center[0],center[1])[np.newaxis,:],PA,22.4/4370.0,19.52/4370.0)
+    assert np.shape(v)==(1,4,4,3)
+    assert np.allclose(v[0],ref,rtol=0.0,atol=1.e-14)
+
+def test_ditheringmap():
+    ref=convexes_ang2vec(_ditheringmap_loop(0.6,0.3,10.0,2.88,[5,4]))
+    v=ditheringmap_vertices(0.6,0.3,10.0,2.88,[5,4])
+    assert np.shape(v)==(20,4,4,3)
+    assert np.allclose(v,ref,rtol=0.0,atol=1.e-14)
+    assert np.allclose(convexes_ang2vec(ditheringmap(0.6,0.3,10.0,2.88,[5,4])),ref,rtol=0.0,atol=1.e-14)
+
+def test_inout_convexesset():
+    rng=np.random.default_rng(3)
+    targets=lb2ang(rng.uniform(0.0,1.5,5000),rng.uniform(-0.5,0.5,5000))
+    convexesset=ditheringmap(0.6,0.3,0.0,2.88,[5,4])
+    ans=inout_convexesset(targets,convexesset)
+    assert np.shape(ans)==(20,5000)
+    assert np.sum(ans)>0
@@ -0,0 +1,43 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+from telescope_baseline.mapping.plot_mapping import footprint_vertices, add_region, convert_to_convexes
+from telescope_baseline.mapping.aperture import ang2lb, lb2ang
+from telescope_baseline.mapping.mapset import ditheringmap
+import numpy as np
+
+def _convexes():
+    convexesset=ditheringmap(0.6,0.3,0.0,dithering_width_mm=2.88,Ndither=[3,2],width_mm=22.4,each_width_mm=19.52,EFL_mm=4370.0,left=1.0,top=-0.75)
+    return convert_to_convexes(convexesset)
+
+def test_footprint_vertices_matches_ang2lb():
+    pos=_convexes()
+    xy=footprint_vertices(pos)
+    assert xy.shape==(len(pos),np.shape(pos)[2],2)
+    for i in [0,7,len(pos)-1]:
+        l,b=ang2lb(pos[i,:])
+        assert np.allclose(xy[i,:,0],np.mod(l+180.0,360.0)-180.0)
+        assert np.allclose(xy[i,:,1],b)
+
+def test_footprint_vertices_wrap():
+    theta,phi=lb2ang(np.array([179.5,-179.5,-179.5,179.5]),np.array([-0.5,-0.5,0.5,0.5]))
+    xy=footprint_vertices(np.array([[theta,phi]]))
+    assert np.ptp(xy[0,:,0])<1.1
+
+def test_footprint_vertices_decimate_merge():
+    pos=_convexes()
+    assert len(footprint_vertices(pos,decimate=4))==len(pos[::4])
+    doubled=np.concatenate([pos,pos])
+    assert len(footprint_vertices(doubled,merge=1.e-4))==len(pos)
+    assert len(footprint_vertices(pos,merge=10.0))<=4
+
+def test_add_region_single_collection():
+    pos=_convexes()
+    fig=plt.figure()
+    ax=fig.add_subplot(111)
+    collection=add_region(pos,ax)
+    assert len(ax.collections)==1 and len(ax.patches)==0
+    assert len(collection.get_paths())==len(pos)
+    x0,x1=ax.get_xlim()
+    assert x0<=np.min(footprint_vertices(pos)[:,:,0]) and x1>=np.max(footprint_vertices(pos)[:,:,0])
+    plt.close(fig)
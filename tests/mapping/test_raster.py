@@ -0,0 +1,70 @@
+from telescope_baseline.mapping.raster import LBRaster, rasterize
+import numpy as np
+import pytest
+
+def _random_stars(N=20000,seed=21):
+    rng=np.random.default_rng(seed)
+    l=rng.uniform(-2.0,2.0,N)
+    b=rng.uniform(-1.0,1.0,N)
+    v=rng.normal(10.0,3.0,N)
+    return l,b,v
+
+def test_rasterize_count_matches_histogram2d():
+    l,b,v=_random_stars()
+    r=rasterize(l,b,bins=(40,20),lrange=(-2.0,2.0),brange=(-1.0,1.0),chunksize=3000)
+    ref,_,_=np.histogram2d(b,l,bins=(20,40),range=((-1.0,1.0),(-2.0,2.0)))
+    assert np.array_equal(r.image(),ref)
+    assert r.extent==(-2.0,2.0,-1.0,1.0)
+
+@pytest.mark.parametrize("reducer,func",[("sum",np.sum),("mean",np.mean),("min",np.min),("max",np.max)])
+def test_rasterize_reducers(reducer,func):
+    l,b,v=_random_stars()
+    v[::17]=np.nan
+    r=rasterize(l,b,values=v,bins=(8,4),reducer=reducer,lrange=(-2.0,2.0),brange=(-1.0,1.0),chunksize=1000)
+    img=r.image()
+    il=np.minimum(((l+2.0)/4.0*8).astype(int),7)
+    ib=np.minimum(((b+1.0)/2.0*4).astype(int),3)
+    ok=np.isfinite(v)
+    for j in range(4):
+        for i in range(8):
+            sel=ok&(il==i)&(ib==j)
+            assert np.isclose(img[j,i],func(v[sel]))
+
+def test_rasterize_median():
+    l,b,v=_random_stars()
+    r=rasterize(l,b,values=v,bins=(4,2),reducer="median",lrange=(-2.0,2.0),brange=(-1.0,1.0),value_bins=1024)
+    img=r.image()
+    width=(r.value_range[1]-r.value_range[0])/1024
+    sel=(l<-1.0)&(b<0.0)
+    assert abs(img[0,0]-np.median(v[sel]))<width
+
+def test_raster_empty_pixels_and_outside():
+    r=LBRaster((0.0,1.0),(0.0,1.0),bins=(2,2),reducer="mean")
+    r.add(np.array([0.1,0.2,5.0]),np.array([0.1,0.2,0.1]),np.array([1.0,3.0,100.0]))
+    img=r.image()
+    assert img[0,0]==2.0
+    assert np.isnan(img[1,1])
+    assert np.sum(r.count)==2
+
+def test_raster_errors():
+    with pytest.raises(ValueError):
+        LBRaster((0.0,1.0),(0.0,1.0),reducer="mode")
+    with pytest.raises(ValueError):
+        LBRaster((0.0,1.0),(0.0,1.0),reducer="median")
+    with pytest.raises(ValueError):
+        LBRaster((0.0,1.0),(0.0,1.0),reducer="mean").add(np.zeros(2),np.zeros(2))
+
+def test_plot_raster_modes(tmp_path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from telescope_baseline.mapping.plot_mapping import plot_targets, plot_n_targets, plot_ae_targets
+    l,b,v=_random_stars(N=5000)
+    ans=np.abs(l)<1.0
+    plot_targets(l,b,ans,outfile=str(tmp_path/"map.png"),raster=(40,20))
+    plot_targets(l,b,np.array([ans,b>0.0]),outfile=str(tmp_path/"map2.png"),raster=(40,20))
+    plot_n_targets(l,b,v,outfile=str(tmp_path/"nmap.png"),raster=(40,20))
+    plot_ae_targets(l,b,v,outfile=str(tmp_path/"aemap.png"),raster=(40,20))
+    plt.close("all")
+    for name in ["map.png","map2.png","nmap.png","aemap.png"]:
+        assert (tmp_path/name).stat().st_size>0
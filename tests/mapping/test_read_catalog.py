@@ -4,6 +4,32 @@ def test_inout_detector():
     hdf=pkg_resources.resource_filename('telescope_baseline', 'data/cat.hdf')
     targets,l,b, hw=read_jasmine_targets(hdf)
     print(len(targets))
-    
+
+def test_iter_jasmine_targets(tmp_path):
+    import pkg_resources
+    import numpy as np
+    from telescope_baseline.mapping.read_catalog import read_jasmine_targets, iter_jasmine_targets
+    hdf=pkg_resources.resource_filename('telescope_baseline', 'data/cat.hdf')
+    targets,l,b,hw=read_jasmine_targets(hdf,as_targetset=True)
+    mask=(hw<12.0)&(l>=-0.5)&(l<0.5)&(b>=-0.3)&(b<0.3)
+    for cache in (False,True):
+        chunks=list(iter_jasmine_targets(hdf,chunksize=20000,hw_range=(None,12.0),l_range=(-0.5,0.5),b_range=(-0.3,0.3),cache=cache,cachedir=str(tmp_path)))
+        assert len(chunks) > 1
+        index=np.concatenate([c[4] for c in chunks])
+        assert np.array_equal(index,np.flatnonzero(mask))
+        assert np.allclose(np.concatenate([c[0].vec for c in chunks]),targets.vec[mask],rtol=0.0,atol=1.e-12)
+        assert np.array_equal(np.concatenate([c[3] for c in chunks]),hw[mask])
+
+def test_read_jasmine_targets_skycoord():
+    import pkg_resources
+    import numpy as np
+    from telescope_baseline.mapping.read_catalog import read_jasmine_targets
+    hdf=pkg_resources.resource_filename('telescope_baseline', 'data/cat.hdf')
+    targets,l,b,hw=read_jasmine_targets(hdf,as_targetset=True)
+    ref,lref,bref,hwref=read_jasmine_targets(hdf,as_targetset=True,use_skycoord=True)
+    mas=np.pi/180.0/3600.0*1.e-3
+    assert np.max(np.linalg.norm(np.cross(targets.vec,ref.vec),axis=1)) < 1.e-3*mas
+    assert np.max(np.abs(b-bref)) < 1.e-6/3600.0
+
 if __name__=="__main__":
     test_inout_detector()
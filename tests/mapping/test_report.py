@@ -0,0 +1,53 @@
+from telescope_baseline.mapping.report import FigureRenderer, render_report, FIGURES
+from telescope_baseline.mapping.plot_mapping import convert_to_convexes
+from telescope_baseline.mapping.mapset import ditheringmap
+import numpy as np
+import pytest
+
+def _configs(n=3,N=3000,seed=23):
+    rng=np.random.default_rng(seed)
+    l=rng.uniform(-1.0,2.0,N)
+    b=rng.uniform(-1.0,1.5,N)
+    pos=convert_to_convexes(ditheringmap(0.6,0.3,0.0,dithering_width_mm=2.88,Ndither=[2,2],width_mm=22.4,each_width_mm=19.52,EFL_mm=4370.0,left=1.0,top=-0.75))
+    configs=[{"name":"c%d"%i,"nans":rng.integers(0,5+i,N),"final_ac":rng.uniform(10.0,60.0,N),"pos":pos} for i in range(n)]
+    return l,b,configs
+
+def test_render_in_process(tmp_path):
+    import matplotlib.pyplot as plt
+    l,b,configs=_configs()
+    del configs[1]["final_ac"]
+    files=render_report(configs,l,b,outdir=str(tmp_path),nproc=1,raster=(30,20))
+    assert set(files[0])==set(FIGURES)
+    assert set(files[1])==set(FIGURES)-{"accuracy"}
+    for f in files:
+        for path in f.values():
+            assert (tmp_path/path.split("/")[-1]).stat().st_size>0
+    assert plt.get_fignums()==[]
+
+def test_renderer_reuses_figure(tmp_path):
+    l,b,configs=_configs(n=2)
+    renderer=FigureRenderer(l,b,outdir=str(tmp_path),names=("coverage","footprints"),raster=None)
+    fig=renderer.fig
+    for config in configs:
+        renderer.render(config)
+        assert renderer.fig is fig and len(fig.axes)==0
+    assert len(list(tmp_path.iterdir()))==4
+    with pytest.raises(ValueError):
+        FigureRenderer(l,b,names=("skymap",))
+
+def test_render_parallel(tmp_path):
+    l,b,configs=_configs(n=4)
+    files=render_report(configs,l,b,outdir=str(tmp_path),names=("coverage","nhist"),nproc=2,raster=(30,20))
+    assert [f["coverage"].split("/")[-1] for f in files]==["c%d_coverage.png"%i for i in range(4)]
+    assert len(list(tmp_path.iterdir()))==8
+
+def test_render_without_pyplot(tmp_path):
+    import subprocess, sys
+    code=("import sys\n"
+          "from telescope_baseline.mapping.report import render_report\n"
+          "import numpy as np\n"
+          "l=np.linspace(-1.0,1.0,100);b=np.linspace(-1.0,1.0,100)\n"
+          "render_report([{'name':'c','nans':np.arange(100)%5,'final_ac':np.full(100,20.0)}],l,b,outdir=sys.argv[1],nproc=1,raster=(10,10))\n"
+          "assert 'matplotlib.pyplot' not in sys.modules\n")
+    subprocess.run([sys.executable,"-c",code,str(tmp_path)],check=True)
+    assert len(list(tmp_path.iterdir()))==3
@@ -0,0 +1,78 @@
+from telescope_baseline.mapping.sweep import SweepExecutor, parallel_count
+from telescope_baseline.mapping.targetset import TargetSet
+from telescope_baseline.mapping.mapset import ditheringmap_vertices
+from telescope_baseline.mapping.aperture import edge_normals, count_convexes_on_sphere, lb2ang
+import numpy as np
+import pytest
+
+def _targets(N=5000, seed=5):
+    rng=np.random.default_rng(seed)
+    return TargetSet.from_ang(lb2ang(rng.uniform(-0.5,2.0,N),rng.uniform(-1.0,1.0,N)))
+
+def test_parallel_count():
+    targets=_targets()
+    vertices=ditheringmap_vertices(0.6,0.3,0.0,2.88,[10,5])
+    ref=count_convexes_on_sphere(edge_normals(vertices),targets)
+    assert np.array_equal(parallel_count(targets,vertices,nproc=2),ref)
+    assert np.array_equal(parallel_count(targets,vertices,nproc=1),ref)
+
+def test_sweep_executor_reuse():
+    targets=_targets()
+    vertices=ditheringmap_vertices(0.6,0.3,0.0,2.88,[10,5])
+    ref=count_convexes_on_sphere(edge_normals(vertices),targets)
+    with SweepExecutor(targets,nproc=2) as executor:
+        counts=executor.count(vertices[:17])+executor.count(vertices[17:],nshard=3)
+    assert np.array_equal(counts,ref)
+
+def test_sweep_executor_pool_failure(monkeypatch):
+    from multiprocessing import shared_memory
+    import telescope_baseline.mapping.sweep as sweep
+    created=[]
+    class RecordedSharedMemory(shared_memory.SharedMemory):
+        def __init__(self,*args,**kwargs):
+            super().__init__(*args,**kwargs)
+            created.append(self.name)
+    def fail(*args,**kwargs):
+        raise OSError("no pool")
+    monkeypatch.setattr(sweep.shared_memory,"SharedMemory",RecordedSharedMemory)
+    monkeypatch.setattr(sweep,"Pool",fail)
+    with pytest.raises(OSError):
+        SweepExecutor(_targets(N=100),nproc=2)
+    assert len(created)==1
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=created[0])
+
+def test_worker_attach_detach():
+    import telescope_baseline.mapping.sweep as sweep
+    from multiprocessing import shared_memory
+    vec=np.arange(12.0).reshape(4,3)
+    shm=shared_memory.SharedMemory(create=True,size=vec.nbytes)
+    try:
+        np.ndarray(vec.shape,dtype=vec.dtype,buffer=shm.buf)[:]=vec
+        sweep._attach(shm.name,vec.shape,vec.dtype.str)
+        assert np.array_equal(sweep._worker_vec,vec)
+        sweep._detach()
+        assert sweep._worker_shm is None and sweep._worker_vec is None
+    finally:
+        shm.close()
+        shm.unlink()
+
+def test_sweep_executor_empty():
+    targets=_targets(N=100)
+    vertices=ditheringmap_vertices(0.6,0.3,0.0,2.88,[10,5])
+    for nproc in [1,2]:
+        with SweepExecutor(targets,nproc=nproc) as executor:
+            counts=executor.count(vertices[:0])
+        assert counts.dtype == np.int32
+        assert np.array_equal(counts,np.zeros(100,dtype=np.int32))
+
+def test_sweep_executor_overflow():
+    targets=_targets(N=500)
+    vertices=np.repeat(ditheringmap_vertices(0.6,0.3,0.0,2.88,[10,5])[:1],200,axis=0)
+    for nproc in [1,2]:
+        with SweepExecutor(targets,nproc=nproc,dtype=np.int8) as executor:
+            with pytest.raises(OverflowError):
+                executor.count(vertices)
+            counts=executor.count(vertices[:100])
+        assert counts.dtype == np.int8
+        assert np.max(counts) == 100
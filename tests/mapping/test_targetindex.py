@@ -0,0 +1,32 @@
+from telescope_baseline.mapping.targetindex import TargetIndex
+from telescope_baseline.mapping.targetset import TargetSet
+from telescope_baseline.mapping.aperture import four_square_convexes, convexes_ang2vec, edge_normals, count_convexes_on_sphere, lb2ang
+import numpy as np
+
+def _targets(N=20000, seed=2):
+    rng=np.random.default_rng(seed)
+    return TargetSet.from_ang(lb2ang(rng.uniform(-1.5,1.5,N),rng.uniform(-1.0,1.0,N)))
+
+def _vertices():
+    width=22.4/4370.0
+    each_width=19.52/4370.0
+    pointings=[(0.0,0.0,0.0),(0.05,-0.3,0.5),(-0.7,0.4,1.0),(1.2,0.8,0.2)]
+    return convexes_ang2vec([four_square_convexes(lb2ang(l,b),PA,width,each_width) for l,b,PA in pointings])
+
+def test_count_convexes_on_sphere_index():
+    targets=_targets()
+    vertices=_vertices()
+    ref=count_convexes_on_sphere(edge_normals(vertices),targets)
+    for cell_deg in [0.05,0.25,2.0]:
+        index=TargetIndex(targets,cell_deg=cell_deg)
+        assert np.array_equal(index.count_convexes_on_sphere(vertices),ref)
+    assert np.sum(ref)>0
+
+def test_candidates_are_local():
+    targets=_targets()
+    vertices=_vertices()
+    index=TargetIndex(targets,cell_deg=0.1)
+    cand=index.candidates(vertices[0])
+    assert 0 < len(cand) < len(targets)/4
+    hits=index.hit_indices(vertices[0])
+    assert np.all(np.isin(hits,index.order[cand]))
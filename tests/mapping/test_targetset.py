@@ -0,0 +1,37 @@
+from telescope_baseline.mapping.targetset import TargetSet, target_vectors
+from telescope_baseline.mapping.aperture import inout_detector, inout_convex_on_sphere, square_convex, lb2ang
+from telescope_baseline.mapping.pixelfunc import ang2vec
+import numpy as np
+import pytest
+
+def test_targetset_vec():
+    ang=lb2ang(np.array([-1.0,0.0,1.0]),np.array([0.5,0.0,-0.5]))
+    ts=TargetSet.from_ang(ang)
+    assert len(ts)==3
+    assert ts.vec.flags['C_CONTIGUOUS']
+    assert np.allclose(ts.vec,ang2vec(ang[0],ang[1]))
+    assert np.allclose(target_vectors(ts),target_vectors(ang))
+    ts32=TargetSet.from_ang(ang,dtype=np.float32)
+    assert ts32.vec.dtype==np.float32
+    ts2=TargetSet.from_vec(ts.vec)
+    assert np.allclose(ang2vec(ts2.theta,ts2.phi),ts.vec)
+
+def test_targetset_invalid_theta():
+    with pytest.raises(ValueError):
+        TargetSet(np.array([-1.0]),np.array([0.0]))
+
+def test_inout_convex_on_sphere_targetset():
+    ang=lb2ang(np.linspace(-0.3,0.3,101),np.linspace(-0.2,0.2,101))
+    convex=square_convex(lb2ang(0.0,0.0),0.3,0.1/180.0*np.pi)
+    ans=inout_convex_on_sphere(convex,TargetSet.from_ang(ang))
+    assert np.array_equal(ans,inout_convex_on_sphere(convex,ang))
+    assert np.sum(ans)>0
+
+def test_inout_detector_targetset():
+    import pkg_resources
+    from telescope_baseline.mapping.read_catalog import read_jasmine_targets
+    hdf=pkg_resources.resource_filename('telescope_baseline', 'data/cat.hdf')
+    targets,l,b, hw=read_jasmine_targets(hdf,as_targetset=True)
+    assert isinstance(targets,TargetSet)
+    ans=inout_detector(targets,-0.5,0.5,30.0, width_mm=22.4, each_width_mm=19.52, EFL_mm=4370.0)
+    assert np.sum(ans)==2091
@@ -4,13 +4,39 @@
 import pytest
 from telescope_baseline.photometry import Hw_coeff
 
-def test_compute_Hw_relation():
+def test_compute_Hw_relation(tmp_path, monkeypatch):
+    monkeypatch.setenv("TELESCOPE_BASELINE_CACHE", str(tmp_path))
     res, sigma, colors, ar_J_H, ar_Hw_H, residuals=Hw_coeff.compute_Hw_relation(9000.0, 16000.0)
     assert res.x[0]==pytest.approx(-0.06296266744365273)
     assert res.x[1]==pytest.approx(1.0927312678280945)
     assert sigma==pytest.approx(0.06436883637183226)
     assert res.fun==pytest.approx(1.5602719373940506)
 
+def test_photon_executor(tmp_path):
+    import numpy as np
+    fil_J, fil_H = Hw_coeff.load_filter()
+    fil_Hw = Hw_coeff.set_range_Hw_band(9000.0, 16000.0)
+    with Hw_coeff.PhotonExecutor(nproc=2, min_parallel=0, cachedir=str(tmp_path)) as executor:
+        data_spec = Hw_coeff.read_map_multi(executor.spectra_all)
+        photons = executor.calphoton_many([(fil_J, 0.0), (fil_Hw, 15.0)])
+        assert photons.shape == (2, len(data_spec))
+        assert np.allclose(photons[0], Hw_coeff.calphoton_map_multi(data_spec, fil_J, 0.0), rtol=1.e-12)
+        assert np.allclose(photons[1], Hw_coeff.calphoton_map_multi(data_spec, fil_Hw, 15.0), rtol=1.e-12)
+        for Hw_l, Hw_u in [(9000.0, 16000.0), (10000.0, 16000.0)]:
+            res, sigma, colors, ar_J_H, ar_Hw_H, residuals = Hw_coeff.compute_Hw_relation(Hw_l, Hw_u, executor=executor)
+        assert np.all(np.isfinite(res.x))
+
+def test_photon_executor_readonly_cache():
+    import numpy as np
+    spectra_all = Hw_coeff.read_spectra_all()[:3]
+    fil_J, fil_H = Hw_coeff.load_filter()
+    with pytest.warns(UserWarning):
+        executor = Hw_coeff.PhotonExecutor(spectra_all, nproc=2, min_parallel=0, cachedir="/proc/nocache")
+    with executor:
+        data_spec = [Hw_coeff.load_stellar_spectra(x) for x in spectra_all]
+        assert np.allclose(executor.calphoton(fil_J, 0.0), Hw_coeff.calphoton_map_multi(data_spec, fil_J, 0.0), rtol=1.e-12)
+
 if __name__ == "__main__":
-    test_compute_Hw_relation()
+    import tempfile
+    test_compute_Hw_relation(tempfile.mkdtemp(), pytest.MonkeyPatch())
     
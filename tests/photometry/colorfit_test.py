@@ -0,0 +1,36 @@
+"""test for colorfit.
+
+"""
+import pytest
+import numpy as np
+from telescope_baseline.photometry.colorfit import fit_color_relation, poly_eval
+from telescope_baseline.photometry.Hw_coeff import least_sq
+
+
+def test_fit_color_relation():
+    rng = np.random.default_rng(15)
+    x = rng.uniform(-0.5, 3.0, 200)
+    y = -0.06*x**2 + 1.09*x + rng.normal(0.0, 0.05, 200)
+    res = fit_color_relation(x, y)
+    assert res.x == pytest.approx([-0.06, 1.09], abs=0.02)
+    assert res.fun == pytest.approx(least_sq(res.x, x, y))
+    assert least_sq(res.x + [1.e-4, 0.0], x, y) > res.fun
+    assert np.allclose(res.residuals, y - poly_eval(x, res.x))
+
+
+def test_fit_color_relation_batch():
+    rng = np.random.default_rng(16)
+    x = rng.uniform(-0.5, 3.0, 100)
+    Y = rng.normal(0.0, 1.0, (7, 100)) + x
+    w = rng.uniform(0.5, 2.0, 100)
+    res = fit_color_relation(x, Y, degree=3, weights=w, intercept=True)
+    assert res.x.shape == (7, 4)
+    for k in range(7):
+        single = fit_color_relation(x, Y[k], degree=3, weights=w, intercept=True)
+        assert np.allclose(res.x[k], single.x)
+        assert res.fun[k] == pytest.approx(single.fun)
+        assert res.std[k] == pytest.approx(single.std)
+
+
+if __name__ == "__main__":
+    test_fit_color_relation()
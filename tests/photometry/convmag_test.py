@@ -1,16 +1,17 @@
 """test for nstar.
 
 """
+import os
 import pytest
-from telescope_baseline.photometry.convmag import get_magdict, get_flux, get_mag
+from telescope_baseline.photometry.convmag import get_magdict, get_flux, get_mag, MagConverter
 from astropy import units as u
+from astropy import constants as const
 import numpy as np
 
 def test_get_flux():
     band = "J"
     mag = 10.0
     magdict = get_magdict()
-    mask = magdict['band'] == band
     flux = get_flux(band, mag, magdict)
     assert flux.to(u.erg/u.s/u.m/u.m/u.nm).value == pytest.approx(3.3113112148259078e-09)
 
@@ -20,6 +21,52 @@ def test_get_mag():
     flux=3.3113112148259078e-09*u.erg/u.s/u.m/u.m/u.nm
     assert get_mag(band, flux, magdict)==pytest.approx(10.0)
 
+def test_mag_converter():
+    conv = MagConverter()
+    magdict = get_magdict()
+    mag = np.array([10.0, 12.5, 8.0])
+    band = np.array(["J", "H", "Ks"])
+    flux = conv.flux(mag, band)
+    for m, b, f in zip(mag, band, flux):
+        assert f == pytest.approx(get_flux(b, m, magdict).value, rel=1.e-12)
+    assert conv.flux(10.0, "J", unit=True).to(u.erg/u.s/u.m/u.m/u.nm).value == pytest.approx(3.3113112148259078e-09)
+    assert np.allclose(conv.mag(flux, band), mag)
+    assert conv.mag(3.3113112148259078e-09*u.erg/u.s/u.m/u.m/u.nm, "J") == pytest.approx(10.0)
+    photon = conv.photon_flux(10.0, "J")
+    ref = (get_flux("J", 10.0, magdict)*0.26*u.micron/(const.h*const.c/(1.22*u.micron))).to(1/u.s/u.cm**2).value
+    assert photon == pytest.approx(ref, rel=1.e-9)
+    with pytest.raises(ValueError):
+        conv.flux(10.0, "Hw")
+
+
+def test_mag_converter_many():
+    conv = MagConverter()
+    magdict = get_magdict()
+    rng = np.random.default_rng(18)
+    mag = rng.uniform(8.0, 15.0, 1000)
+    band = rng.choice(["J", "H", "Ks"], 1000)
+    ref = np.array([get_flux(b, m, magdict).value for m, b in zip(mag, band)])
+    assert np.allclose(conv.flux(mag, band), ref, rtol=1.e-12, atol=0.0)
+    assert np.allclose(conv.flux(mag, "J"), get_flux("J", mag, magdict).value, rtol=1.e-12, atol=0.0)
+
+
+@pytest.mark.skipif(not os.environ.get("TELESCOPE_BASELINE_BENCHMARK"), reason="benchmark, set TELESCOPE_BASELINE_BENCHMARK=1 to run")
+def test_mag_converter_benchmark():
+    import time
+    conv = MagConverter()
+    N = 10**6
+    rng = np.random.default_rng(18)
+    mag = rng.uniform(8.0, 15.0, N)
+    band = rng.choice(["J", "H", "Ks"], N)
+    start = time.perf_counter()
+    conv.flux(mag, "J")
+    single = (time.perf_counter()-start)/N
+    start = time.perf_counter()
+    conv.flux(mag, band)
+    mixed = (time.perf_counter()-start)/N
+    assert single < 1.e-6, "single band: {:.1f} ns per star".format(single*1.e9)
+    assert mixed < 1.e-5, "mixed bands: {:.1f} ns per star".format(mixed*1.e9)
+
 
 if __name__ == "__main__":
     test_get_flux()
@@ -0,0 +1,51 @@
+"""test for extinction.
+
+"""
+import pytest
+import numpy as np
+from telescope_baseline.photometry import extinction
+from telescope_baseline.photometry.Hw_coeff import A_lambda
+
+
+def test_linear_law():
+    x = np.linspace(1150.0, 25000.0, 101)
+    Av = np.linspace(0.0, 60.0, 13)
+    trans = extinction.transmission(x, Av)
+    assert trans.shape == (13, 101)
+    assert np.allclose(trans, 10**(-1*A_lambda(Av[:, np.newaxis], x[np.newaxis, :])/2.5), rtol=1.e-12, atol=0.0)
+    assert extinction.transmission(x, Av.copy()) is trans
+    assert not trans.flags.writeable
+
+
+def test_tabulated_law(tmp_path, monkeypatch):
+    monkeypatch.setattr(extinction, "_laws", dict(extinction._laws))
+    filename = tmp_path/"law.dat"
+    filename.write_text("# wavelength A/Av\n10000.0 0.4\n20000.0 0.1\n")
+    law = extinction.TabulatedLaw.from_file(str(filename), name="test_law")
+    extinction.register_law(law)
+    trans = extinction.transmission([10000.0, 15000.0, 30000.0], 10.0, law="test_law")
+    assert np.allclose(trans[0], 10**(-np.array([4.0, 2.5, 1.0])/2.5))
+    with pytest.raises(ValueError):
+        extinction.get_law("no_such_law")
+
+
+def test_cache_bytes(monkeypatch):
+    monkeypatch.setattr(extinction, "_cache", extinction.OrderedDict())
+    x = np.linspace(10000.0, 20000.0, 100)
+    Av = np.linspace(0.0, 10.0, 10)
+    monkeypatch.setattr(extinction, "CACHE_BYTES", 2*Av.size*x.size*8)
+    first = extinction.transmission(x, Av)
+    extinction.transmission(x, Av+1.0)
+    assert extinction.transmission(x, Av) is first
+    extinction.transmission(x, Av+2.0)
+    assert len(extinction._cache) == 2
+    assert extinction.transmission(x, Av) is first
+    large = extinction.transmission(x, np.linspace(0.0, 10.0, 30))
+    assert large.shape == (30, 100)
+    assert len(extinction._cache) == 2
+    extinction.clear_cache()
+    assert len(extinction._cache) == 0
+
+
+if __name__ == "__main__":
+    test_linear_law()
@@ -0,0 +1,27 @@
+"""test for passband.
+
+"""
+import pytest
+from telescope_baseline.photometry.passband import sweep_Hw_relation, passband_pairs
+from telescope_baseline.photometry.synphot import SynPhot
+
+
+def test_passband_pairs():
+    lower, upper = passband_pairs([9000.0, 12000.0, 16000.0], [12000.0, 16000.0])
+    assert list(zip(lower, upper)) == [(9000.0, 12000.0), (9000.0, 16000.0), (12000.0, 16000.0)]
+
+
+def test_sweep_Hw_relation(tmp_path):
+    synphot = SynPhot.from_files(cachedir=str(tmp_path))
+    table = sweep_Hw_relation([9000.0, 10000.0], [16000.0, 17000.0], synphot=synphot, chunksize=3)
+    assert len(table) == 4
+    row = table[(table["Hw_l"] == 9000.0) & (table["Hw_u"] == 16000.0)].iloc[0]
+    assert row["x0"] == pytest.approx(-0.06296266744365273)
+    assert row["x1"] == pytest.approx(1.0927312678280945)
+    assert row["std"] == pytest.approx(0.06436883637183226)
+    assert row["chi2"] == pytest.approx(1.5602719373940506)
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_sweep_Hw_relation(tempfile.mkdtemp())
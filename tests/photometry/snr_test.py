@@ -0,0 +1,82 @@
+"""test for snr.
+
+"""
+import os
+import pytest
+import numpy as np
+from astropy import constants as const
+from astropy import units as u
+from telescope_baseline.photometry.photoclass import InstClass, ObsClass, TargetClass
+from telescope_baseline.photometry.snr import SNRCalculator
+
+
+def _obs(teff, rstar, d):
+    inst = InstClass()
+    target = TargetClass()
+    target.teff = teff*u.K
+    target.rstar = rstar*const.R_sun
+    target.d = d*u.pc
+    obs = ObsClass(inst, target)
+    obs.texposure = 0.0833*u.h
+    obs.tframe = 12.5*u.s
+    obs.napix = 15
+    obs.mu = 1
+    obs.effnpix = 1.7*1.7*np.pi/3.0
+    obs.update()
+    return inst, obs
+
+
+def _v(x):
+    return x.to(1).value if hasattr(x, "unit") else x
+
+
+def test_match_obsclass():
+    teff = np.array([3000.0, 5800.0])
+    rstar = np.array([0.2, 1.0])
+    d = np.array([16.0, 10.0])
+    calc = SNRCalculator()
+    res = calc.noise_from_blackbody(teff, rstar*const.R_sun, d*u.pc, 0.0833*u.h, 12.5*u.s, 15, effnpix=1.7*1.7*np.pi/3.0)
+    for i in range(2):
+        inst, obs = _obs(teff[i], rstar[i], d[i])
+        assert res.nphoton_exposure[i] == pytest.approx(_v(obs.nphoton_exposure), rel=1.e-10)
+        assert res.nphoton_frame[i] == pytest.approx(_v(obs.nphoton_frame), rel=1.e-10)
+        assert res.sign[i] == pytest.approx(_v(obs.sign), rel=1.e-10)
+        assert res.sigd[i] == pytest.approx(_v(obs.sigd), rel=1.e-10)
+        assert res.sigr[i] == pytest.approx(_v(obs.sigr), rel=1.e-10)
+        assert res.sigd_relative[i] == pytest.approx(_v(obs.sigd_relative), rel=1.e-10)
+        assert res.sat[i] == obs.sat
+
+
+def test_noise_from_mag():
+    from telescope_baseline.photometry.convmag import MagConverter
+    calc = SNRCalculator()
+    conv = MagConverter()
+    mag = np.array([10.0, 12.5, 14.5])
+    res = calc.noise_from_mag(mag, "H", 12.5, 12.5, 15)
+    photonf = conv.flux(mag, "H", unit=True)*calc.lamb*u.m/(const.h*const.c)
+    ref = (photonf*calc.dlam*u.m*calc.area*u.m**2*12.5*u.s*calc.throughput).to(1).value
+    assert np.allclose(res.nphoton_exposure, ref, rtol=1.e-10)
+    assert np.all(np.diff(res.snr) < 0.0)
+
+
+@pytest.mark.skipif(not os.environ.get("TELESCOPE_BASELINE_BENCHMARK"), reason="benchmark, set TELESCOPE_BASELINE_BENCHMARK=1 to run")
+def test_snr_benchmark():
+    import time
+    calc = SNRCalculator()
+    N = 10**6
+    rng = np.random.default_rng(19)
+    start = time.perf_counter()
+    res = calc.noise_from_mag(rng.uniform(8.0, 14.5, N), "H", 12.5, 12.5, 15, effnpix=3.0)
+    per_star_mag = (time.perf_counter()-start)/N
+    assert res.snr.shape == (N,)
+    N = 10**5
+    start = time.perf_counter()
+    res = calc.noise_from_blackbody(rng.uniform(3000.0, 10000.0, N), 7.e8, 3.e17, 12.5, 12.5, 15, effnpix=3.0)
+    per_star_bb = (time.perf_counter()-start)/N
+    assert res.snr.shape == (N,)
+    assert per_star_mag < 1.e-5, "magnitudes: {:.2f} us per star".format(per_star_mag*1.e6)
+    assert per_star_bb < 1.e-4, "blackbody: {:.2f} us per star".format(per_star_bb*1.e6)
+
+
+if __name__ == "__main__":
+    test_match_obsclass()
@@ -0,0 +1,59 @@
+"""test for speclib.
+
+"""
+import os
+import shutil
+import numpy as np
+import pytest
+from telescope_baseline.photometry import speclib
+from telescope_baseline.photometry.Hw_coeff import load_stellar_spectra, read_spectra_all
+
+
+def test_spectral_library(tmp_path):
+    spectra_all = read_spectra_all()[:5]
+    path = speclib.build_spectral_library(spectra_all, cachedir=str(tmp_path))
+    assert speclib.build_spectral_library(spectra_all, cachedir=str(tmp_path)) == path
+    library = speclib.load_spectral_library(spectra_all, cachedir=str(tmp_path))
+    assert library.names == spectra_all
+    for i, name in enumerate(spectra_all):
+        assert np.array_equal(library[name], load_stellar_spectra(name))
+        assert np.shares_memory(library[i], library.data)
+    assert isinstance(library.data, np.memmap)
+
+
+def test_in_memory_fallback():
+    spectra_all = read_spectra_all()[:3]
+    with pytest.warns(UserWarning):
+        library = speclib.load_spectral_library(spectra_all, cachedir="/proc/nocache")
+    assert library.path is None
+    assert not isinstance(library.data, np.memmap)
+    for name in spectra_all:
+        assert np.array_equal(library[name], load_stellar_spectra(name))
+
+
+def test_disk_cache_opt_in(tmp_path, monkeypatch):
+    spectra_all = read_spectra_all()[:3]
+    monkeypatch.delenv("TELESCOPE_BASELINE_CACHE", raising=False)
+    monkeypatch.setenv("HOME", str(tmp_path/"home"))
+    library = speclib.load_spectral_library(spectra_all)
+    assert library.path is None
+    assert not os.path.exists(str(tmp_path/"home"))
+    monkeypatch.setenv("TELESCOPE_BASELINE_CACHE", str(tmp_path/"cache"))
+    library = speclib.load_spectral_library(spectra_all)
+    assert os.path.dirname(library.path) == str(tmp_path/"cache")
+    assert isinstance(library.data, np.memmap)
+
+
+def test_library_key(tmp_path, monkeypatch):
+    name = read_spectra_all()[0]
+    shutil.copy(os.path.join(speclib.SPECTRA_DIR, name), str(tmp_path))
+    monkeypatch.setattr(speclib, "SPECTRA_DIR", str(tmp_path))
+    key = speclib.library_key([name])
+    st = os.stat(os.path.join(str(tmp_path), name))
+    os.utime(os.path.join(str(tmp_path), name), ns=(st.st_atime_ns, st.st_mtime_ns+10**9))
+    assert speclib.library_key([name]) != key
+
+
+if __name__ == "__main__":
+    import tempfile
+    test_spectral_library(tempfile.mkdtemp())
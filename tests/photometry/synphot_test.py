@@ -0,0 +1,52 @@
+"""test for synphot.
+
+"""
+import pytest
+import numpy as np
+from telescope_baseline.photometry import Hw_coeff
+from telescope_baseline.photometry.synphot import SynPhot
+
+
+def test_photon_cube():
+    spectra_all = Hw_coeff.read_spectra_all()[::20]
+    data_spec = [Hw_coeff.load_stellar_spectra(x) for x in spectra_all]
+    syn = SynPhot(data_spec)
+    fil_J, fil_H = Hw_coeff.load_filter()
+    fil_Hw = Hw_coeff.set_range_Hw_band(9000.0, 16000.0)
+    Av = [0.0, 15.0, 60.0]
+    cube = syn.photon_cube([fil_J, fil_H, fil_Hw], Av)
+    assert cube.shape == (3, 3, len(data_spec))
+    for i, fil in enumerate([fil_J, fil_H, fil_Hw]):
+        for j, a in enumerate(Av):
+            ref = Hw_coeff.calphoton_map_multi(data_spec, fil, a)
+            assert np.allclose(cube[i, j], ref, rtol=1.e-12, atol=0.0)
+
+
+def test_photon_cube_dense_Av(tmp_path):
+    syn = SynPhot.from_files(Hw_coeff.read_spectra_all()[:4], cachedir=str(tmp_path))
+    fil_J, fil_H = Hw_coeff.load_filter()
+    Av = np.linspace(0.0, 60.0, 61)
+    cube = syn.photon_cube([fil_J, fil_H], Av, max_elements=10000)
+    assert cube.shape == (2, 61, 4)
+    data_spec = [Hw_coeff.load_stellar_spectra(x) for x in Hw_coeff.read_spectra_all()[:4]]
+    for j in (0, 17, 60):
+        assert np.allclose(cube[1, j], Hw_coeff.calphoton_map_multi(data_spec, fil_H, Av[j]), rtol=1.e-12, atol=0.0)
+
+
+def test_from_files_readonly_cache():
+    spectra_all = Hw_coeff.read_spectra_all()[:4]
+    with pytest.warns(UserWarning):
+        syn = SynPhot.from_files(spectra_all, cachedir="/proc/nocache")
+    ref = SynPhot([Hw_coeff.load_stellar_spectra(x) for x in spectra_all])
+    assert np.array_equal(syn.flux, ref.flux)
+
+
+def test_resample():
+    spec = Hw_coeff.load_stellar_spectra('uka0v.dat')
+    syn = SynPhot([spec], wavelength=spec[0][::2])
+    assert syn.flux.shape == (1, len(spec[0][::2]))
+    assert np.array_equal(syn.flux[0], spec[1][::2])
+
+
+if __name__ == "__main__":
+    test_photon_cube()
@@ -0,0 +1,64 @@
+"""startup budget of the subpackages, measured with python -X importtime.
+
+"""
+import os
+import subprocess
+import sys
+import pytest
+
+#: cumulative import time budget in second, a loose guard against gross regressions (numpy alone takes ~0.1 s);
+#: the guarantee is the absence of the HEAVY modules. Override it with TELESCOPE_BASELINE_IMPORT_BUDGET.
+BUDGET = float(os.environ.get("TELESCOPE_BASELINE_IMPORT_BUDGET", 10.0))
+
+#: dependencies which should be imported only on first use
+HEAVY = ["matplotlib", "scipy", "pandas", "astropy", "tqdm", "pkg_resources", "numba"]
+
+MODULES = [
+    "telescope_baseline.mapping.aperture",
+    "telescope_baseline.mapping.mapset",
+    "telescope_baseline.mapping.coverage",
+    "telescope_baseline.mapping.sweep",
+    "telescope_baseline.mapping.targetindex",
+    "telescope_baseline.mapping.read_catalog",
+    "telescope_baseline.mapping.raster",
+    "telescope_baseline.mapping.report",
+    "telescope_baseline.photometry.Hw_coeff",
+    "telescope_baseline.photometry.convmag",
+    "telescope_baseline.photometry.synphot",
+    "telescope_baseline.photometry.passband",
+    "telescope_baseline.photometry.colorfit",
+    "telescope_baseline.photometry.speclib",
+    "telescope_baseline.photometry.extinction",
+    "telescope_baseline.tools",
+    "telescope_baseline.tools.cache",
+    "telescope_baseline.tools.efficiency.registry",
+    "telescope_baseline.dataclass.efficiency",
+]
+
+
+def importtime(module):
+    """import a module in a fresh interpreter
+
+    Args:
+        module: module name
+
+    Returns:
+        cumulative import time of the module in second, names of all the imported modules
+    """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import " + module],
+                          env=env, stderr=subprocess.PIPE, universal_newlines=True, check=True)
+    cumulative = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        cumulative[name.strip()] = int(cum)*1.e-6
+    return cumulative[module], set(cumulative)
+
+
+@pytest.mark.parametrize("module", MODULES)
+def test_importtime(module):
+    elapsed, imported = importtime(module)
+    assert [m for m in HEAVY if m in imported] == []
+    assert elapsed < BUDGET
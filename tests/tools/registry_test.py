@@ -0,0 +1,69 @@
+"""test for the curve registry
+
+"""
+import os
+import numpy as np
+import pytest
+from pytest import approx
+from telescope_baseline.dataclass.efficiency import Efficiency
+from telescope_baseline.tools.efficiency.registry import CurveRegistry, default_registry, DATA_DIR
+from telescope_baseline.tools.efficiency.filters import Filters
+
+def test_registry_matches_from_json():
+    registry = default_registry()
+    assert len(registry.list('filter')) == 7
+    assert len(registry.list('qe')) == 6
+    assert registry.list('telescope') == ['teleff.json']
+    for kind, sub in [('filter', 'filter'), ('qe', 'qe')]:
+        for name in registry.list(kind):
+            ref = Efficiency.from_json(os.path.join(DATA_DIR, sub, name))
+            eff = registry.get(kind, name)
+            assert np.array_equal(eff.wavelength_grid, ref.wavelength_grid)
+            assert np.array_equal(eff.efficiency_grid, ref.efficiency_grid)
+            assert eff.title == ref.title
+
+def test_registry_memoized_and_no_file_access(monkeypatch):
+    registry = CurveRegistry()
+    eff = registry.get('qe', 'qe170.json')
+    def fail(*args, **kwargs):
+        raise AssertionError('file accessed')
+    monkeypatch.setattr('builtins.open', fail)
+    assert registry.get('qe', 'qe170.json') is eff
+    for name in registry.list('filter'):
+        registry.get('filter', name)
+
+def test_registry_read_only():
+    registry = CurveRegistry()
+    eff = registry.get('filter', 'filter100.json')
+    with pytest.raises(ValueError):
+        eff.efficiency_grid[0] = 0.0
+    with pytest.raises(ValueError):
+        eff.wavelength_grid[0] = 0.0
+    assert registry.efficiency.flags.writeable
+
+def test_registry_lookup():
+    registry = default_registry()
+    assert registry.lookup('qe', temperature=170.0) is registry.get('qe', 'qe170.json')
+    assert registry.lookup('filter', cut_on=1.05) is registry.get('filter', 'filter105.json')
+    with pytest.raises(ValueError):
+        registry.lookup('qe', temperature=175.0)
+    with pytest.raises(ValueError):
+        registry.lookup('qe', pressure=1.0)
+    with pytest.raises(ValueError):
+        registry.get('filter', 'nofilter.json')
+
+def test_registry_evaluate():
+    registry = default_registry()
+    wavref = np.linspace(0.8, 1.6, 1000)
+    val = registry.evaluate(wavref, kind='qe')
+    assert val.shape == (6, 1000)
+    for row, name in zip(val, registry.list('qe')):
+        assert np.allclose(row, registry.get('qe', name).evaluate(wavref))
+    assert registry.evaluate(wavref).shape == (len(registry), 1000)
+    assert np.sum(registry.evaluate(wavref, kind='telescope')) == approx(809.045945945946)
+
+def test_filters():
+    filters = Filters()
+    assert 'filter100.json' in filters.json_list
+    eff = filters.get_efficiency('filter100.json')
+    assert eff is filters.get_efficiency('filter100.json')